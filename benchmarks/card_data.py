@@ -0,0 +1,133 @@
+"""
+Measures listing a board of previewed file cards, whose `data` holds
+full FilePreviews results, with `data` loaded as before against the
+card list's queryset that defers it and serializes `cached_metadata`.
+
+Reports the time to load and serialize the list, and how much JSON is
+fetched and decoded. Memory is the growth of the process' peak RSS,
+so the deferred list runs first.
+
+Runs against an in-memory SQLite test database, so absolute numbers
+are only meaningful relative to each other:
+
+    python benchmarks/card_data.py [cards] [ocr_kilobytes]
+"""
+import json
+import os
+import resource
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blimp_boards.settings')
+os.environ.setdefault('DJANGO_CONFIGURATION', 'Testing')
+
+from configurations import importer  # noqa
+
+importer.install()
+
+from django.db import connection, transaction  # noqa
+from django.utils import timezone  # noqa
+from south.management.commands import patch_for_test_db_setup  # noqa
+
+from blimp_boards.accounts.models import Account  # noqa
+from blimp_boards.boards.models import Board  # noqa
+from blimp_boards.cards.models import Card  # noqa
+from blimp_boards.cards.serializers import CardSerializer  # noqa
+from blimp_boards.users.models import User  # noqa
+
+
+def get_data(ocr_kilobytes):
+    """
+    Returns FilePreviews-like results with OCR text, EXIF and layers.
+    """
+    return {
+        'pattern': {'shape': 'circle', 'color': 'blue'},
+        'thumbnails': [
+            {'requested_size': size, 'resized': True, 'page': 1,
+             'url': 'https://s3.amazonaws.com/bucket/{}.png'.format(size)}
+            for size in ('original', '42>', '200>', '500>', '800>')],
+        'metadata': {
+            'ocr': [{'page': page, 'text': 'lorem ipsum ' * 85 * 2}
+                    for page in range(ocr_kilobytes // 2)],
+            'exif': dict(('Tag{}'.format(i), i) for i in range(200)),
+            'psd': {'layers': [{'name': 'Layer {}'.format(i), 'top': i}
+                               for i in range(100)]},
+        },
+    }
+
+
+def insert_cards(board, user, count, data):
+    qn = connection.ops.quote_name
+    now = timezone.now()
+
+    columns = ('name', 'type', 'slug', 'board_id', 'created_by_id',
+               'modified_by_id', 'position', 'featured', 'is_shared',
+               'content', 'comments_count', 'data', 'cached_metadata',
+               'date_created', 'date_modified')
+
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        qn(Card._meta.db_table), ', '.join(qn(c) for c in columns),
+        ', '.join(['%s'] * len(columns)))
+
+    card = Card(data=data)
+    metadata = json.dumps(card.get_data_metadata())
+    data = json.dumps(data)
+
+    connection.cursor().executemany(sql, [
+        ('Card {}'.format(i), 'file', 'card-{}'.format(i), board.id,
+         user.id, user.id, (i + 1) * Card.POSITION_GAP, False, False,
+         'uploads/file.png', 0, data, metadata, now, now)
+        for i in range(count)])
+
+
+def peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def bench(label, get_queryset):
+    rss = peak_rss()
+
+    def run():
+        cards = get_queryset()
+        return CardSerializer(cards, many=True).data
+
+    seconds = min(timeit.repeat(run, number=1, repeat=3))
+
+    fetched = sum(len(json.dumps(card.__dict__.get('data')))
+                  for card in get_queryset())
+
+    print('{:<16} {:>10.2f}ms {:>10}KB JSON {:>10}KB peak RSS growth'.format(
+        label, seconds * 1000, fetched // 1024, peak_rss() - rss))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    ocr_kilobytes = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    patch_for_test_db_setup()
+    connection.creation.create_test_db(verbosity=0)
+
+    user = User.objects.create_user(
+        username='benchmark', email='benchmark@example.com',
+        password='abc123', first_name='Benchmark', last_name='User')
+    account = Account.personals.create(name='Benchmark', created_by=user)
+    board = Board.objects.create(
+        name='Board', account=account, created_by=user)
+
+    with transaction.atomic():
+        insert_cards(board, user, count, get_data(ocr_kilobytes))
+
+    cards = Card.objects.filter(board=board).select_related(
+        'board', 'board__account', 'created_by', 'modified_by')
+
+    print('{} cards, ~{}KB of OCR text each\n'.format(count, ocr_kilobytes))
+
+    bench('deferred data', lambda: cards.defer('data'))
+    bench('full data', lambda: cards.all())
+
+
+if __name__ == '__main__':
+    main()
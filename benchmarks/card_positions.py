@@ -0,0 +1,190 @@
+"""
+Measures moving cards around a board with many cards, comparing the
+previous dense positions, where a move shifts every card between the
+old and the new position, against positions spaced `POSITION_GAP`
+apart, where a move only writes the moved card until the board needs
+rebalancing.
+
+Runs against an in-memory SQLite test database, so absolute numbers
+are only meaningful relative to each other:
+
+    python benchmarks/card_positions.py [cards] [moves]
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blimp_boards.settings')
+os.environ.setdefault('DJANGO_CONFIGURATION', 'Testing')
+
+from configurations import importer  # noqa
+
+importer.install()
+
+from django.db import connection, transaction  # noqa
+from django.db.models import F  # noqa
+from django.utils import timezone  # noqa
+from mock import patch  # noqa
+from south.management.commands import patch_for_test_db_setup  # noqa
+
+from blimp_boards.accounts.models import Account, AccountCollaborator  # noqa
+from blimp_boards.boards.models import Board  # noqa
+from blimp_boards.cards.managers import CardManager  # noqa
+from blimp_boards.cards.models import Card  # noqa
+from blimp_boards.users.models import User  # noqa
+
+
+def insert_cards(board, user, positions):
+    qn = connection.ops.quote_name
+    now = timezone.now()
+
+    columns = ('name', 'type', 'slug', 'board_id', 'created_by_id',
+               'modified_by_id', 'position', 'featured', 'is_shared',
+               'content', 'comments_count', 'date_created', 'date_modified')
+
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        qn(Card._meta.db_table), ', '.join(qn(c) for c in columns),
+        ', '.join(['%s'] * len(columns)))
+
+    connection.cursor().executemany(sql, [
+        ('Card {}'.format(i), 'note', 'card-{}'.format(i), board.id,
+         user.id, user.id, position, False, False, 'Content', 0, now, now)
+        for i, position in enumerate(positions)])
+
+
+def create_board(account, user, name):
+    return Board.objects.create(
+        name=name, account=account, created_by=user)
+
+
+def load_cards(board):
+    return list(Card.objects.filter(board=board).only(
+        'id', 'board', 'position', 'type'))
+
+
+def dense_move(cards, index, target):
+    """
+    Moves a card the way PositionField did, shifting the cards between
+    its old and new index before saving it. Returns the rows written.
+    """
+    card = cards[index]
+    siblings = Card.objects.filter(board_id=card.board_id)
+    now = timezone.now()
+
+    with transaction.atomic():
+        if target < card.position:
+            shifted = siblings.filter(
+                position__gte=target, position__lt=card.position).update(
+                position=F('position') + 1, date_modified=now)
+        else:
+            shifted = siblings.filter(
+                position__gt=card.position, position__lte=target).update(
+                position=F('position') - 1, date_modified=now)
+
+        card.position = target
+        card.save(only_dirty=True)
+
+    return shifted + 1
+
+
+def gap_move(cards, index, target):
+    """
+    Moves a card between the cards around `target`, the way clients
+    do with the positions they have. Returns the rows written.
+    """
+    card = cards.pop(index)
+    before = cards[target - 1].position if target > 0 else 0
+    after = (cards[target].position if target < len(cards)
+             else before + Card.POSITION_GAP * 2)
+
+    card.position = (before + after) // 2
+    card.save(only_dirty=True)
+
+    return 1
+
+
+def bench(board, move, moves):
+    """
+    Runs the given (index, target) moves, only timing the moves
+    themselves. Returns the seconds taken and the rows written.
+    """
+    seconds = 0.0
+    rows = 0
+
+    for index, target in moves:
+        cards = load_cards(board)
+
+        start = timeit.default_timer()
+        rows += move(cards, index, target)
+        seconds += timeit.default_timer() - start
+
+    return seconds, rows
+
+
+def count_rebalances():
+    rebalances = []
+    rebalance = CardManager.rebalance
+
+    def counted_rebalance(self, board, after, exclude=None):
+        rows = self.filter_board(board, exclude=exclude).count()
+        rebalances.append(rows)
+        return rebalance(self, board, after, exclude=exclude)
+
+    return rebalances, patch.object(
+        CardManager, 'rebalance', counted_rebalance)
+
+
+def report(label, seconds, rows, moves):
+    print('{:<28} {:>8.2f}ms/move {:>8} rows written/move'.format(
+        label, seconds * 1000 / moves, rows // moves))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    moves = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    patch_for_test_db_setup()
+    connection.creation.create_test_db(verbosity=0)
+
+    user = User.objects.create_user(
+        username='benchmark', email='benchmark@example.com',
+        password='abc123', first_name='Benchmark', last_name='User')
+    account = Account.personals.create(name='Benchmark', created_by=user)
+    AccountCollaborator.objects.create_owner(account=account, user=user)
+
+    dense_board = create_board(account, user, 'Dense')
+    gap_board = create_board(account, user, 'Gaps')
+
+    with transaction.atomic():
+        insert_cards(dense_board, user, range(count))
+        insert_cards(gap_board, user, [
+            (i + 1) * Card.POSITION_GAP for i in range(count)])
+
+    random.seed(0)
+    random_moves = [(random.randrange(count), random.randrange(count - 1))
+                    for i in range(moves)]
+    front_moves = [(count - 1, 0)] * moves
+
+    print('{} cards, {} moves\n'.format(count, moves))
+
+    for label, moves_list in (('random moves', random_moves),
+                              ('moves to the front', front_moves)):
+        seconds, rows = bench(dense_board, dense_move, moves_list)
+        report('dense, {}'.format(label), seconds, rows, moves)
+
+        rebalances, patcher = count_rebalances()
+
+        with patcher:
+            seconds, rows = bench(gap_board, gap_move, moves_list)
+
+        report('gaps, {}'.format(label), seconds, rows + sum(rebalances),
+               moves)
+        print('{:<28} {:>8} rebalances\n'.format('', len(rebalances)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Measures the per-row cost ModelDiffMixin adds when instantiating cards,
+as a queryset does for every row it loads, and when diffing them.
+
+Compares the current snapshot against the previous `model_to_dict` one
+and against no tracking at all. No database is needed:
+
+    python benchmarks/model_diff.py [rows]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blimp_boards.settings')
+os.environ.setdefault('DJANGO_CONFIGURATION', 'Testing')
+
+from configurations import importer  # noqa
+
+importer.install()
+
+from django.db import models  # noqa
+from django.forms.models import model_to_dict  # noqa
+
+from blimp_boards.cards.models import Card  # noqa
+from blimp_boards.utils.mixins import ModelDiffMixin  # noqa
+
+
+def model_to_dict_init(self, *args, **kwargs):
+    models.Model.__init__(self, *args, **kwargs)
+    self._initial = model_to_dict_snapshot(self)
+
+
+def model_to_dict_snapshot(instance):
+    fields = [field.name for field in instance._meta.fields]
+    return model_to_dict(instance, fields=fields)
+
+
+def model_to_dict_has_field_changed(instance, field_name):
+    current = model_to_dict_snapshot(instance)
+    diff = dict((k, v) for k, v in instance._initial.items()
+                if v != current[k])
+    return field_name in diff
+
+
+def get_rows(count):
+    card = Card(id=1, name='The Card', type='note', content='abc123',
+                board_id=1, created_by_id=1, modified_by_id=1,
+                data={'key': 'value'})
+
+    row = tuple(getattr(card, field.attname) for field in Card._meta.fields)
+
+    return [row] * count
+
+
+def instantiate(rows):
+    return [Card(*row) for row in rows]
+
+
+def run(label, rows, has_field_changed):
+    repeat = 5
+
+    seconds = min(timeit.repeat(
+        lambda: instantiate(rows), number=1, repeat=repeat))
+
+    cards = instantiate(rows)
+
+    def diff():
+        for card in cards:
+            for field_name in ('name', 'board', 'position'):
+                has_field_changed(card, field_name)
+
+    diff_seconds = min(timeit.repeat(diff, number=1, repeat=repeat))
+
+    print('{:<14} init {:>7.2f} us/row   3x has_field_changed {:>7.2f} us/row'
+          .format(label, seconds / len(rows) * 1e6,
+                  diff_seconds / len(rows) * 1e6))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rows = get_rows(count)
+
+    print('{} cards, best of 5'.format(count))
+
+    run('snapshot', rows, lambda card, name: card.has_field_changed(name))
+
+    init = ModelDiffMixin.__init__
+    ModelDiffMixin.__init__ = model_to_dict_init
+
+    try:
+        run('model_to_dict', rows, model_to_dict_has_field_changed)
+
+        ModelDiffMixin.__init__ = models.Model.__init__
+        run('no tracking', rows, lambda card, name: None)
+    finally:
+        ModelDiffMixin.__init__ = init
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Measures signing card thumbnails while serializing cards, without
+memoized signed URLs and with them, both on a cold cache and on a
+warm one, as when a list is requested again. No database is needed:
+
+    python benchmarks/s3_signing.py [cards]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blimp_boards.settings')
+os.environ.setdefault('DJANGO_CONFIGURATION', 'Testing')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+
+from configurations import importer  # noqa
+
+importer.install()
+
+from mock import patch  # noqa
+
+from blimp_boards.cards.models import Card  # noqa
+from blimp_boards.cards.serializers import CardSerializer  # noqa
+from blimp_boards.files import utils  # noqa
+
+THUMBNAIL_FIELDS = ('thumbnail_xs_path', 'thumbnail_sm_path',
+                    'thumbnail_md_path', 'thumbnail_lg_path')
+
+
+class NoCache(object):
+    def get(self, key, default=None):
+        return default
+
+    def set(self, key, value):
+        pass
+
+
+def create_cards(count):
+    cards = []
+
+    for i in range(count):
+        card = Card(id=i, name='Card {}'.format(i), type='file')
+
+        for field in THUMBNAIL_FIELDS:
+            setattr(card, field, 'https://s3.amazonaws.com/bucket/'
+                    'cards/{}/{}.png'.format(i, field))
+
+        cards.append(card)
+
+    return cards
+
+
+def serialize(cards):
+    return CardSerializer(cards, many=True, fields=THUMBNAIL_FIELDS).data
+
+
+def bench(label, func, count, setup=None):
+    def run():
+        if setup:
+            setup()
+
+        func()
+
+    seconds = min(timeit.repeat(run, number=1, repeat=3))
+    print('{:<32} {:>10.2f}ms {:>8.2f}us/card'.format(
+        label, seconds * 1000, seconds * 1e6 / count))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    cards = create_cards(count)
+
+    print('{} cards, {} thumbnails each\n'.format(
+        count, len(THUMBNAIL_FIELDS)))
+
+    with patch.object(utils, 'signed_urls', NoCache()):
+        bench('not memoized', lambda: serialize(cards), count)
+
+    bench('memoized, cold cache', lambda: serialize(cards), count,
+          setup=utils.signed_urls.clear)
+
+    serialize(cards)
+    bench('memoized, warm cache', lambda: serialize(cards), count)
+
+    bench('unsigned', lambda: serialize(cards), count,
+          setup=lambda: [setattr(card, field, None) for card in cards
+                         for field in THUMBNAIL_FIELDS])
+
+
+if __name__ == '__main__':
+    main()
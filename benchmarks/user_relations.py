@@ -0,0 +1,159 @@
+"""
+Measures `User.boards`, `User.cards` and the stack membership check
+in `StackSerializer.validate_cards` for a user collaborating on many
+boards, against the previous nested `IN (subquery)` querysets.
+
+Runs against an in-memory SQLite test database, so absolute numbers
+are only meaningful relative to each other:
+
+    python benchmarks/user_relations.py [boards] [cards]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blimp_boards.settings')
+os.environ.setdefault('DJANGO_CONFIGURATION', 'Testing')
+
+from configurations import importer  # noqa
+
+importer.install()
+
+from django.db import connection, transaction  # noqa
+from django.utils import timezone  # noqa
+from south.management.commands import patch_for_test_db_setup  # noqa
+
+from blimp_boards.accounts.models import Account  # noqa
+from blimp_boards.boards.models import Board, BoardCollaborator  # noqa
+from blimp_boards.cards.models import Card  # noqa
+from blimp_boards.users.models import User  # noqa
+
+
+def create_user(username):
+    return User.objects.create_user(
+        username=username, email='{}@example.com'.format(username),
+        password='abc123', first_name=username, last_name='Benchmark')
+
+
+def insert_rows(model, columns, rows):
+    qn = connection.ops.quote_name
+
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        qn(model._meta.db_table), ', '.join(qn(c) for c in columns),
+        ', '.join(['%s'] * len(columns)))
+
+    connection.cursor().executemany(sql, rows)
+
+
+def populate(user, other, board_count, card_count):
+    """
+    Creates `board_count` boards for user, as many again for another
+    user, and spreads `card_count` cards over the user's boards.
+    """
+    account = Account.personals.create(name='Benchmark', created_by=user)
+    now = timezone.now()
+
+    board_columns = ('name', 'slug', 'account_id', 'created_by_id',
+                     'modified_by_id', 'is_shared', 'color', 'date_created',
+                     'date_modified')
+
+    insert_rows(Board, board_columns, [
+        ('Board {}'.format(i), 'board-{}'.format(i), account.id, user.id,
+         user.id, i % 10 == 0, '', now, now) for i in range(board_count * 2)])
+
+    board_ids = list(Board.objects.values_list('id', flat=True))
+    user_board_ids = board_ids[:board_count]
+
+    collaborator_columns = ('board_id', 'user_id', 'permission',
+                            'created_by_id', 'modified_by_id',
+                            'date_created', 'date_modified')
+
+    insert_rows(BoardCollaborator, collaborator_columns, [
+        (board_id, user.id, 'write', user.id, user.id, now, now)
+        for board_id in user_board_ids] + [
+        (board_id, other.id, 'write', other.id, other.id, now, now)
+        for board_id in board_ids])
+
+    card_columns = ('name', 'type', 'slug', 'board_id', 'created_by_id',
+                    'modified_by_id', 'position', 'featured', 'is_shared',
+                    'content', 'comments_count', 'date_created',
+                    'date_modified')
+
+    insert_rows(Card, card_columns, [
+        ('Card {}'.format(i), 'note', 'card-{}'.format(i),
+         user_board_ids[i % board_count], user.id, user.id,
+         i // board_count, False, False, 'Content', 0, now, now)
+        for i in range(card_count)])
+
+
+def old_boards(user):
+    board_ids = BoardCollaborator.objects.filter(
+        user=user).values_list('board_id', flat=True)
+
+    return Board.objects.filter(pk__in=board_ids)
+
+
+def old_cards(user):
+    return Card.objects.filter(board__in=old_boards(user))
+
+
+def old_validate_cards(user, card_ids):
+    user_cards_ids = old_cards(user).values_list('id', flat=True)
+    return [card_id for card_id in card_ids if card_id in user_cards_ids]
+
+
+def new_validate_cards(user, card_ids):
+    user_cards_ids = set(user.cards.filter(
+        pk__in=card_ids).values_list('id', flat=True))
+
+    return [card_id for card_id in card_ids if card_id in user_cards_ids]
+
+
+def bench(label, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print('{:<40} {:>10.2f}ms'.format(label, seconds * 1000))
+
+
+def main():
+    board_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    card_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+
+    patch_for_test_db_setup()
+    connection.creation.create_test_db(verbosity=0)
+
+    user = create_user('benchmark')
+    other = create_user('other')
+
+    with transaction.atomic():
+        populate(user, other, board_count, card_count)
+
+    card_ids = list(Card.objects.order_by('?').values_list(
+        'id', flat=True)[:10])
+
+    shared_boards = Board.objects.filter(is_shared=True)
+    shared_cards = Card.objects.filter(board__is_shared=True)
+
+    print('{} boards, {} cards\n'.format(board_count, card_count))
+
+    bench('old boards count', lambda: old_boards(user).count(), 20)
+    bench('new boards count', lambda: user.boards.count(), 20)
+    bench('old boards | shared', lambda: len(
+        old_boards(user) | shared_boards), 20)
+    bench('new boards | shared', lambda: len(user.boards | shared_boards), 20)
+    bench('old cards count', lambda: old_cards(user).count(), 10)
+    bench('new cards count', lambda: user.cards.count(), 10)
+    bench('old cards | shared, first page', lambda: list(
+        (old_cards(user) | shared_cards)[:50]), 10)
+    bench('new cards | shared, first page', lambda: list(
+        (user.cards | shared_cards)[:50]), 10)
+    bench('old validate_cards', lambda: old_validate_cards(
+        user, card_ids), 3)
+    bench('new validate_cards', lambda: new_validate_cards(
+        user, card_ids), 20)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,9 @@ from ..users.models import User
 from ..utils.decorators import autoconnect
 from ..utils.fields import ReservedKeywordsAutoSlugField
 from ..utils.models import BaseModel
+from ..utils.permissions import (get_account_owners, has_account_permission,
+                                 clear_account_owners,
+                                 clear_pending_cache_keys)
 from .constants import ACCOUNT_RESERVED_KEYWORDS
 from . import managers
 
@@ -131,15 +134,12 @@ class Account(BaseModel):
         Account, `False` otherwise. Optionally checks if a user
         is the account owner.
         """
-        collaborators = AccountCollaborator.objects.filter(
-            account=self, user=user)
+        account_owner = get_account_owners(user).get(self.id)
 
-        if is_owner is not None:
-            collaborators = collaborators.filter(is_owner=is_owner)
-
-        return collaborators.exists()
+        return has_account_permission(account_owner, is_owner)
 
 
+@autoconnect
 @python_2_unicode_compatible
 class AccountCollaborator(BaseModel):
     account = models.ForeignKey(Account)
@@ -155,3 +155,35 @@ class AccountCollaborator(BaseModel):
 
     def __str__(self):
         return self.user.full_name or self.user.email
+
+    def save(self, *args, **kwargs):
+        saved = super(AccountCollaborator, self).save(*args, **kwargs)
+
+        clear_pending_cache_keys()
+
+        return saved
+
+    def delete(self, *args, **kwargs):
+        super(AccountCollaborator, self).delete(*args, **kwargs)
+
+        clear_pending_cache_keys()
+
+    def post_save(self, created, *args, **kwargs):
+        self.clear_cached_owners()
+
+        super(AccountCollaborator, self).post_save(created, *args, **kwargs)
+
+    def post_delete(self, *args, **kwargs):
+        self.clear_cached_owners()
+
+        super(AccountCollaborator, self).post_delete(*args, **kwargs)
+
+    def clear_cached_owners(self):
+        """
+        Clears the cached accounts of this collaborator's user,
+        and of the previous user if it changed.
+        """
+        user_diff = self.get_field_diff('user')
+        previous_user_id = user_diff[0] if user_diff else None
+
+        clear_account_owners(self.user_id, previous_user_id)
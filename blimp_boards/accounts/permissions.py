@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from ..utils.permissions import get_membership_cache
+
 
 class AccountPermission(permissions.IsAuthenticated):
     def is_authenticated(self, request):
@@ -31,7 +33,9 @@ class AccountPermission(permissions.IsAuthenticated):
         if is_safe and view.action == 'retrieve':
             return True
 
+        memberships = get_membership_cache(request)
+
         if not is_safe and obj.type == 'personal':
-            return obj.is_user_collaborator(request.user, is_owner=True)
+            return memberships.is_account_collaborator(obj.id, is_owner=True)
 
-        return obj.is_user_collaborator(request.user)
+        return memberships.is_account_collaborator(obj.id)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from ..utils.fields import DomainNameField
+from ..utils.serializers import DynamicFieldsModelSerializer
 from ..users.serializers import NestedUserSerializer
 from .fields import SignupDomainsField
 from .models import Account
@@ -13,7 +14,7 @@ class ValidateSignupDomainsSerializer(serializers.Serializer):
     signup_domains = SignupDomainsField()
 
 
-class AccountSerializer(serializers.ModelSerializer):
+class AccountSerializer(DynamicFieldsModelSerializer):
     """
     Serializer for Accounts.
     """
@@ -82,3 +82,37 @@ class AccountCollaboratorTestCase(BaseTestCase):
             account=self.account, user=self.user)
 
         self.assertTrue(account_member.is_owner)
+
+    def test_is_user_collaborator_should_use_cached_accounts(self):
+        """
+        Tests that `Account.is_user_collaborator` only queries a user's
+        accounts once.
+        """
+        AccountCollaborator.objects.create_owner(
+            account=self.account, user=self.user)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.account.is_user_collaborator(self.user))
+            self.assertTrue(self.account.is_user_collaborator(
+                self.user, is_owner=True))
+
+    def test_saving_should_clear_cached_accounts(self):
+        """
+        Tests that updating and deleting an AccountCollaborator clears
+        its user's cached accounts.
+        """
+        account_collaborator = AccountCollaborator.objects.create_owner(
+            account=self.account, user=self.user)
+
+        self.assertTrue(self.account.is_user_collaborator(
+            self.user, is_owner=True))
+
+        account_collaborator.is_owner = False
+        account_collaborator.save()
+
+        self.assertTrue(self.account.is_user_collaborator(
+            self.user, is_owner=False))
+
+        account_collaborator.delete()
+
+        self.assertFalse(self.account.is_user_collaborator(self.user))
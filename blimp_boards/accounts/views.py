@@ -14,6 +14,7 @@ from ..boards.models import Board
 from ..cards.models import Card
 from ..notifications.pagination import PaginatedNotificationSerializer
 from ..notifications.models import Notification
+from ..utils.mixins import SparseFieldsMixin
 from ..utils.response import ErrorResponse
 from ..utils.viewsets import ListRetrieveUpdateViewSet
 from .models import Account
@@ -56,7 +57,7 @@ class CheckSignupDomainAPIView(generics.CreateAPIView):
         return ErrorResponse(serializer.errors)
 
 
-class AccountViewSet(ListRetrieveUpdateViewSet):
+class AccountViewSet(SparseFieldsMixin, ListRetrieveUpdateViewSet):
     """
     Get a list of accounts for the user in the request
     """
@@ -64,6 +65,11 @@ class AccountViewSet(ListRetrieveUpdateViewSet):
     serializer_class = AccountSerializer
     permission_classes = (AccountPermission, )
 
+    sparse_select_related = {
+        'created_by': ('created_by', ),
+        'modified_by': ('modified_by', ),
+    }
+
     def get_queryset(self):
         user = self.request.user
         request_method = self.request.method.lower()
@@ -87,7 +93,7 @@ class AccountViewSet(ListRetrieveUpdateViewSet):
         elif public_accounts:
             accounts = public_accounts
 
-        return accounts.select_related('created_by', 'modified_by')
+        return self.select_sparse_related(accounts)
 
     @link(paginate_by=10)
     def activity(self, request, pk=None):
@@ -0,0 +1,31 @@
+import datetime
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...models import BoardChange
+
+
+class Command(BaseCommand):
+    help = 'Deletes board changes older than the retention period.'
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--days', action='store', dest='days', type='int',
+            default=None,
+            help='Days of changes to keep. Defaults to '
+                 'BOARD_CHANGES_RETENTION_DAYS.'),
+    )
+
+    def handle(self, *args, **options):
+        days = options['days']
+
+        if days is None:
+            days = settings.BOARD_CHANGES_RETENTION_DAYS
+
+        before = timezone.now() - datetime.timedelta(days=days)
+        count = BoardChange.objects.trim(before)
+
+        self.stdout.write('Deleted {} board changes.'.format(count))
@@ -0,0 +1,128 @@
+import re
+
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import Max
+
+
+BOARD_ROOM_REGEX = re.compile(r'^b(\d+)$')
+
+
+class BoardChangeManager(models.Manager):
+    record_attempts = 5
+
+    def record(self, messages):
+        """
+        Appends announced (data, room) messages for private board
+        rooms to the change log, in a single query.
+
+        Each board numbers its changes with its own `sequence`, which
+        is the cursor clients resume from. Nothing is locked: when
+        batches for the same board are recorded at once, the unique
+        (board_id, sequence) index rejects all but one, and the
+        others are numbered again after it. A board's sequences
+        therefore commit in order and without gaps.
+        """
+        changes = []
+
+        for data, room in messages:
+            match = BOARD_ROOM_REGEX.match(room or '')
+
+            if match:
+                changes.append(self.model(
+                    board_id=int(match.group(1)), data=data))
+
+        if not changes:
+            return changes
+
+        for attempt in range(self.record_attempts):
+            self.set_sequences(changes)
+
+            try:
+                with transaction.atomic(using=self.db):
+                    self.bulk_create(changes)
+            except IntegrityError:
+                if attempt == self.record_attempts - 1:
+                    raise
+            else:
+                break
+
+        return changes
+
+    def set_sequences(self, changes):
+        """
+        Numbers changes after the last sequence of their boards.
+        """
+        board_ids = set(change.board_id for change in changes)
+        sequences = self.get_last_sequences(board_ids)
+
+        for change in changes:
+            sequences[change.board_id] = sequences.get(change.board_id, 0) + 1
+            change.sequence = sequences[change.board_id]
+
+    def get_last_sequences(self, board_ids):
+        """
+        Returns a dict of the last sequence of each given board
+        with changes, in a single query.
+        """
+        sequences = self.filter(board_id__in=board_ids).order_by().values(
+            'board_id').annotate(last=Max('sequence'))
+
+        return dict((row['board_id'], row['last']) for row in sequences)
+
+    def first_cursor(self, board_id):
+        """
+        Returns the oldest cursor still in a board's changes.
+        """
+        cursors = self.filter(board_id=board_id).order_by(
+            'sequence').values_list('sequence', flat=True)[:1]
+
+        return cursors[0] if cursors else None
+
+    def last_cursor(self, board_id):
+        """
+        Returns the most recent cursor in a board's changes, or 0 if
+        the board has none.
+        """
+        return self.get_last_sequences([board_id]).get(board_id, 0)
+
+    def is_trimmed(self, board_id, cursor):
+        """
+        Returns `True` if a board's changes after the given cursor
+        may have been trimmed from the change log.
+        """
+        first_cursor = self.first_cursor(board_id)
+
+        if first_cursor is None:
+            return False
+
+        return cursor < first_cursor - 1
+
+    def trim(self, before):
+        """
+        Deletes changes created before the given datetime, with a
+        single DELETE. The most recent change of each board is always
+        kept so its sequence carries on. Returns the number of
+        changes deleted.
+        """
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+
+        date_created = opts.get_field('date_created').get_db_prep_value(
+            before, connection)
+
+        sql = (
+            'DELETE FROM {changes} WHERE {date_created} < %s AND EXISTS ('
+            'SELECT 1 FROM {changes} later '
+            'WHERE later.{board_id} = {changes}.{board_id} '
+            'AND later.{sequence} > {changes}.{sequence})').format(
+            changes=qn(opts.db_table),
+            date_created=qn(opts.get_field('date_created').column),
+            board_id=qn(opts.get_field('board_id').column),
+            sequence=qn(opts.get_field('sequence').column))
+
+        with transaction.atomic(using=self.db):
+            cursor = connection.cursor()
+            cursor.execute(sql, [date_created])
+
+        return cursor.rowcount
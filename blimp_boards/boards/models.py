@@ -4,18 +4,27 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.urlresolvers import reverse
 from django.db import models
-from django.db.models import Q
 from django.db.models.loading import get_model
+from django.dispatch import receiver
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.functional import cached_property
 from django.utils.log import getLogger
+from jsonfield import JSONField
+from rest_framework.utils.encoders import JSONEncoder
 
 from ..files.utils import sign_s3_url
 from ..notifications.signals import notify
 from ..utils.decorators import autoconnect
-from ..utils.fields import ReservedKeywordsAutoSlugField
+from ..utils.fields import (ReservedKeywordsAutoSlugField,
+                            DateTimeCreatedField)
+from ..utils.announcer import announcer
 from ..utils.models import BaseModel
+from ..utils.permissions import (get_board_permissions, has_board_permission,
+                                 clear_board_permissions,
+                                 clear_pending_cache_keys)
+from ..utils.signals import announced
 from .constants import BOARD_RESERVED_KEYWORDS
+from .managers import BoardChangeManager
 
 
 logger = getLogger(__name__)
@@ -24,6 +33,9 @@ logger = getLogger(__name__)
 @autoconnect
 @python_2_unicode_compatible
 class Board(BaseModel):
+    THUMBNAIL_FIELDS = ('thumbnail_xs_path', 'thumbnail_sm_path',
+                        'thumbnail_md_path', 'thumbnail_lg_path', )
+
     name = models.CharField(max_length=255)
     slug = ReservedKeywordsAutoSlugField(
         populate_from='name', unique_with='account', editable=True,
@@ -67,9 +79,26 @@ class Board(BaseModel):
 
         return '{}{}'.format(settings.APPLICATION_URL, activity_url)
 
-    @cached_property
+    @property
     def announce_room(self):
-        return 'a{}'.format(self.account_id)
+        return 'b{}'.format(self.id)
+
+    @property
+    def public_announce_room(self):
+        return 'b{}:public'.format(self.id)
+
+    @property
+    def announce_rooms(self):
+        """
+        Returns the board's room, plus its public read-only room while
+        the board is shared or right after it stops being shared.
+        """
+        rooms = [self.announce_room]
+
+        if self.is_shared or self.has_field_changed('is_shared'):
+            rooms.append(self.public_announce_room)
+
+        return rooms
 
     @cached_property
     def serializer(self):
@@ -96,32 +125,20 @@ class Board(BaseModel):
         if self.thumbnail_lg_path:
             return sign_s3_url(self.thumbnail_lg_path)
 
-    @cached_property
-    def file_card(self):
+    def update_thumbnails(self):
         """
-        Returns board's first card of type file.
+        Copies the thumbnails of the board's first file card, its
+        cover, to the board. Only saves when they have changed.
         """
-        return self.card_set.filter(type='file').first()
+        thumbnail_fields = self.THUMBNAIL_FIELDS
 
-    @property
-    def card_thumbnail_xs_path(self):
-        if self.file_card:
-            return self.file_card.signed_thumbnail_xs_path
+        cover_card = self.card_set.filter(type='file').only(
+            'id', *thumbnail_fields).first()
 
-    @property
-    def card_thumbnail_sm_path(self):
-        if self.file_card:
-            return self.file_card.signed_thumbnail_sm_path
-
-    @property
-    def card_thumbnail_md_path(self):
-        if self.file_card:
-            return self.file_card.signed_thumbnail_md_path
+        for field in thumbnail_fields:
+            setattr(self, field, getattr(cover_card, field, None))
 
-    @property
-    def card_thumbnail_lg_path(self):
-        if self.file_card:
-            return self.file_card.signed_thumbnail_lg_path
+        self.save(only_dirty=True)
 
     def save(self, *args, **kwargs):
         """
@@ -175,17 +192,9 @@ class Board(BaseModel):
         Board, `False` otherwise. Optionally checks if a user
         is a collaborator with a specific permission.
         """
-        collaborators = BoardCollaborator.objects.filter(board=self, user=user)
-        read_permission = BoardCollaborator.READ_PERMISSION
-        write_permission = BoardCollaborator.WRITE_PERMISSION
-
-        if permission == read_permission:
-            collaborators = collaborators.filter(
-                Q(permission=write_permission) | Q(permission=read_permission))
-        elif permission == write_permission:
-            collaborators = collaborators.filter(permission=write_permission)
+        board_permission = get_board_permissions(user).get(self.id)
 
-        return collaborators.exists()
+        return has_board_permission(board_permission, permission)
 
     @classmethod
     def create_demo_board(cls, account, user):
@@ -200,7 +209,12 @@ class Board(BaseModel):
     def clone(self, account, user):
         """
         Clones a board to another account using a given user for User FKs.
+        Announcements are published, and recorded, in one batch.
         """
+        with announcer.deferred():
+            return self._clone(account, user)
+
+    def _clone(self, account, user):
         board = deepcopy(self)
         cards = board.card_set.all()
 
@@ -268,9 +282,22 @@ class BoardCollaborator(BaseModel):
     def __str__(self):
         return str(self.user) if self.user else str(self.invited_user)
 
-    @cached_property
+    @property
     def announce_room(self):
-        return 'a{}'.format(self.board.account_id)
+        return 'b{}'.format(self.board_id)
+
+    @property
+    def announce_rooms(self):
+        """
+        Returns the board's room and the collaborating user's room,
+        so the user's clients learn about boards they can now open.
+        """
+        rooms = [self.announce_room]
+
+        if self.user_id:
+            rooms.append('u{}'.format(self.user_id))
+
+        return rooms
 
     @cached_property
     def serializer(self):
@@ -301,9 +328,18 @@ class BoardCollaborator(BaseModel):
 
         self.full_clean()
 
-        return super(BoardCollaborator, self).save(
+        saved = super(BoardCollaborator, self).save(
             force_insert, force_update, **kwargs)
 
+        clear_pending_cache_keys()
+
+        return saved
+
+    def delete(self, *args, **kwargs):
+        super(BoardCollaborator, self).delete(*args, **kwargs)
+
+        clear_pending_cache_keys()
+
     def clean(self):
         """
         Validates that either a user or an invited_user is set.
@@ -318,8 +354,25 @@ class BoardCollaborator(BaseModel):
         if created and self.user_id and self.user_id != self.created_by_id:
             self.notify_created()
 
+        self.clear_cached_permissions()
+
         super(BoardCollaborator, self).post_save(created, *args, **kwargs)
 
+    def post_delete(self, *args, **kwargs):
+        self.clear_cached_permissions()
+
+        super(BoardCollaborator, self).post_delete(*args, **kwargs)
+
+    def clear_cached_permissions(self):
+        """
+        Clears the cached board permissions of this collaborator's
+        user, and of the previous user if it changed.
+        """
+        user_diff = self.get_field_diff('user')
+        previous_user_id = user_diff[0] if user_diff else None
+
+        clear_board_permissions(self.user_id, previous_user_id)
+
     def notify_created(self):
         actor = self.created_by
         recipients = [self.user]
@@ -452,3 +505,37 @@ class BoardCollaboratorRequest(BaseModel):
             extra_context=extra_context,
             override_backends=('email', )
         )
+
+
+@python_2_unicode_compatible
+class BoardChange(models.Model):
+    """
+    An append-only log of the messages announced to a board's room.
+    The board's `sequence` is the cursor clients use to catch up
+    after reconnecting. Boards are referenced by id only, so the log
+    can outlive them until it's trimmed.
+    """
+    board_id = models.PositiveIntegerField()
+    sequence = models.PositiveIntegerField()
+    data = JSONField(dump_kwargs={
+                     'cls': JSONEncoder, 'separators': (',', ':')})
+    date_created = DateTimeCreatedField(db_index=True)
+
+    objects = BoardChangeManager()
+
+    class Meta:
+        ordering = ('board_id', 'sequence')
+        unique_together = (
+            ('board_id', 'sequence'),
+        )
+
+    def __str__(self):
+        return '{} {}'.format(self.board_id, self.sequence)
+
+
+@receiver(announced)
+def record_board_changes(sender, messages, **kwargs):
+    """
+    Records messages announced to board rooms in the change log.
+    """
+    BoardChange.objects.record(messages)
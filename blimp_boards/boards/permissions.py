@@ -1,7 +1,6 @@
 from rest_framework import permissions
 
-from ..accounts.models import AccountCollaborator
-from .models import Board
+from ..utils.permissions import get_membership_cache
 
 
 class BoardPermission(permissions.BasePermission):
@@ -45,7 +44,10 @@ class BoardPermission(permissions.BasePermission):
         if action in ['comments', 'leave']:
             permission = None
 
-        return obj.is_user_collaborator(request.user, permission=permission)
+        memberships = get_membership_cache(request)
+
+        return memberships.is_board_collaborator(
+            obj.id, permission=permission)
 
 
 class BoardCollaboratorPermission(permissions.BasePermission):
@@ -53,22 +55,18 @@ class BoardCollaboratorPermission(permissions.BasePermission):
         return request.user and request.user.is_authenticated()
 
     def board_collaborator_has_permission(self, request, view, board_id):
-        try:
-            board = Board.objects.get(pk=board_id)
-        except Board.DoesNotExist:
+        memberships = get_membership_cache(request)
+        board = memberships.get_board(board_id)
+
+        if not board:
             return False
 
         permission = BoardPermission()
         has_board_permission = permission.has_object_permission(
             request, view, board)
 
-        account_owner = AccountCollaborator.objects.filter(
-            account_id=board.account_id,
-            user=request.user,
-            is_owner=True
-        )
-
-        return has_board_permission or account_owner.exists()
+        return has_board_permission or memberships.is_account_collaborator(
+            board.account_id, is_owner=True)
 
     def has_permission(self, request, view):
         """
@@ -119,6 +117,8 @@ class BoardCollaboratorPermission(permissions.BasePermission):
         Returns `True if user is the account owner.
         """
 
+        memberships = get_membership_cache(request)
+
         if request.method == 'DELETE':
             has_board_permission = request.user == obj.user
         else:
@@ -126,13 +126,8 @@ class BoardCollaboratorPermission(permissions.BasePermission):
             has_board_permission = permission.has_object_permission(
                 request, view, obj.board)
 
-        account_owner = AccountCollaborator.objects.filter(
-            account_id=obj.board.account_id,
-            user=request.user,
-            is_owner=True
-        )
-
-        return has_board_permission or account_owner.exists()
+        return has_board_permission or memberships.is_account_collaborator(
+            obj.board.account_id, is_owner=True)
 
 
 class BoardCollaboratorRequestPermission(permissions.IsAuthenticated):
@@ -141,5 +136,7 @@ class BoardCollaboratorRequestPermission(permissions.IsAuthenticated):
         Return `True` if user is a collaborator with the
         corresponding permission on this board, `False` otherwise.
         """
-        return obj.board.account.is_user_collaborator(
-            request.user, is_owner=True)
+        memberships = get_membership_cache(request)
+
+        return memberships.is_account_collaborator(
+            obj.board.account_id, is_owner=True)
@@ -5,11 +5,12 @@ from rest_framework import serializers
 from ..accounts.models import AccountCollaborator
 from ..invitations.models import InvitedUser
 from ..accounts.permissions import AccountPermission
+from ..utils.serializers import DynamicFieldsModelSerializer
 from ..users.serializers import NestedUserSerializer, UserSimpleSerializer
 from .models import Board, BoardCollaborator, BoardCollaboratorRequest
 
 
-class BoardSerializer(serializers.ModelSerializer):
+class BoardSerializer(DynamicFieldsModelSerializer):
     created_by = NestedUserSerializer(read_only=True)
     modified_by = NestedUserSerializer(read_only=True)
 
@@ -18,10 +19,10 @@ class BoardSerializer(serializers.ModelSerializer):
     html_url = serializers.Field()
     activity_html_url = serializers.Field()
 
-    thumbnail_xs_path = serializers.Field(source='card_thumbnail_xs_path')
-    thumbnail_sm_path = serializers.Field(source='card_thumbnail_sm_path')
-    thumbnail_md_path = serializers.Field(source='card_thumbnail_md_path')
-    thumbnail_lg_path = serializers.Field(source='card_thumbnail_lg_path')
+    thumbnail_xs_path = serializers.Field(source='signed_thumbnail_xs_path')
+    thumbnail_sm_path = serializers.Field(source='signed_thumbnail_sm_path')
+    thumbnail_md_path = serializers.Field(source='signed_thumbnail_md_path')
+    thumbnail_lg_path = serializers.Field(source='signed_thumbnail_lg_path')
 
     class Meta:
         model = Board
@@ -78,7 +79,7 @@ class BoardCollaboratorSimpleSerializer(serializers.ModelSerializer):
                   'date_created', 'date_modified',)
 
 
-class BoardCollaboratorSerializer(serializers.ModelSerializer):
+class BoardCollaboratorSerializer(DynamicFieldsModelSerializer):
     created_by = NestedUserSerializer(read_only=True)
     modified_by = NestedUserSerializer(read_only=True)
 
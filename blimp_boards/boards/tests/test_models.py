@@ -1,15 +1,27 @@
 # -*- coding: utf8 -*-
 
+import datetime
+
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
 from django.utils.encoding import smart_text
 
+from mock import patch
+
+from ...utils.announcer import Announcer
+from ...utils.permissions import (BOARD_PERMISSIONS_CACHE_KEY,
+                                  clear_pending_cache_keys)
 from ...utils.tests import BaseTestCase, FuzzyInt
 from ...users.models import User
 from ...cards.models import Card
 from ...comments.models import Comment
 from ...invitations.models import InvitedUser
 from ...accounts.models import AccountCollaborator
-from ..models import Board, BoardCollaborator, BoardCollaboratorRequest
+from ..models import (Board, BoardCollaborator, BoardCollaboratorRequest,
+                      BoardChange)
 
 
 class BoardTestCase(BaseTestCase):
@@ -60,6 +72,18 @@ class BoardTestCase(BaseTestCase):
 
         self.assertTrue(is_user_collaborator)
 
+    def test_is_user_collaborator_should_use_cached_permissions(self):
+        """
+        Tests that `is_user_collaborator` only queries a user's board
+        permissions once, for any board.
+        """
+        board = Board.objects.create(
+            name='The Board', account=self.account, created_by=self.user)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.board.is_user_collaborator(self.user))
+            self.assertTrue(board.is_user_collaborator(self.user, 'write'))
+
     def test_creating_board_creates_owner_collaborator(self):
         """
         Tests that a post_save signal creates a BoardCollaborator
@@ -88,6 +112,72 @@ class BoardTestCase(BaseTestCase):
 
         self.assertEqual(collaborators.count(), 2)
 
+    def test_announce_rooms_should_be_board_rooms(self):
+        """
+        Tests that boards announce to their own room, and to their
+        public room only while shared.
+        """
+        board_room = 'b{}'.format(self.board.id)
+
+        self.assertEqual(self.board.announce_rooms, [board_room])
+
+        self.board.is_shared = True
+
+        self.assertEqual(self.board.announce_rooms, [
+            board_room, '{}:public'.format(board_room)])
+
+    def create_file_card(self, name, board=None, **kwargs):
+        return Card.objects.create(
+            name=name, type='file', content='uploads/file.png',
+            board=board or self.board, created_by=self.user, **kwargs)
+
+    def assertThumbnail(self, board, thumbnail_path):
+        board = Board.objects.get(pk=board.pk)
+        self.assertEqual(board.thumbnail_sm_path, thumbnail_path)
+
+    def test_file_cards_should_update_board_thumbnails(self):
+        """
+        Tests that the board keeps the thumbnails of its first file
+        card as file cards are created, updated and deleted.
+        """
+        self.create_card()
+        self.assertThumbnail(self.board, None)
+
+        card = self.create_file_card('File')
+        self.assertThumbnail(self.board, None)
+
+        card.thumbnail_sm_path = 'thumbnails/sm.png'
+        card.save()
+        self.assertThumbnail(self.board, 'thumbnails/sm.png')
+
+        first_card = self.create_file_card(
+            'First File', position=0, thumbnail_sm_path='thumbnails/1.png')
+        self.assertThumbnail(self.board, 'thumbnails/1.png')
+
+        first_card.position = -1
+        first_card.save()
+        self.assertThumbnail(self.board, 'thumbnails/sm.png')
+
+        card.delete()
+        self.assertThumbnail(self.board, 'thumbnails/1.png')
+
+    def test_moving_file_card_should_update_both_boards_thumbnails(self):
+        """
+        Tests that moving a file card to another board updates the
+        thumbnails of both boards.
+        """
+        board = Board.objects.create(
+            name='Another Board', account=self.account, created_by=self.user)
+
+        card = self.create_file_card(
+            'File', thumbnail_sm_path='thumbnails/sm.png')
+
+        card.board = board
+        card.save()
+
+        self.assertThumbnail(self.board, None)
+        self.assertThumbnail(board, 'thumbnails/sm.png')
+
     def test_clone_board(self):
         """
         Tests that cloaning a board, clones its cards and comments into
@@ -105,7 +195,7 @@ class BoardTestCase(BaseTestCase):
             comments.append(self.create_another_comment(
                 'Comment {}'.format(i), obj=card))
 
-        with self.assertNumQueries(FuzzyInt(70, 80)):
+        with self.assertNumQueries(FuzzyInt(55, 70)):
             cloned_board = self.board.clone(account, user)
 
         cloned_cards = cloned_board.card_set.all()
@@ -197,6 +287,64 @@ class BoardCollaboratorTestCase(BaseTestCase):
 
         self.assertEqual(account_collaborators, 1)
 
+    def test_saving_should_clear_cached_permissions(self):
+        """
+        Tests that creating, updating and deleting a BoardCollaborator
+        clears its user's cached board permissions.
+        """
+        user = self.create_another_user()
+
+        self.assertFalse(self.board.is_user_collaborator(user))
+
+        collaborator = BoardCollaborator.objects.create(
+            board=self.board, user=user, created_by=self.user,
+            permission='read')
+
+        self.assertTrue(self.board.is_user_collaborator(user, 'read'))
+        self.assertFalse(self.board.is_user_collaborator(user, 'write'))
+
+        collaborator.permission = 'write'
+        collaborator.save()
+
+        self.assertTrue(self.board.is_user_collaborator(user, 'write'))
+
+        collaborator.delete()
+
+        self.assertFalse(self.board.is_user_collaborator(user))
+
+    def test_changing_user_should_clear_previous_user_permissions(self):
+        """
+        Tests that moving a BoardCollaborator to another user clears
+        the cached board permissions of both users.
+        """
+        user = self.create_another_user()
+
+        self.assertTrue(self.board.is_user_collaborator(self.user))
+
+        self.board_collaborator.user = user
+        self.board_collaborator.save()
+
+        self.assertFalse(self.board.is_user_collaborator(self.user))
+        self.assertTrue(self.board.is_user_collaborator(user))
+
+    def test_should_clear_cached_permissions_again_after_commit(self):
+        """
+        Tests that permissions cleared inside a transaction are cleared
+        again once it commits, in case the old rows were cached again.
+        """
+        key = BOARD_PERMISSIONS_CACHE_KEY.format(self.user.id)
+
+        self.board_collaborator.permission = 'read'
+        self.board_collaborator.save()
+
+        # Cached by a concurrent request before the transaction commits
+        cache.set(key, {self.board.id: 'write'})
+
+        with patch.object(connection, 'in_atomic_block', False):
+            clear_pending_cache_keys()
+
+        self.assertFalse(self.board.is_user_collaborator(self.user, 'write'))
+
     def test_unicode_slugs(self):
         board = Board.objects.create(
             name=smart_text('自転車'), account=self.account, created_by=self.user)
@@ -371,3 +519,150 @@ class BoardCollaboratorRequestTestCase(BaseTestCase):
         requests = BoardCollaboratorRequest.objects.all()
 
         self.assertEqual(requests.count(), 0)
+
+
+class BoardChangeTestCase(BaseTestCase):
+    def setUp(self):
+        self.create_user()
+        self.create_account()
+        self.create_board()
+
+    def test_model_should_have_expected_number_of_fields(self):
+        """
+        Tests the expected number of fields in model.
+        """
+        self.assertEqual(len(BoardChange._meta.fields), 5)
+
+    def test_announcing_should_record_board_room_changes(self):
+        """
+        Tests that messages announced to a board room are recorded.
+        """
+        cursor = BoardChange.objects.last_cursor(self.board.id)
+
+        self.create_card()
+
+        changes = BoardChange.objects.filter(
+            board_id=self.board.id, sequence__gt=cursor)
+
+        self.assertEqual(changes.count(), 1)
+        self.assertEqual(changes[0].sequence, cursor + 1)
+        self.assertEqual(changes[0].data['data_type'], 'card')
+        self.assertEqual(changes[0].data['method'], 'create')
+
+    @override_settings(ANNOUNCE_TEST_MODE=False)
+    def test_announcing_shouldnt_record_unpublished_changes(self):
+        """
+        Tests that messages that failed to publish aren't recorded.
+        """
+        cursor = BoardChange.objects.last_cursor(self.board.id)
+
+        with patch.object(Announcer, 'publish', side_effect=Exception), \
+                patch.object(Announcer, 'publish_many', side_effect=Exception):
+            self.create_card()
+
+        self.assertEqual(BoardChange.objects.last_cursor(self.board.id),
+                         cursor)
+
+    def test_last_cursor_should_only_cover_board_changes(self):
+        """
+        Tests that each board numbers its own changes from 1, and that
+        a board without changes is at 0.
+        """
+        board = Board.objects.create(
+            name='Another Board', account=self.account, created_by=self.user)
+        empty_board = Board.objects.create(
+            name='Empty Board', account=self.account, created_by=self.user)
+        BoardChange.objects.filter(board_id=empty_board.id).delete()
+
+        self.create_card()
+        board_cursor = BoardChange.objects.last_cursor(self.board.id)
+
+        self.create_anoter_card('Another Card', board=board)
+
+        sequences = BoardChange.objects.filter(
+            board_id=board.id).values_list('sequence', flat=True)
+
+        self.assertEqual(board_cursor,
+                         BoardChange.objects.last_cursor(self.board.id))
+        self.assertEqual(list(sequences), list(range(1, len(sequences) + 1)))
+        self.assertEqual(BoardChange.objects.last_cursor(board.id),
+                         len(sequences))
+        self.assertEqual(BoardChange.objects.last_cursor(empty_board.id), 0)
+
+    def test_record_should_skip_other_rooms(self):
+        """
+        Tests that only private board rooms are recorded.
+        """
+        messages = [
+            ({'id': 1}, 'b{}'.format(self.board.id)),
+            ({'id': 1}, 'b{}:public'.format(self.board.id)),
+            ({'id': 1}, 'a{}'.format(self.account.id)),
+            ({'id': 1}, 'u{}'.format(self.user.id)),
+        ]
+
+        changes = BoardChange.objects.record(messages)
+
+        self.assertEqual(len(changes), 1)
+
+    def test_record_should_number_concurrent_batches_in_order(self):
+        """
+        Tests that a batch numbered while another one for the same
+        board was being recorded is numbered again after it, without
+        waiting on a lock.
+        """
+        cursor = BoardChange.objects.last_cursor(self.board.id)
+        room = 'b{}'.format(self.board.id)
+
+        get_last_sequences = BoardChange.objects.get_last_sequences
+        batches = [[({'id': 2}, room), ({'id': 3}, room)]]
+
+        def record_concurrently(board_ids):
+            sequences = get_last_sequences(board_ids)
+
+            # The other batch is recorded once this one is numbered
+            if batches:
+                BoardChange.objects.record(batches.pop())
+
+            return sequences
+
+        with patch.object(BoardChange.objects, 'get_last_sequences',
+                          side_effect=record_concurrently), \
+                patch.object(Board.objects, 'select_for_update') as lock:
+            BoardChange.objects.record([({'id': 1}, room)])
+
+        changes = BoardChange.objects.filter(
+            board_id=self.board.id, sequence__gt=cursor)
+
+        self.assertEqual(
+            [(change.sequence, change.data['id']) for change in changes],
+            [(cursor + 1, 2), (cursor + 2, 3), (cursor + 3, 1)])
+        self.assertFalse(lock.called)
+
+    def test_trim_should_keep_recent_and_last_changes(self):
+        """
+        Tests that trim deletes old changes but keeps the last one
+        of each board.
+        """
+        board = Board.objects.create(
+            name='Another Board', account=self.account, created_by=self.user)
+
+        self.create_card()
+        self.create_anoter_card('Another Card', board=board)
+
+        last_cursors = [BoardChange.objects.last_cursor(self.board.id),
+                        BoardChange.objects.last_cursor(board.id)]
+
+        BoardChange.objects.update(
+            date_created=timezone.now() - datetime.timedelta(days=30))
+
+        before = timezone.now() - datetime.timedelta(days=7)
+        BoardChange.objects.trim(before)
+
+        cursors = BoardChange.objects.filter(
+            board_id__in=[self.board.id, board.id]).values_list(
+            'sequence', flat=True)
+
+        self.assertEqual(list(cursors), last_cursors)
+        self.assertTrue(BoardChange.objects.is_trimmed(self.board.id, 0))
+        self.assertFalse(BoardChange.objects.is_trimmed(
+            self.board.id, last_cursors[0] - 1))
@@ -101,6 +101,24 @@ class BoardPermissionTestCase(BaseTestCase):
 
         self.assertTrue(has_perm)
 
+    def test_membership_should_be_queried_once_per_request(self):
+        """
+        Tests that checking the same board again in a request
+        doesn't query the user's membership again.
+        """
+        request = self.factory.post('/')
+        request.user = self.user
+
+        view = mock_view(request)
+        view.action = 'update'
+
+        with self.assertNumQueries(1):
+            for i in range(3):
+                has_perm = self.perm_class.has_object_permission(
+                    request, view, self.board)
+
+        self.assertTrue(has_perm)
+
     def test_returns_false_for_user_without_write_perm(self):
         """
         Tests that `.has_object_permission` returns `False` for
@@ -340,6 +358,47 @@ class BoardCollaboratorPermissionTestCase(BaseTestCase):
 
         self.assertTrue(has_perm)
 
+    def test_bulk_create_should_check_each_board_once(self):
+        """
+        Tests that bulk creating for the same board only queries
+        the board and the user's membership once.
+        """
+        data = [self.data, self.data, self.data]
+
+        request = Request(self.factory.post('/', data, format='json'))
+        request.parsers = (JSONParser(), )
+        request.user = self.user
+
+        view = mock_view(request)
+        view.action = 'create'
+
+        with self.assertNumQueries(2):
+            has_perm = self.perm_class.has_permission(request, view)
+
+        self.assertTrue(has_perm)
+
+    def test_account_owner_should_be_checked_once(self):
+        """
+        Tests that the account owner check is only queried once
+        per request.
+        """
+        self.board_collaborator.delete()
+        self.board_collaborator.board = self.board
+
+        request = Request(self.factory.put('/', self.data, format='json'))
+        request.parsers = (JSONParser(), )
+        request.user = self.user
+
+        view = mock_view(request)
+        view.action = 'update'
+
+        with self.assertNumQueries(2):
+            for i in range(3):
+                has_perm = self.perm_class.has_object_permission(
+                    request, view, self.board_collaborator)
+
+        self.assertTrue(has_perm)
+
 
 class BoardCollaboratorRequestPermissionTestCase(BaseTestCase):
     def setUp(self):
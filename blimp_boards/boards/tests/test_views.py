@@ -1,13 +1,18 @@
 # -*- coding: utf8 -*-
 
+from django.conf import settings
+from django.test.utils import override_settings
 from django.utils.encoding import smart_text
+from mock import patch
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from ...utils.tests import AuthenticatedAPITestCase
+from ...files.utils import S3UrlSigner, get_s3_url_signer
+from ...utils.tests import AuthenticatedAPITestCase, FuzzyInt
 from ...invitations.models import InvitedUser
 from ...users.serializers import NestedUserSerializer
-from ..models import Board, BoardCollaborator, BoardCollaboratorRequest
+from ..models import (Board, BoardCollaborator, BoardCollaboratorRequest,
+                      BoardChange)
 
 
 class BoardViewSetTestCase(AuthenticatedAPITestCase):
@@ -64,6 +69,109 @@ class BoardViewSetTestCase(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, expected_response)
 
+    def test_viewset_list_shouldnt_query_per_board(self):
+        """
+        Tests that listing boards runs the same number of queries
+        however many boards, with file cards, are listed.
+        """
+        def create_file_card(board):
+            board.card_set.create(
+                name='File', type='file', content='uploads/file.png',
+                created_by=self.user)
+
+        create_file_card(self.board)
+
+        with self.assertNumQueries(FuzzyInt(1, 10)) as context:
+            self.client.get(self.base_url)
+
+        num_queries = len(context.captured_queries)
+
+        for i in range(3):
+            board = Board.objects.create(
+                name='Board {}'.format(i), account=self.account,
+                created_by=self.user)
+            create_file_card(board)
+
+        with self.assertNumQueries(num_queries):
+            response = self.client.get(self.base_url)
+
+        self.assertEqual(len(response.data), 4)
+
+    def test_viewset_should_only_return_requested_fields(self):
+        """
+        Tests that the `fields` query parameter limits the returned
+        fields and skips the joins they don't need.
+        """
+        with self.assertNumQueries(FuzzyInt(1, 10)) as context:
+            response = self.client.get(
+                self.base_url, {'fields': 'id,name,thumbnail_sm_path'})
+
+        joins = [query for query in context.captured_queries
+                 if 'FROM "boards_board"' in query['sql'] and
+                 'JOIN' in query['sql']]
+
+        expected_response = [{
+            'id': self.board.id,
+            'name': self.board.name,
+            'thumbnail_sm_path': None,
+        }]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, expected_response)
+        self.assertEqual(joins, [])
+
+    def test_viewset_collaborators_should_answer_not_modified(self):
+        """
+        Tests that listing a board's collaborators again with the
+        ETag of the previous response returns 304.
+        """
+        url = '{}{}/collaborators/'.format(self.base_url, self.board.id)
+
+        response = self.client.get(url)
+        not_modified = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(not_modified.status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+    def test_viewset_retrieve_should_honour_if_modified_since(self):
+        """
+        Tests that retrieving a board not modified since the given
+        date returns 304.
+        """
+        url = '{}{}/'.format(self.base_url, self.board.id)
+
+        response = self.client.get(url)
+        not_modified = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(not_modified.status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+    def test_viewset_retrieve_shouldnt_honour_stale_signature_window(self):
+        """
+        Tests that a board retrieved in a previous signature window
+        is returned again when only `If-Modified-Since` is sent, as
+        its signed URLs have changed since.
+        """
+        url = '{}{}/'.format(self.base_url, self.board.id)
+        expires = get_s3_url_signer().get_expires(
+            settings.AWS_SIGNATURE_EXPIRES_IN)
+
+        with patch.object(S3UrlSigner, 'get_expires', return_value=expires):
+            response = self.client.get(url)
+
+        with patch.object(S3UrlSigner, 'get_expires',
+                          return_value=expires + 60 * 60):
+            modified = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(modified['Last-Modified'],
+                            response['Last-Modified'])
+
     def test_viewset_shouldnt_return_boards_to_user_with_no_access(self):
         """
         Tests that viewset doesn't returns boards that the user can't access.
@@ -354,6 +462,133 @@ class BoardViewSetTestCase(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, expected_response)
 
+    def test_viewset_room_should_return_board_room_for_collaborator(self):
+        """
+        Tests that collaborators get the board's private room.
+        """
+        response = self.client.get(
+            '{}{}/room/'.format(self.base_url, self.board.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'room': 'b{}'.format(self.board.id)})
+
+    @override_settings(ANNOUNCE_PARTIAL_UPDATES=True)
+    def test_viewset_room_should_return_partial_room_on_request(self):
+        """
+        Tests that clients opting into partial updates get the
+        board's partial room.
+        """
+        response = self.client.get(
+            '{}{}/room/'.format(self.base_url, self.board.id),
+            {'partial': 'true'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'room': 'b{}:partial'.format(self.board.id)})
+
+    def test_viewset_room_should_return_public_room_for_shared_board(self):
+        """
+        Tests that anonymous users get the public room of shared boards.
+        """
+        self.board.is_shared = True
+        self.board.save()
+
+        self.client = APIClient()
+        response = self.client.get(
+            '{}{}/room/'.format(self.base_url, self.board.id))
+
+        expected_response = {
+            'room': 'b{}:public'.format(self.board.id)
+        }
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, expected_response)
+
+    def test_viewset_changes_should_return_current_cursor(self):
+        """
+        Tests that changes without a cursor only return the cursor.
+        """
+        response = self.client.get(
+            '{}{}/changes/'.format(self.base_url, self.board.id))
+
+        expected_response = {
+            'cursor': BoardChange.objects.last_cursor(self.board.id),
+            'has_more': False,
+            'changes': []
+        }
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, expected_response)
+
+    def test_viewset_changes_should_return_changes_after_cursor(self):
+        """
+        Tests that changes returns the board's changes after a cursor.
+        """
+        cursor = BoardChange.objects.last_cursor(self.board.id)
+
+        self.create_card()
+        data = {
+            'name': 'New Name',
+            'account': self.account.id,
+            'color': 'red'
+        }
+
+        self.client.patch(
+            '{}{}/'.format(self.base_url, self.board.id), data, format='json')
+
+        response = self.client.get(
+            '{}{}/changes/'.format(self.base_url, self.board.id),
+            {'cursor': cursor})
+
+        changes = [(change['data_type'], change['method'])
+                   for change in response.data['changes']]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(changes, [('card', 'create'), ('board', 'update')])
+        self.assertEqual(response.data['cursor'],
+                         BoardChange.objects.last_cursor(self.board.id))
+        self.assertEqual(response.data['changes'][-1]['cursor'],
+                         response.data['cursor'])
+
+    def test_viewset_changes_should_return_gone_for_trimmed_cursor(self):
+        """
+        Tests that changes responds with 410 when changes after the
+        cursor have been trimmed.
+        """
+        self.create_card()
+        self.create_card()
+
+        first_cursor = BoardChange.objects.first_cursor(self.board.id)
+        changes = BoardChange.objects.filter(board_id=self.board.id)
+        changes.filter(sequence=first_cursor + 1).delete()
+
+        response = self.client.get(
+            '{}{}/changes/'.format(self.base_url, self.board.id),
+            {'cursor': first_cursor - 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        changes.filter(sequence=first_cursor).delete()
+
+        response = self.client.get(
+            '{}{}/changes/'.format(self.base_url, self.board.id),
+            {'cursor': first_cursor - 1})
+
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_viewset_changes_should_return_gone_for_unknown_cursor(self):
+        """
+        Tests that changes responds with 410 for a cursor past the
+        board's last change.
+        """
+        cursor = BoardChange.objects.last_cursor(self.board.id)
+
+        response = self.client.get(
+            '{}{}/changes/'.format(self.base_url, self.board.id),
+            {'cursor': cursor + 1})
+
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
     def test_viewset_requires_authentication_to_modify_shared_board(self):
         """
         Tests that viewset should only allow anonymous users
@@ -1,16 +1,19 @@
 from rest_framework import status
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
-from rest_framework.decorators import action
+from rest_framework.decorators import action, link
 from rest_framework.renderers import TemplateHTMLRenderer
 from rest_framework.views import APIView
 
 from ..accounts.models import Account, AccountCollaborator
+from ..utils.announcer import get_subscription_room
 from ..utils.response import ErrorResponse
-from ..utils.mixins import BulkCreateModelMixin
+from ..utils.mixins import (BulkCreateModelMixin, ConditionalGetMixin,
+                            SparseFieldsMixin)
 from ..utils.viewsets import (ModelViewSet, CreateListRetrieveViewSet,
                               RetrieveUpdateDestroyViewSet)
-from .models import Board, BoardCollaborator, BoardCollaboratorRequest
+from .models import (Board, BoardCollaborator, BoardCollaboratorRequest,
+                     BoardChange)
 from .serializers import (BoardSerializer, BoardCollaboratorSerializer,
                           BoardCollaboratorPublicSerializer,
                           BoardCollaboratorRequestSerializer)
@@ -18,10 +21,24 @@ from .permissions import (BoardPermission, BoardCollaboratorPermission,
                           BoardCollaboratorRequestPermission)
 
 
-class BoardViewSet(ModelViewSet):
+class BoardViewSet(SparseFieldsMixin, ConditionalGetMixin, ModelViewSet):
     model = Board
     serializer_class = BoardSerializer
     permission_classes = (BoardPermission, )
+    changes_page_size = 500
+
+    sparse_select_related = {
+        'created_by': ('created_by', ),
+        'modified_by': ('modified_by', ),
+        'html_url': ('account', ),
+        'activity_html_url': ('account', ),
+    }
+
+    collaborators_select_related = {
+        'user_data': ('user', 'invited_user', ),
+        'created_by': ('created_by', ),
+        'modified_by': ('modified_by', ),
+    }
 
     def get_queryset(self):
         user = self.request.user
@@ -33,24 +50,25 @@ class BoardViewSet(ModelViewSet):
         public_boards = None
 
         if user.is_authenticated():
-            user_boards = user.boards.select_related('account')
+            user_boards = user.boards
 
         public_criteria = [
             (action == 'retrieve'),
-            (action == 'collaborators')
+            (action == 'collaborators'),
+            (action == 'room'),
         ]
 
         if any(public_criteria):
             public_boards = Board.objects.filter(is_shared=True)
 
-        if user_boards and public_boards:
+        if user_boards is not None and public_boards is not None:
             boards = user_boards | public_boards
-        elif user_boards:
+        elif user_boards is not None:
             boards = user_boards
-        elif public_boards:
+        elif public_boards is not None:
             boards = public_boards
 
-        return boards.select_related('created_by', 'modified_by')
+        return self.select_sparse_related(boards)
 
     def filter_queryset(self, queryset):
         user = self.request.user
@@ -71,12 +89,8 @@ class BoardViewSet(ModelViewSet):
         """
         Set modified_by before deleting board.
         """
-        obj.set_announce(False)
-
         obj.modified_by = self.request.user
-        obj.save()
-
-        obj.set_announce(True)
+        obj.save(only_dirty=True)
 
     @action(methods=['GET', 'POST'])
     def collaborators(self, request, pk=None):
@@ -116,19 +130,99 @@ class BoardViewSet(ModelViewSet):
             else:
                 return ErrorResponse(serializer.errors)
         else:
-            self.object_list = BoardCollaborator.objects.select_related(
-                'user', 'invited_user', 'created_by', 'modified_by'
-            ).filter(board=board)
+            self.object_list = self.select_sparse_related(
+                BoardCollaborator.objects.filter(board=board),
+                select_related=self.collaborators_select_related)
 
-            for collaborator in self.object_list:
-                user_ids.append(collaborator.user_id)
+            def respond():
+                for collaborator in self.object_list:
+                    user_ids.append(collaborator.user_id)
 
-            if not user.is_authenticated() or user.id not in user_ids:
-                self.serializer_class = BoardCollaboratorPublicSerializer
+                if not user.is_authenticated() or user.id not in user_ids:
+                    self.serializer_class = BoardCollaboratorPublicSerializer
 
-            serializer = self.get_serializer(self.object_list, many=True)
+                serializer = self.get_serializer(self.object_list, many=True)
 
-        return Response(serializer.data)
+                return Response(serializer.data)
+
+            return self.get_conditional_response(
+                self.get_queryset_validators(self.object_list), respond)
+
+    @link()
+    def room(self, request, pk=None):
+        """
+        Returns the announce room a client should subscribe to for a
+        board. Users that aren't collaborators get the public
+        read-only room of shared boards. With `partial=true`, the
+        room announcing only changed fields is returned.
+        """
+        board = self.get_object()
+        user = request.user
+
+        if user.is_authenticated() and board.is_user_collaborator(user):
+            room = board.announce_room
+        else:
+            room = board.public_announce_room
+
+        return Response({'room': get_subscription_room(room, request)})
+
+    @link()
+    def changes(self, request, pk=None):
+        """
+        Returns the changes announced for a board after a given
+        `cursor`, so reconnecting clients can catch up without
+        fetching everything again. Without a cursor only the current
+        cursor is returned. Responds with 410 if the cursor is older
+        than the retained changes, or unknown to the board.
+        """
+        board = self.get_object()
+        cursor = request.QUERY_PARAMS.get('cursor')
+        last_cursor = BoardChange.objects.last_cursor(board.id)
+
+        if cursor is None:
+            return Response({
+                'cursor': last_cursor,
+                'has_more': False,
+                'changes': []
+            })
+
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            return ErrorResponse({'cursor': ['Enter a whole number.']})
+
+        if cursor > last_cursor or BoardChange.objects.is_trimmed(
+                board.id, cursor):
+            return ErrorResponse(
+                'Changes after cursor are no longer available.',
+                status=status.HTTP_410_GONE)
+
+        page_size = self.changes_page_size
+
+        # Changes recorded while reading are left for the next call.
+        changes = list(BoardChange.objects.filter(
+            board_id=board.id, sequence__gt=cursor,
+            sequence__lte=last_cursor)[:page_size + 1])
+
+        has_more = len(changes) > page_size
+        changes = changes[:page_size]
+
+        if has_more:
+            cursor = changes[-1].sequence
+        else:
+            cursor = last_cursor
+
+        data = []
+
+        for change in changes:
+            change_data = dict(change.data, cursor=change.sequence)
+            data.append(change_data)
+
+        return Response({
+            'cursor': cursor,
+            'has_more': has_more,
+            'changes': data
+        })
 
     @action(methods=['POST'])
     def leave(self, request, pk=None):
@@ -144,7 +238,8 @@ class BoardViewSet(ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class BoardCollaboratorViewSet(BulkCreateModelMixin,
+class BoardCollaboratorViewSet(SparseFieldsMixin, ConditionalGetMixin,
+                               BulkCreateModelMixin,
                                RetrieveUpdateDestroyViewSet):
     model = BoardCollaborator
     serializer_class = BoardCollaboratorSerializer
@@ -166,12 +261,8 @@ class BoardCollaboratorViewSet(BulkCreateModelMixin,
         """
         Set modified_by before deleting board.
         """
-        obj.set_announce(False)
-
         obj.modified_by = self.request.user
-        obj.save()
-
-        obj.set_announce(True)
+        obj.save(only_dirty=True)
 
 
 class BoardCollaboratorRequestViewSet(CreateListRetrieveViewSet):
@@ -0,0 +1,49 @@
+from django import forms
+from django.core.exceptions import ValidationError
+
+from rest_framework import serializers
+
+from .models import Card
+
+
+class CardPositionField(serializers.WritableField):
+    """
+    A card's position as its 0-based index on the board, which is
+    what clients read and send, while cards store positions spaced
+    `Card.POSITION_GAP` apart. -1 appends a card to the board.
+
+    Incoming indexes are kept as they are; the serializer turns them
+    into a stored position once the card's board is known.
+    """
+    type_name = 'CardPositionField'
+    type_label = 'integer'
+    form_field_class = forms.IntegerField
+    empty = -1
+
+    default_error_messages = {
+        'invalid': 'Enter a whole number.',
+    }
+
+    def field_to_native(self, obj, field_name):
+        if obj is None or not obj.pk:
+            return self.empty
+
+        # Each board's order is read once per serializer context,
+        # which lists, and announcements flushed together, share.
+        board_indexes = self.context.setdefault('board_indexes', {})
+        indexes = board_indexes.get(obj.board_id)
+
+        if indexes is None:
+            ids = Card.objects.filter(board_id=obj.board_id).order_by(
+                'position', 'id').values_list('id', flat=True)
+
+            indexes = dict((pk, index) for index, pk in enumerate(ids))
+            board_indexes[obj.board_id] = indexes
+
+        return indexes.get(obj.pk, self.empty)
+
+    def from_native(self, value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValidationError(self.error_messages['invalid'])
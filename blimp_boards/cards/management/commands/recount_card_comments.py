@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Card
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the comments count of cards whose count is off.'
+
+    def handle(self, *args, **options):
+        count = Card.objects.recount_comments()
+
+        self.stdout.write('Updated the comments count of {} cards.'.format(
+            count))
@@ -1,10 +1,19 @@
 import jwt
-import positions
+import reversion
+
+from autoslug.utils import generate_unique_slug
 
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, models, transaction
+from django.db.models import F, Max, Q
+from django.db.models.loading import get_model
+from django.utils.timezone import now
+
+from ..utils.announcer import announcer
 
 
-class CardManager(positions.PositionManager):
+class CardManager(models.Manager):
     def get_from_download_token(self, token, **kwargs):
         try:
             payload = jwt.decode(token, settings.SECRET_KEY)
@@ -18,3 +27,310 @@ class CardManager(positions.PositionManager):
             return self.get(id=payload_id, **kwargs)
 
         raise self.model.DoesNotExist
+
+    def filter_board(self, board, exclude=None):
+        """
+        Returns the cards on a board, leaving out the cards whose ids
+        are in `exclude`.
+        """
+        cards = self.filter(board_id=board.id)
+        exclude = [pk for pk in exclude or () if pk is not None]
+
+        if exclude:
+            cards = cards.exclude(pk__in=exclude)
+
+        return cards
+
+    def get_next_position(self, board, exclude=None):
+        """
+        Returns the position after the last card on a board, making
+        room by rebalancing the board when positions run out.
+        """
+        gap = self.model.POSITION_GAP
+
+        cards = self.filter_board(board, exclude=exclude)
+        last = cards.aggregate(last=Max('position'))['last']
+
+        if last is None:
+            return gap
+
+        if last + gap > self.model.MAX_POSITION:
+            return self.rebalance(board, after=last, exclude=exclude)
+
+        return last + gap
+
+    def rebalance(self, board, after, exclude=None):
+        """
+        Spreads the positions of a board's cards `POSITION_GAP` apart,
+        keeping their order, and returns a free position right after
+        the cards positioned at or before `after`.
+
+        Only cards whose position changed are written, with a single
+        UPDATE. Their order, and so the index clients see, stays the
+        same, so they aren't announced or marked as modified.
+        """
+        gap = self.model.POSITION_GAP
+        position = gap // 2
+        positions = {}
+
+        cards = self.filter_board(board, exclude=exclude).order_by(
+            'position', 'id').values_list('id', 'position')
+
+        for index, (pk, current) in enumerate(cards, 1):
+            new_position = index * gap
+
+            if current <= after:
+                position = new_position + gap // 2
+
+            if current != new_position:
+                positions[pk] = new_position
+
+        self.set_positions(positions)
+
+        return position
+
+    def get_move_positions(self, board, count, before=None, exclude=None):
+        """
+        Returns `count` increasing free positions on a board, right
+        before the `before` card or after the board's last card.
+        The board is rebalanced when there's no room left for them.
+        """
+        gap = self.model.POSITION_GAP
+        cards = self.filter_board(board, exclude=exclude)
+
+        if before is None:
+            last = cards.aggregate(last=Max('position'))['last'] or 0
+
+            if last + gap * count > self.model.MAX_POSITION:
+                last = self.rebalance(board, after=last, exclude=exclude)
+
+            return [last + gap * index for index in range(1, count + 1)]
+
+        high = before.position
+        low = cards.filter(position__lt=high).aggregate(
+            low=Max('position'))['low'] or 0
+
+        step = (high - low) // (count + 1)
+
+        if not step:
+            self.rebalance(board, after=low, exclude=exclude)
+            return self.get_move_positions(
+                board, count, before=self.get(pk=before.pk),
+                exclude=exclude)
+
+        return [low + step * index for index in range(1, count + 1)]
+
+    def get_index(self, card):
+        """
+        Returns the 0-based index of a card among its board's cards.
+        """
+        cards = self.filter_board(card.board, exclude=[card.pk])
+
+        return cards.filter(
+            Q(position__lt=card.position) |
+            Q(position=card.position, id__lt=card.pk)).count()
+
+    def get_index_position(self, card, index):
+        """
+        Returns the position that places a card at a 0-based `index`
+        among the other cards on its board. Negative indexes count
+        from the end, -1 placing the card after the last one.
+        A card already at `index` keeps its position.
+        """
+        cards = self.filter_board(card.board, exclude=[card.pk])
+        count = cards.count()
+
+        if index < 0:
+            index = max(count + 1 + index, 0)
+
+        index = min(index, count)
+
+        if card.pk and card.position >= 0 and not card.has_field_changed(
+                'board') and self.get_index(card) == index:
+            return card.position
+
+        if index == count:
+            return self.get_next_position(card.board, exclude=[card.pk])
+
+        before = cards.order_by('position', 'id')[index]
+
+        return self.get_move_positions(
+            card.board, 1, before=before, exclude=[card.pk])[0]
+
+    def move(self, cards, board, before=None, user=None):
+        """
+        Moves cards to a board, in the given order, right before the
+        `before` card or after the board's last card.
+
+        New positions are written with a single UPDATE and recorded as
+        a single revision. Each card is announced as an 'update', and
+        the messages are sent together once the move is done.
+        Cards moved to another board get a new slug when theirs is
+        already taken there.
+        """
+        Board = get_model('boards', 'Board')
+
+        ids = [card.pk for card in cards]
+        date_modified = now()
+
+        with announcer.deferred(), transaction.atomic():
+            positions = self.get_move_positions(
+                board, len(cards), before=before, exclude=ids)
+
+            for card, position in zip(cards, positions):
+                card.board = board
+                card.position = position
+                card.date_modified = date_modified
+
+                if user:
+                    card.modified_by = user
+
+            self.update_positions(cards, board, date_modified, user=user)
+
+            moved = [card for card in cards if card.has_field_changed('board')]
+            self.update_moved_slugs(moved, board)
+
+            if any(card.type == 'file' for card in cards):
+                board_ids = set([board.id])
+                board_ids.update(card.get_field_diff('board')[0]
+                                 for card in moved)
+
+                for cover_board in Board.objects.filter(pk__in=board_ids):
+                    cover_board.update_thumbnails()
+
+            if reversion.is_registered(self.model):
+                reversion.default_revision_manager.save_revision(
+                    cards, user=user, comment='Moved cards.')
+
+            for card in cards:
+                card.announce('update', fields=('board', 'position', 'slug'))
+
+        return cards
+
+    def update_positions(self, cards, board, date_modified, user=None):
+        """
+        Writes the board and position of the given cards, and their
+        modification date and user, with a single UPDATE statement.
+        """
+        values = {'board': board.id, 'date_modified': date_modified}
+
+        if user:
+            values['modified_by'] = user.id
+
+        positions = dict((card.pk, card.position) for card in cards)
+
+        self.set_positions(positions, **values)
+
+    def set_positions(self, positions, **values):
+        """
+        Writes card positions, given as a dict of card ids to
+        positions, and sets the given field values on those cards,
+        with a single UPDATE statement. Ids and positions are inlined
+        as integers so large boards don't run into parameter limits.
+        """
+        if not positions:
+            return 0
+
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+
+        def column(name):
+            return qn(opts.get_field(name).column)
+
+        assignments = []
+        params = []
+
+        for name, value in values.items():
+            field = opts.get_field(name)
+            assignments.append('{} = %s'.format(qn(field.column)))
+            params.append(field.get_db_prep_save(value, connection))
+
+        ids = [int(pk) for pk in positions]
+
+        assignments.append('{} = CASE {} {} END'.format(
+            column('position'), column('id'), ' '.join(
+                'WHEN {} THEN {}'.format(pk, int(positions[pk]))
+                for pk in ids)))
+
+        sql = 'UPDATE {} SET {} WHERE {} IN ({})'.format(
+            qn(opts.db_table), ', '.join(assignments), column('id'),
+            ', '.join(str(pk) for pk in ids))
+
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
+
+        return cursor.rowcount
+
+    def update_moved_slugs(self, cards, board):
+        """
+        Gives cards moved to a board a new slug when another card on
+        the board already has theirs.
+        """
+        if not cards:
+            return None
+
+        field = self.model._meta.get_field('slug')
+        exclude = [card.pk for card in cards]
+
+        taken = set(self.filter_board(board, exclude=exclude).filter(
+            slug__in=[card.slug for card in cards]).values_list(
+            'slug', flat=True))
+
+        for card in cards:
+            if card.slug in taken:
+                card.slug = generate_unique_slug(field, card, card.slug, self)
+                self.filter(pk=card.pk).update(slug=card.slug)
+
+            taken.add(card.slug)
+
+    def update_comments_count(self, pk, count, date_modified=None):
+        """
+        Adds `count` to a card's comments count, and sets its
+        `date_modified`, now by default, with a single UPDATE.
+        """
+        return self.filter(pk=pk).update(
+            comments_count=F('comments_count') + count,
+            date_modified=date_modified or now())
+
+    def recount_comments(self):
+        """
+        Sets the comments count of every card whose count is off to
+        its number of comments, with a single UPDATE. Returns the
+        number of cards updated.
+        """
+        Comment = get_model('comments', 'Comment')
+
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+        comment_opts = Comment._meta
+
+        card_type = ContentType.objects.get_for_model(self.model)
+
+        date_modified = opts.get_field('date_modified').get_db_prep_value(
+            now(), connection)
+
+        count_sql = (
+            'SELECT COUNT(*) FROM {comments} '
+            'WHERE {comments}.{content_type} = %s '
+            'AND {comments}.{object_id} = {cards}.{id}').format(
+            comments=qn(comment_opts.db_table),
+            content_type=qn(comment_opts.get_field('content_type').column),
+            object_id=qn(comment_opts.get_field('object_id').column),
+            cards=qn(opts.db_table),
+            id=qn(opts.pk.column))
+
+        sql = (
+            'UPDATE {cards} SET {comments_count} = ({count}), '
+            '{date_modified} = %s WHERE {comments_count} <> ({count})').format(
+            cards=qn(opts.db_table),
+            comments_count=qn(opts.get_field('comments_count').column),
+            date_modified=qn(opts.get_field('date_modified').column),
+            count=count_sql)
+
+        with transaction.atomic(using=self.db):
+            cursor = connection.cursor()
+            cursor.execute(sql, [card_type.id, date_modified, card_type.id])
+
+        return cursor.rowcount
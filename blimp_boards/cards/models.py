@@ -1,5 +1,4 @@
 import jwt
-import positions
 import datetime
 
 from django.conf import settings
@@ -8,7 +7,6 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.core.urlresolvers import reverse
 from django.db import models
-from django.db.models import F
 from django.db.models.loading import get_model
 from django.db.models.signals import m2m_changed
 from django.dispatch import receiver
@@ -33,6 +31,13 @@ from .managers import CardManager
 @python_2_unicode_compatible
 class Card(BaseModel):
     PREVIEWABLE_TYPES = ('link', 'file', )
+
+    # Positions are spaced apart so moving a card between two others
+    # only writes the moved card. The board is rebalanced when there's
+    # no room left between them.
+    POSITION_GAP = 1024
+    MAX_POSITION = 2 ** 31 - 1
+
     TYPE_CHOICES = (
         ('link', 'Link'),
         ('note', 'Note'),
@@ -51,7 +56,7 @@ class Card(BaseModel):
     modified_by = models.ForeignKey('users.User',
                                     related_name='%(class)s_modified_by')
 
-    position = positions.PositionField(collection='board')
+    position = models.IntegerField(default=-1)
 
     stack = models.ForeignKey(
         'cards.Card', blank=True, null=True, related_name='+')
@@ -75,14 +80,32 @@ class Card(BaseModel):
     data = JSONField(blank=True, null=True, dump_kwargs={
                      'cls': JSONEncoder, 'separators': (',', ':')})
 
+    # The few values derived from `data` that are serialized, kept
+    # apart so card lists can defer the much larger `data`
+    cached_metadata = JSONField(blank=True, null=True, dump_kwargs={
+                                'cls': JSONEncoder, 'separators': (',', ':')})
+
     comments_count = models.PositiveIntegerField(default=0)
     comments = generic.GenericRelation('comments.Comment')
 
     objects = CardManager()
 
+    announce_field_map = {
+        'data': ('metadata', ),
+        'cached_metadata': ('metadata', ),
+    }
+
+    # Changing these on a file card can change its board's cover
+    board_cover_fields = ('board', 'position', 'type', 'thumbnail_xs_path',
+                          'thumbnail_sm_path', 'thumbnail_md_path',
+                          'thumbnail_lg_path', )
+
     class Meta:
         announce = True
-        ordering = ['position']
+        ordering = ['position', 'id']
+        index_together = [
+            ['board', 'position'],
+        ]
 
     def __str__(self):
         return self.name
@@ -105,9 +128,23 @@ class Card(BaseModel):
     def original_html_url(self):
         return '{}?original'.format(self.html_url)
 
-    @cached_property
+    @property
     def announce_room(self):
-        return 'a{}'.format(self.board.account_id)
+        return 'b{}'.format(self.board_id)
+
+    @property
+    def announce_rooms(self):
+        """
+        Returns the board's rooms, plus the previous board's room
+        when the card was moved to another board.
+        """
+        rooms = list(self.board.announce_rooms)
+        board_diff = self.get_field_diff('board')
+
+        if board_diff and board_diff[0]:
+            rooms.append('b{}'.format(board_diff[0]))
+
+        return rooms
 
     @cached_property
     def serializer_class(self):
@@ -118,6 +155,16 @@ class Card(BaseModel):
     def serializer(self):
         return self.serializer_class(self)
 
+    def to_dict(self, context=None):
+        """
+        Serializes the card with the given serializer `context`,
+        unless its serializer was already built.
+        """
+        if context is not None and 'serializer' not in self.__dict__:
+            self.serializer = self.serializer_class(self, context=context)
+
+        return self.serializer.data
+
     @property
     def signed_thumbnail_xs_path(self):
         if self.thumbnail_xs_path:
@@ -192,26 +239,34 @@ class Card(BaseModel):
 
         return sign_s3_url(url) if url else None
 
-    @cached_property
+    @property
     def pattern(self):
+        if not self.cached_metadata:
+            return None
+
+        return self.cached_metadata.get('pattern')
+
+    @property
+    def metadata(self):
+        return self.cached_metadata
+
+    def get_data_metadata(self):
+        """
+        Returns the metadata derived from the card's `data`.
+        """
         if not self.data:
             return None
 
         pattern = self.data.get('pattern')
 
         if pattern:
-            return {
+            pattern = {
                 'shape': pattern.get('shape'),
                 'color': pattern.get('color'),
             }
 
-    @cached_property
-    def metadata(self):
-        if not self.data:
-            return None
-
         return {
-            'pattern': self.pattern
+            'pattern': pattern or None
         }
 
     def save(self, *args, **kwargs):
@@ -224,6 +279,10 @@ class Card(BaseModel):
             self.modified_by_id = self.created_by_id
 
         self.clean()
+        self.set_position()
+
+        if not self.pk or self.has_field_changed('data'):
+            self.cached_metadata = self.get_data_metadata()
 
         return super(Card, self).save(*args, **kwargs)
 
@@ -232,8 +291,19 @@ class Card(BaseModel):
         if created:
             self.notify_created()
 
+        cover_changed = any(self.has_field_changed(field)
+                            for field in self.board_cover_fields)
+
+        if created or cover_changed:
+            self.update_board_thumbnails()
+
         super(Card, self).post_save(created, *args, **kwargs)
 
+    def post_delete(self, *args, **kwargs):
+        self.update_board_thumbnails()
+
+        super(Card, self).post_delete(*args, **kwargs)
+
     def clean(self):
         """
         Validates when card is a stack, that card specific fields arent' set.
@@ -262,6 +332,50 @@ class Card(BaseModel):
                 msg = 'The `{}` field should not be set on a card stack.'
                 raise ValidationError(msg.format(field))
 
+    def set_position(self):
+        """
+        Appends the card to its board when its position is negative,
+        or when it's moved to another board without a position.
+        A position already taken by another card on the board places
+        the card right after it.
+        """
+        position_changed = self.has_field_changed('position')
+        board_changed = self.has_field_changed('board')
+
+        if self.position is None or self.position < 0 or (
+                board_changed and not position_changed):
+            self.position = Card.objects.get_next_position(
+                self.board, exclude=[self.pk])
+        elif position_changed or board_changed or not self.pk:
+            taken = Card.objects.filter(
+                board_id=self.board_id, position=self.position).exclude(
+                pk=self.pk).exists()
+
+            if taken:
+                self.position = Card.objects.rebalance(
+                    self.board, after=self.position, exclude=[self.pk])
+
+    def update_board_thumbnails(self):
+        """
+        Updates the cover thumbnails of the card's board, and of its
+        previous board if it was moved, when the card is or was a file.
+        """
+        Board = get_model('boards', 'Board')
+
+        type_diff = self.get_field_diff('type')
+
+        if self.type != 'file' and not (type_diff and type_diff[0] == 'file'):
+            return None
+
+        board_ids = [self.board_id]
+        board_diff = self.get_field_diff('board')
+
+        if board_diff and board_diff[0]:
+            board_ids.append(board_diff[0])
+
+        for board in Board.objects.filter(pk__in=board_ids):
+            board.update_thumbnails()
+
     def request_previews(self):
         if self.type not in self.PREVIEWABLE_TYPES or not self.content:
             return None
@@ -364,20 +478,27 @@ class Card(BaseModel):
             extra_context=extra_context
         )
 
-    def update_comments_count(self, count=1):
-        # Temporarily turn off announce
-        self.set_announce(False)
+    def update_comments_count(self, count=1, refresh=True):
+        """
+        Adds `count` to the card's comments count with a single UPDATE
+        and announces the new count. With `refresh` the count is read
+        back from the database, otherwise it's only added in memory.
+        """
+        date_modified = now()
+
+        Card.objects.update_comments_count(self.pk, count, date_modified)
+
+        if refresh:
+            self.comments_count = Card.objects.filter(
+                pk=self.pk).values_list('comments_count', flat=True).get()
+        else:
+            self.comments_count += count
 
-        # Update comments count safely
-        self.comments_count = F('comments_count') + count
-        self.save()
+        self.date_modified = date_modified
 
-        # Turn on announce
-        self.set_announce(True)
+        self.set_fields_saved('comments_count', 'date_modified')
 
-        # Reload object and trigger post_save/announce
-        card = Card.objects.get(pk=self.pk)
-        card.post_save(instance=card, created=False)
+        self.announce('update', fields=['comments_count'])
 
 
 @receiver(m2m_changed, sender=Card.cards.through)
@@ -1,8 +1,10 @@
 from rest_framework import serializers
 
 from ..comments.serializers import CommentSerializer
+from ..utils.fields import ListField
 from ..utils.serializers import DynamicFieldsModelSerializer
 from ..users.serializers import NestedUserSerializer
+from .fields import CardPositionField
 from .models import Card
 
 
@@ -21,10 +23,12 @@ class CardSerializer(DynamicFieldsModelSerializer):
 
     metadata = serializers.WritableField(required=False, source='metadata')
 
+    position = CardPositionField(required=False)
+
     class Meta:
         model = Card
         read_only_fields = ('slug', 'stack', 'comments_count')
-        exclude = ('data', )
+        exclude = ('data', 'cached_metadata', )
 
     def validate_metadata(self, attrs, source):
         metadata = attrs.get(source)
@@ -67,8 +71,9 @@ class CardSerializer(DynamicFieldsModelSerializer):
 
         valid_metadata = getattr(self, 'valid_metadata', None)
 
+        # Replace rather than update the dict so the change is tracked
         if obj.data and valid_metadata:
-            obj.data.update(valid_metadata)
+            obj.data = dict(obj.data, **valid_metadata)
         elif valid_metadata:
             obj.data = valid_metadata
 
@@ -88,7 +93,14 @@ class CardSerializer(DynamicFieldsModelSerializer):
         if 'metadata' in attrs:
             del attrs['metadata']
 
-        return super(CardSerializer, self).restore_object(attrs, instance)
+        index = attrs.pop('position', None)
+
+        card = super(CardSerializer, self).restore_object(attrs, instance)
+
+        if index is not None:
+            card.position = Card.objects.get_index_position(card, index)
+
+        return card
 
 
 class StackSerializer(CardSerializer):
@@ -98,7 +110,8 @@ class StackSerializer(CardSerializer):
         exclude = ('origin_url', 'content', 'thumbnail_xs_path',
                    'thumbnail_sm_path', 'thumbnail_md_path',
                    'thumbnail_lg_path', 'file_size',
-                   'mime_type', 'stack', 'data', 'metadata',
+                   'mime_type', 'stack', 'data', 'cached_metadata',
+                   'metadata',
                    'download_html_url', 'original_html_url',
                    'comments_count', )
 
@@ -112,7 +125,12 @@ class StackSerializer(CardSerializer):
 
         request = self.context['request']
 
-        user_cards_ids = request.user.cards.values_list('id', flat=True)
+        card_ids = [card.id for card in cards]
+        user_cards_ids = set()
+
+        if card_ids:
+            user_cards_ids = set(request.user.cards.filter(
+                pk__in=card_ids).values_list('id', flat=True))
 
         for card in cards:
             if card.type == 'stack' or card == self.object \
@@ -139,4 +157,48 @@ class CardCommentSerializer(CommentSerializer):
 
         if not created:
             card.notify_comment_created(user, obj)
-            card.update_comments_count(count=1)
\ No newline at end of file
+            card.update_comments_count(count=1)
+
+
+class MoveCardsSerializer(serializers.Serializer):
+    """
+    Validates the cards to move, in order, the board to move them to
+    and the card to place them before.
+    """
+    MAX_CARDS = 500
+
+    cards = ListField()
+    board = serializers.IntegerField()
+    before = serializers.IntegerField(required=False)
+
+    def validate_cards(self, attrs, source):
+        ids = attrs.get(source) or []
+
+        if not ids:
+            raise serializers.ValidationError('This field is required.')
+
+        if len(ids) > self.MAX_CARDS:
+            msg = 'Ensure this list has at most {} items.'
+            raise serializers.ValidationError(msg.format(self.MAX_CARDS))
+
+        try:
+            ids = [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            raise serializers.ValidationError('Enter a list of ids.')
+
+        if len(set(ids)) != len(ids):
+            msg = 'Ensure each card is only listed once.'
+            raise serializers.ValidationError(msg)
+
+        attrs[source] = ids
+
+        return attrs
+
+    def validate(self, attrs):
+        before = attrs.get('before')
+
+        if before and before in attrs.get('cards', []):
+            msg = 'The `before` card should not be one of the moved cards.'
+            raise serializers.ValidationError(msg)
+
+        return attrs
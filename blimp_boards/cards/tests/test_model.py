@@ -1,6 +1,12 @@
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 
+from mock import patch
+
+from ...utils.announcer import Announcer, AnnounceQueue
 from ...utils.tests import BaseTestCase
+from ...boards.models import Board
 from ..models import Card
 
 
@@ -14,7 +20,7 @@ class CardTestCase(BaseTestCase):
         """
         Tests the expected number of fields in model.
         """
-        self.assertEqual(len(Card._meta.fields), 23)
+        self.assertEqual(len(Card._meta.fields), 24)
 
     def test_model_should_validate_card_content(self):
         """
@@ -97,3 +103,244 @@ class CardTestCase(BaseTestCase):
             board=self.board, created_by=self.user)
 
         self.assertEqual(card.slug, 'my-file-jpg')
+
+    @override_settings(ANNOUNCE_PARTIAL_UPDATES=True)
+    def test_model_should_announce_changed_fields_on_update(self):
+        """
+        Tests that updates only announce changed fields to the
+        partial room when partial updates are enabled, and still
+        announce the whole card to the board room.
+        """
+        self.create_card()
+        self.card.name = 'New Name'
+
+        with patch.object(Announcer, 'emit') as emit:
+            self.card.save()
+
+        messages = dict((call[1]['room'], call[0][0])
+                        for call in emit.call_args_list)
+
+        room = 'b{}'.format(self.board.id)
+        data = messages['{}:partial'.format(room)]
+
+        self.assertEqual(data['method'], 'update')
+        self.assertTrue(data['partial'])
+        self.assertEqual(
+            set(data['data'].keys()), set(['id', 'date_modified', 'name']))
+        self.assertEqual(data['data']['name'], 'New Name')
+        self.assertNotIn('partial', messages[room])
+        self.assertEqual(messages[room]['data']['content'], self.card.content)
+
+    def test_model_should_announce_whole_card_by_default(self):
+        """
+        Tests that updates announce the whole card by default.
+        """
+        self.create_card()
+        self.card.name = 'New Name'
+
+        with patch.object(Announcer, 'emit') as emit:
+            self.card.save()
+
+        data = emit.call_args[0][0]
+
+        self.assertNotIn('partial', data)
+        self.assertEqual(data['data']['content'], self.card.content)
+
+    def test_model_should_announce_moved_card_to_both_boards(self):
+        """
+        Tests that moving a card announces it to the rooms of the
+        previous and the new board.
+        """
+        self.create_card()
+        old_board = self.board
+        new_board = Board.objects.create(
+            name='Another Board', account=self.account,
+            created_by=self.user)
+
+        self.card.board = new_board
+
+        with patch.object(Announcer, 'emit') as emit:
+            self.card.save()
+
+        rooms = [call[1]['room'] for call in emit.call_args_list]
+
+        self.assertEqual(rooms, [
+            'b{}'.format(new_board.id), 'b{}'.format(old_board.id)])
+
+    def test_model_should_read_board_order_once_per_announcement(self):
+        """
+        Tests that cards announced together read their board's
+        order once for all of their positions.
+        """
+        self.create_card()
+        self.create_anoter_card('Another Card')
+
+        queue = AnnounceQueue()
+
+        for card in Card.objects.filter(board=self.board):
+            queue.add(card, 'update', 'b{}'.format(self.board.id))
+
+        with CaptureQueriesContext(connection) as context:
+            messages = queue.messages()
+
+        positions = [data['data']['position'] for data, room in messages]
+        orders = [query for query in context.captured_queries
+                  if 'SELECT "cards_card"."id" FROM' in query['sql']]
+
+        self.assertEqual(positions, [0, 1])
+        self.assertEqual(len(orders), 1)
+
+    def test_model_should_append_cards_with_gaps(self):
+        """
+        Tests that new cards are appended to their board leaving
+        room for cards moved in between.
+        """
+        first_card = self.create_anoter_card('First Card')
+        second_card = self.create_anoter_card('Second Card')
+
+        self.assertEqual(first_card.position, Card.POSITION_GAP)
+        self.assertEqual(second_card.position, Card.POSITION_GAP * 2)
+
+    def test_model_should_move_card_by_updating_it_alone(self):
+        """
+        Tests that moving a card between two others only writes
+        the moved card.
+        """
+        first_card = self.create_anoter_card('First Card')
+        second_card = self.create_anoter_card('Second Card')
+        third_card = self.create_anoter_card('Third Card')
+
+        third_card.position = (first_card.position + second_card.position) // 2
+
+        with CaptureQueriesContext(connection) as context:
+            third_card.save(only_dirty=True)
+
+        updates = [query['sql'] for query in context.captured_queries
+                   if 'UPDATE "cards_card"' in query['sql']]
+
+        cards = Card.objects.filter(board=self.board)
+
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(list(cards), [first_card, third_card, second_card])
+
+    def test_model_should_rebalance_board_when_position_is_taken(self):
+        """
+        Tests that moving a card to a taken position rebalances the
+        board and places the card after the card holding it.
+        """
+        first_card = self.create_anoter_card('First Card')
+        second_card = self.create_anoter_card('Second Card')
+        third_card = self.create_anoter_card('Third Card')
+
+        Card.objects.filter(pk=second_card.pk).update(
+            position=first_card.position + 1)
+
+        third_card.position = first_card.position
+        third_card.save()
+
+        cards = Card.objects.filter(board=self.board)
+        positions = list(cards.values_list('position', flat=True))
+
+        self.assertEqual(list(cards), [first_card, third_card, second_card])
+        self.assertEqual(positions, [Card.POSITION_GAP,
+                                     Card.POSITION_GAP * 3 // 2,
+                                     Card.POSITION_GAP * 2])
+
+    def test_model_should_rebalance_board_in_one_statement(self):
+        """
+        Tests that rebalancing a board writes every moved position
+        with a single UPDATE, keeping the cards' order.
+        """
+        cards = [self.create_anoter_card('Card {}'.format(i))
+                 for i in range(3)]
+
+        for card in cards:
+            Card.objects.filter(pk=card.pk).update(position=card.pk)
+
+        with CaptureQueriesContext(connection) as context:
+            Card.objects.rebalance(self.board, after=0)
+
+        updates = [query['sql'] for query in context.captured_queries
+                   if 'UPDATE "cards_card"' in query['sql']]
+
+        positions = Card.objects.filter(board=self.board).values_list(
+            'position', flat=True)
+
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(list(positions), [Card.POSITION_GAP,
+                                           Card.POSITION_GAP * 2,
+                                           Card.POSITION_GAP * 3])
+
+    def test_model_should_append_card_moved_to_another_board(self):
+        """
+        Tests that a card moved to another board without a new
+        position is appended to it.
+        """
+        self.create_card()
+        board = Board.objects.create(
+            name='Another Board', account=self.account,
+            created_by=self.user)
+        card = self.create_anoter_card('Another Card', board=board)
+
+        self.card.board = board
+        self.card.save()
+
+        self.assertEqual(self.card.position, card.position + Card.POSITION_GAP)
+
+    def test_model_should_keep_metadata_apart_from_data(self):
+        """
+        Tests that the metadata derived from data is stored apart,
+        and updated when data changes.
+        """
+        self.create_card()
+
+        self.card.data = {
+            'pattern': {'shape': 'circle', 'color': 'blue', 'size': 3},
+            'thumbnails': [],
+        }
+        self.card.save()
+
+        card = Card.objects.defer('data').get(pk=self.card.pk)
+
+        self.assertEqual(card.metadata, {
+            'pattern': {'shape': 'circle', 'color': 'blue'}})
+
+    def test_model_should_update_comments_count_in_one_update(self):
+        """
+        Tests that updating the comments count writes it with a single
+        UPDATE and announces the new count once.
+        """
+        self.create_card()
+
+        with CaptureQueriesContext(connection) as context, \
+                patch.object(Card, 'announce') as announce:
+            self.card.update_comments_count(count=2, refresh=False)
+
+        updates = [query['sql'] for query in context.captured_queries
+                   if 'UPDATE "cards_card"' in query['sql']]
+
+        card = Card.objects.get(pk=self.card.pk)
+
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.card.comments_count, 2)
+        self.assertEqual(card.comments_count, 2)
+        self.assertEqual(self.card.date_modified, card.date_modified)
+        self.assertFalse(self.card.has_field_changed('comments_count'))
+        announce.assert_called_once_with('update', fields=['comments_count'])
+
+    def test_manager_should_recount_comments(self):
+        """
+        Tests that recounting comments fixes the cards whose count
+        is off, and only those.
+        """
+        self.create_card()
+        self.create_comment()
+        card = self.create_anoter_card('Another Card')
+
+        Card.objects.filter(pk=self.card.pk).update(comments_count=5)
+
+        updated = Card.objects.recount_comments()
+
+        self.assertEqual(updated, 1)
+        self.assertEqual(Card.objects.get(pk=self.card.pk).comments_count, 1)
+        self.assertEqual(Card.objects.get(pk=card.pk).comments_count, 0)
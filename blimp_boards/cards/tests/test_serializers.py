@@ -1,3 +1,6 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from rest_framework.test import APIRequestFactory
 
 from ...utils.tests import BaseTestCase
@@ -81,7 +84,7 @@ class CardSerializerTestCase(BaseTestCase):
             'created_by': serializer.data['created_by'],
             'modified_by': serializer.data['modified_by'],
             'id': serializer.object.id,
-            'position': serializer.object.position,
+            'position': 0,
             'date_created': serializer.object.date_created,
             'date_modified': serializer.object.date_modified,
             'name': self.data['name'],
@@ -141,7 +144,7 @@ class CardSerializerTestCase(BaseTestCase):
             'created_by': serializer.data['created_by'],
             'modified_by': serializer.data['modified_by'],
             'id': serializer.object.id,
-            'position': serializer.object.position,
+            'position': 1,
             'date_created': serializer.object.date_created,
             'date_modified': serializer.object.date_modified,
             'name': data['name'],
@@ -169,6 +172,91 @@ class CardSerializerTestCase(BaseTestCase):
 
         self.assertEqual(serializer.data, expected_data)
 
+    def test_serializer_should_use_board_indexes_as_positions(self):
+        """
+        Tests that positions are read and written as 0-based indexes
+        on the card's board, whatever positions cards are stored at.
+        """
+        request = self.factory.put('/')
+        request.user = self.user
+
+        first_card = self.create_anoter_card('First Card')
+        second_card = self.create_anoter_card('Second Card')
+        third_card = self.create_anoter_card('Third Card')
+
+        serializer = self.serializer_class(
+            third_card, data={'position': 0}, partial=True,
+            context={'request': request})
+        serializer.is_valid()
+        serializer.save()
+
+        cards = Card.objects.filter(board=self.board)
+
+        self.assertEqual(list(cards), [third_card, first_card, second_card])
+        self.assertEqual(serializer.data['position'], 0)
+
+        serializer = self.serializer_class(cards, many=True)
+
+        self.assertEqual([card['position'] for card in serializer.data],
+                         [0, 1, 2])
+
+    def test_serializer_should_read_indexes_after_cards_move(self):
+        """
+        Tests that indexes aren't kept between serializers, so a list
+        reflects cards moved since the previous one.
+        """
+        first_card = self.create_anoter_card('First Card')
+        second_card = self.create_anoter_card('Second Card')
+
+        cards = Card.objects.filter(board=self.board)
+        serializer = self.serializer_class(cards, many=True)
+
+        self.assertEqual([card['id'] for card in serializer.data],
+                         [first_card.id, second_card.id])
+
+        Card.objects.move([second_card], self.board, before=first_card)
+
+        serializer = self.serializer_class(cards.all(), many=True)
+
+        self.assertEqual(
+            dict((card['id'], card['position']) for card in serializer.data),
+            {second_card.id: 0, first_card.id: 1})
+
+    def test_serializer_should_read_board_order_once(self):
+        """
+        Tests that serializing a card reads its board's order in one
+        query, without counting the cards before it.
+        """
+        card = self.create_anoter_card('Card')
+
+        with CaptureQueriesContext(connection) as context:
+            data = self.serializer_class(card).data
+
+        queries = [query['sql'] for query in context.captured_queries
+                   if 'FROM "cards_card" WHERE' in query['sql']]
+
+        self.assertEqual(data['position'], 0)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT(', queries[0])
+
+    def test_serializer_should_keep_position_of_card_at_index(self):
+        """
+        Tests that sending a card's current index doesn't move it.
+        """
+        request = self.factory.put('/')
+        request.user = self.user
+
+        self.create_anoter_card('First Card')
+        card = self.create_anoter_card('Second Card')
+        position = card.position
+
+        serializer = self.serializer_class(
+            card, data={'position': 1}, partial=True,
+            context={'request': request})
+        serializer.is_valid()
+
+        self.assertEqual(serializer.object.position, position)
+
 
 class StackSerializerTestCase(BaseTestCase):
     def setUp(self):
@@ -239,7 +327,7 @@ class StackSerializerTestCase(BaseTestCase):
             'created_by': serializer.data['created_by'],
             'modified_by': serializer.data['modified_by'],
             'id': serializer.object.id,
-            'position': serializer.object.position,
+            'position': 1,
             'date_created': serializer.object.date_created,
             'date_modified': serializer.object.date_modified,
             'name': self.data['name'],
@@ -286,7 +374,7 @@ class StackSerializerTestCase(BaseTestCase):
             'created_by': serializer.data['created_by'],
             'modified_by': serializer.data['modified_by'],
             'id': serializer.object.id,
-            'position': serializer.object.position,
+            'position': 2,
             'date_created': serializer.object.date_created,
             'date_modified': serializer.object.date_modified,
             'name': data['name'],
@@ -336,6 +424,31 @@ class StackSerializerTestCase(BaseTestCase):
 
         self.assertEqual(serializer.errors, expected_errors)
 
+    def test_validate_cards_should_check_access_in_one_query(self):
+        """
+        Tests that serializer's `.validate_cards` checks access to
+        only the submitted cards, in a single query.
+        """
+        request = self.factory.post('/')
+        request.user = self.user
+
+        context = {
+            'request': request,
+            'view': CardViewSet.as_view()
+        }
+
+        cards = [Card.objects.create(
+            name='Card {}'.format(i), type='note', content='abc123',
+            board=self.board, created_by=self.user) for i in range(3)]
+
+        attrs = {'type': 'stack', 'cards': cards}
+        serializer = self.serializer_class(context=context)
+
+        with self.assertNumQueries(1):
+            serializer.validate_cards(attrs, 'cards')
+
+        self.assertEqual(attrs['cards'], cards)
+
     def test_validate_cards_shouldnt_add_stack(self):
         """
         Tests that serializer's `.validate_cards` validates
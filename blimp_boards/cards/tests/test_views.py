@@ -1,6 +1,11 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from mock import patch
+
+from ...utils.announcer import Announcer
 from ...utils.tests import AuthenticatedAPITestCase
 from ...boards.models import Board
 from ...comments.models import Comment
@@ -53,7 +58,7 @@ class CardViewSetTestCase(AuthenticatedAPITestCase):
             'created_by': created_by,
             'modified_by': modified_by,
             'id': self.card.id,
-            'position': self.card.position,
+            'position': 0,
             'date_created': self.card.date_created,
             'date_modified': self.card.date_modified,
             'name': self.card.name,
@@ -82,6 +87,89 @@ class CardViewSetTestCase(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, expected_response)
 
+    def test_viewset_should_paginate_cards_by_cursor(self):
+        """
+        Tests that listing with a `limit` returns pages of cards in
+        position order, following the cursor of each page.
+        """
+        cards = [self.card] + [
+            self.create_anoter_card('Card {}'.format(i)) for i in range(4)]
+
+        params = {'board': self.board.id, 'limit': 2}
+        pages = []
+
+        while True:
+            response = self.client.get(self.base_url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            pages.append([card['id'] for card in response.data['results']])
+
+            if not response.data['next']:
+                break
+
+            params['cursor'] = response.data['cursor']
+            self.assertIn('cursor={}'.format(params['cursor']),
+                          response.data['next'])
+
+        self.assertEqual(pages, [
+            [cards[0].id, cards[1].id],
+            [cards[2].id, cards[3].id],
+            [cards[4].id]])
+
+    def test_viewset_cursor_pagination_shouldnt_count(self):
+        """
+        Tests that a page is fetched without counting all cards.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.base_url, {'limit': 1})
+
+        count_queries = [query for query in context.captured_queries
+                         if 'COUNT(' in query['sql']]
+
+        self.assertEqual(response.data['next'], None)
+        self.assertEqual(count_queries, [])
+
+    def test_viewset_cursor_pagination_should_answer_not_modified(self):
+        """
+        Tests that a page fetched again with the ETag of the previous
+        response returns 304 until one of its cards changes.
+        """
+        data = {'limit': 1}
+
+        response = self.client.get(self.base_url, data)
+        etag = response['ETag']
+
+        not_modified = self.client.get(
+            self.base_url, data, HTTP_IF_NONE_MATCH=etag)
+
+        self.card.name = 'Renamed Card'
+        self.card.save()
+
+        modified = self.client.get(
+            self.base_url, data, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(not_modified.status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(modified['ETag'], etag)
+
+    def test_viewset_should_validate_cursor(self):
+        """
+        Tests that an invalid cursor is rejected.
+        """
+        response = self.client.get(
+            self.base_url, {'limit': 1, 'cursor': 'invalid'})
+
+        expected_response = {
+            'error': {
+                'cursor': ['Invalid cursor.']
+            }
+        }
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, expected_response)
+
     def test_viewset_shouldnt_return_cards_to_user_with_no_access(self):
         """
         Tests that viewset doesn't returns cards that the user can't access.
@@ -135,7 +223,7 @@ class CardViewSetTestCase(AuthenticatedAPITestCase):
             'created_by': created_by,
             'modified_by': modified_by,
             'id': self.card.id,
-            'position': self.card.position,
+            'position': 0,
             'date_created': self.card.date_created,
             'date_modified': self.card.date_modified,
             'name': self.card.name,
@@ -202,7 +290,7 @@ class CardViewSetTestCase(AuthenticatedAPITestCase):
             'created_by': created_by,
             'modified_by': modified_by,
             'id': card.id,
-            'position': card.position,
+            'position': 1,
             'date_created': card.date_created,
             'date_modified': card.date_modified,
             'name': card.name,
@@ -253,7 +341,7 @@ class CardViewSetTestCase(AuthenticatedAPITestCase):
             'date_created': card.date_created,
             'date_modified': card.date_modified,
             'name': self.data['name'],
-            'position': card.position,
+            'position': 0,
             'slug': card.slug,
             'type': card.type,
             'board': card.board_id,
@@ -289,6 +377,40 @@ class CardViewSetTestCase(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(response.data, None)
 
+    def test_viewset_should_announce_deleted_card_once(self):
+        """
+        Tests that deleting a card announces a single delete event
+        once the request is done.
+        """
+        with patch.object(Announcer, 'emit_many') as emit_many:
+            self.client.delete('{}{}/'.format(self.base_url, self.card.id))
+
+        messages = emit_many.call_args[0][0]
+
+        self.assertEqual(emit_many.call_count, 1)
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0][0]['method'], 'delete')
+        self.assertEqual(messages[0][0]['data']['id'], self.card.id)
+
+    def test_viewset_update_should_check_membership_once(self):
+        """
+        Tests that updating a card only queries the user's board
+        membership once.
+        """
+        self.data['content'] = 'updated content...'
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(
+                '{}{}/'.format(self.base_url, self.card.id),
+                self.data, format='json')
+
+        membership_queries = [
+            query for query in context.captured_queries
+            if '"boards_boardcollaborator"."permission" FROM' in query['sql']]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(membership_queries), 1)
+
     def test_viewset_should_partially_update_board(self):
         """
         Tests that PATCH to viewset partially updates the card.
@@ -310,7 +432,7 @@ class CardViewSetTestCase(AuthenticatedAPITestCase):
             'date_created': card.date_created,
             'date_modified': card.date_modified,
             'name': self.data['name'],
-            'position': card.position,
+            'position': 0,
             'slug': card.slug,
             'type': card.type,
             'board': card.board_id,
@@ -357,7 +479,7 @@ class CardViewSetTestCase(AuthenticatedAPITestCase):
             'created_by': created_by,
             'modified_by': modified_by,
             'id': self.card.id,
-            'position': self.card.position,
+            'position': 0,
             'date_created': self.card.date_created,
             'date_modified': self.card.date_modified,
             'name': self.card.name,
@@ -386,6 +508,108 @@ class CardViewSetTestCase(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, expected_response)
 
+    def test_viewset_should_only_return_requested_fields(self):
+        """
+        Tests that the `fields` query parameter limits the returned
+        fields and skips joining users that weren't requested.
+        """
+        data = {
+            'board': self.board.id,
+            'fields': 'id,name,position,thumbnail_sm_path',
+        }
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.base_url, data)
+
+        user_joins = [query for query in context.captured_queries
+                      if 'JOIN "users_user"' in query['sql']]
+
+        expected_response = [{
+            'id': self.card.id,
+            'name': self.card.name,
+            'position': 0,
+            'thumbnail_sm_path': None,
+        }]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, expected_response)
+        self.assertEqual(user_joins, [])
+
+    def test_viewset_should_leave_out_excluded_fields(self):
+        """
+        Tests that the `exclude` query parameter leaves out fields.
+        """
+        response = self.client.get('{}{}/'.format(
+            self.base_url, self.card.id), {'exclude': 'created_by,html_url'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('created_by', response.data)
+        self.assertNotIn('html_url', response.data)
+        self.assertIn('modified_by', response.data)
+
+    def test_viewset_list_should_defer_card_data(self):
+        """
+        Tests that listing cards doesn't load their `data`.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.base_url, {'board': self.board.id})
+
+        card_queries = [query['sql'] for query in context.captured_queries
+                        if 'FROM "cards_card"' in query['sql'] and
+                        '"cards_card_cards"' not in query['sql']]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(card_queries)
+        self.assertFalse(any('"cards_card"."data"' in sql
+                             for sql in card_queries))
+
+    def test_viewset_list_should_answer_not_modified(self):
+        """
+        Tests that listing cards again with the ETag of the previous
+        response returns 304 until a card changes.
+        """
+        data = {'board': self.board.id}
+
+        response = self.client.get(self.base_url, data)
+        etag = response['ETag']
+
+        with patch('blimp_boards.cards.serializers.CardSerializer.to_native') \
+                as to_native:
+            not_modified = self.client.get(
+                self.base_url, data, HTTP_IF_NONE_MATCH=etag)
+
+        self.card.name = 'Renamed Card'
+        self.card.save()
+
+        modified = self.client.get(
+            self.base_url, data, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(not_modified.status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified['ETag'], etag)
+        self.assertFalse(to_native.called)
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(modified['ETag'], etag)
+
+    def test_viewset_list_should_change_etag_when_card_is_deleted(self):
+        """
+        Tests that deleting a card that isn't the latest modified
+        changes the card list's ETag.
+        """
+        self.create_anoter_card('Another Card')
+
+        response = self.client.get(self.base_url, {'board': self.board.id})
+
+        Card.objects.filter(pk=self.card.pk).delete()
+
+        modified = self.client.get(
+            self.base_url, {'board': self.board.id},
+            HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(modified.data), 1)
+
     def test_viewset_comments_action_get(self):
         """
         Tests that viewset allows retrieving comments for specific card.
@@ -485,7 +709,7 @@ class CardViewSetTestCase(AuthenticatedAPITestCase):
             'created_by': created_by,
             'modified_by': modified_by,
             'id': self.card.id,
-            'position': self.card.position,
+            'position': 0,
             'date_created': self.card.date_created,
             'date_modified': self.card.date_modified,
             'name': self.card.name,
@@ -537,7 +761,7 @@ class CardViewSetTestCase(AuthenticatedAPITestCase):
             'created_by': created_by,
             'modified_by': modified_by,
             'id': card.id,
-            'position': card.position,
+            'position': 1,
             'date_created': card.date_created,
             'date_modified': card.date_modified,
             'name': card.name,
@@ -591,3 +815,145 @@ class CardViewSetTestCase(AuthenticatedAPITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.data, expected_response)
+
+
+class MoveCardsAPIViewTestCase(AuthenticatedAPITestCase):
+    def setUp(self):
+        super(MoveCardsAPIViewTestCase, self).setUp()
+
+        self.create_account()
+        self.create_board()
+        self.create_card()
+
+        self.another_card = self.create_anoter_card('Another Card')
+        self.third_card = self.create_anoter_card('Third Card')
+
+        self.another_board = Board.objects.create(
+            name='Another Board', account=self.account, created_by=self.user)
+
+        self.url = '/api/v1/cards/move/'
+
+    def test_post_should_reorder_cards(self):
+        """
+        Tests that cards are placed right before the `before` card,
+        in the given order.
+        """
+        data = {
+            'cards': [self.third_card.id, self.another_card.id],
+            'board': self.board.id,
+            'before': self.card.id,
+        }
+
+        response = self.client.post(self.url, data, format='json')
+
+        cards = Card.objects.filter(board=self.board)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([card['id'] for card in response.data],
+                         [self.third_card.id, self.another_card.id])
+        self.assertEqual(list(cards),
+                         [self.third_card, self.another_card, self.card])
+
+    def test_post_should_write_positions_in_one_statement(self):
+        """
+        Tests that moving cards across boards writes their new
+        positions with a single UPDATE.
+        """
+        data = {
+            'cards': [self.card.id, self.third_card.id],
+            'board': self.another_board.id,
+        }
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, data, format='json')
+
+        updates = [query['sql'] for query in context.captured_queries
+                   if 'UPDATE "cards_card"' in query['sql']]
+
+        cards = Card.objects.filter(board=self.another_board)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(list(cards), [self.card, self.third_card])
+
+    def test_post_should_give_moved_cards_a_free_slug(self):
+        """
+        Tests that a card moved to a board where its slug is taken
+        gets a new one.
+        """
+        card = self.create_anoter_card('The Card', board=self.another_board)
+
+        data = {
+            'cards': [self.card.id],
+            'board': self.another_board.id,
+        }
+
+        self.client.post(self.url, data, format='json')
+
+        moved_card = Card.objects.get(pk=self.card.id)
+
+        self.assertEqual(moved_card.board, self.another_board)
+        self.assertNotEqual(moved_card.slug, card.slug)
+
+    def test_post_should_announce_moved_cards_together(self):
+        """
+        Tests that each moved card is announced as an update to its
+        new and previous board rooms, in a single publish.
+        """
+        data = {
+            'cards': [self.card.id, self.third_card.id],
+            'board': self.another_board.id,
+        }
+
+        with patch.object(Announcer, 'emit_many') as emit_many:
+            self.client.post(self.url, data, format='json')
+
+        messages = [message for message in emit_many.call_args[0][0]
+                    if message[0]['data_type'] == 'card']
+
+        announced = [(data['data']['id'], room) for data, room in messages]
+        new_room = 'b{}'.format(self.another_board.id)
+        old_room = 'b{}'.format(self.board.id)
+
+        self.assertEqual(emit_many.call_count, 1)
+        self.assertEqual(set(data['method'] for data, room in messages),
+                         set(['update']))
+        self.assertEqual(announced, [
+            (self.card.id, new_room), (self.card.id, old_room),
+            (self.third_card.id, new_room), (self.third_card.id, old_room)])
+
+    def test_post_should_require_write_permission(self):
+        """
+        Tests that cards can't be moved out of boards the user
+        can't write on.
+        """
+        user = self.create_another_user()
+        account, owner = self.create_another_account(user=user)
+        board = Board.objects.create(
+            name='Private Board', account=account, created_by=user)
+        card = self.create_anoter_card(
+            'Private Card', board=board, created_by=user)
+
+        data = {
+            'cards': [card.id],
+            'board': self.board.id,
+        }
+
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Card.objects.get(pk=card.id).board, board)
+
+    def test_post_should_validate_before_card(self):
+        """
+        Tests that the `before` card has to be on the board.
+        """
+        data = {
+            'cards': [self.card.id],
+            'board': self.another_board.id,
+            'before': self.another_card.id,
+        }
+
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -10,7 +10,13 @@ router = DefaultRouter()
 
 router.register(r'cards', views.CardViewSet)
 
-api_urlpatterns = router.urls
+api_urlpatterns = patterns(
+    # Prefix
+    '',
+
+    # Before the router's urls, so `move` isn't taken for a card id
+    (r'cards/move/$', views.MoveCardsAPIView.as_view()),
+) + router.urls
 
 urlpatterns = patterns(
     # Prefix
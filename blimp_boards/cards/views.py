@@ -4,23 +4,44 @@ from django.http import HttpResponse, Http404
 from rest_framework import filters, status, permissions
 from rest_framework.decorators import action, link
 from rest_framework.response import Response
-from rest_framework.exceptions import ParseError
+from rest_framework.exceptions import ParseError, PermissionDenied
+from rest_framework.views import APIView
 
 from ..utils.viewsets import ModelViewSet
+from ..utils.mixins import (ConditionalGetMixin, CursorPaginationMixin,
+                            SparseFieldsMixin)
+from ..utils.permissions import get_membership_cache
 from ..utils.response import ErrorResponse
+from ..boards.models import BoardCollaborator
 from ..boards.views import BoardHTMLView
 from .models import Card
-from .serializers import CardSerializer, StackSerializer, CardCommentSerializer
+from .serializers import (CardSerializer, StackSerializer,
+                          CardCommentSerializer, MoveCardsSerializer)
 from .permissions import CardPermission
 from .filters import CardFilter
 
 
-class CardViewSet(ModelViewSet):
+class CardViewSet(SparseFieldsMixin, ConditionalGetMixin,
+                  CursorPaginationMixin, ModelViewSet):
     model = Card
     serializer_class = CardSerializer
     permission_classes = (CardPermission, )
     filter_class = CardFilter
     filter_backends = (filters.DjangoFilterBackend,)
+    cursor_ordering = ('position', 'id', )
+
+    sparse_select_related = {
+        'board': ('board', ),
+        'created_by': ('created_by', ),
+        'modified_by': ('modified_by', ),
+        'html_url': ('board__account', ),
+        'download_html_url': ('board__account', ),
+        'original_html_url': ('board__account', ),
+    }
+
+    sparse_prefetch_related = {
+        'cards': ('cards', ),
+    }
 
     def get_serializer_class(self):
         if self.request.method not in permissions.SAFE_METHODS:
@@ -42,7 +63,7 @@ class CardViewSet(ModelViewSet):
         public_cards = None
 
         if user.is_authenticated():
-            user_cards = user.cards.prefetch_related('cards')
+            user_cards = user.cards
 
         public_criteria = [
             (action == 'list' and board),
@@ -52,29 +73,27 @@ class CardViewSet(ModelViewSet):
         ]
 
         if any(public_criteria):
-            public_cards = Card.objects.prefetch_related(
-                'cards').filter(board__is_shared=True)
+            public_cards = Card.objects.filter(board__is_shared=True)
 
-        if user_cards and public_cards:
+        if user_cards is not None and public_cards is not None:
             cards = user_cards | public_cards
-        elif user_cards:
+        elif user_cards is not None:
             cards = user_cards
-        elif public_cards:
+        elif public_cards is not None:
             cards = public_cards
 
-        return cards.select_related(
-            'board', 'board__account', 'created_by', 'modified_by')
+        # Lists don't serialize `data`, only `cached_metadata`
+        if action in ('list', 'retrieve'):
+            cards = cards.defer('data')
+
+        return self.select_sparse_related(cards)
 
     def pre_delete(self, obj):
         """
         Set modified_by before deleting card.
         """
-        obj.set_announce(False)
-
         obj.modified_by = self.request.user
-        obj.save()
-
-        obj.set_announce(True)
+        obj.save(only_dirty=True)
 
     @action(methods=['GET', 'POST'], serializer_class=CardCommentSerializer)
     def comments(self, request, pk=None):
@@ -105,9 +124,12 @@ class CardViewSet(ModelViewSet):
             comments = card.comments.select_related(
                 'created_by', 'modified_by').all()
 
-            serializer = CardCommentSerializer(comments, many=True)
+            def respond():
+                serializer = CardCommentSerializer(comments, many=True)
+                return Response(serializer.data)
 
-        return Response(serializer.data)
+            return self.get_conditional_response(
+                self.get_queryset_validators(comments), respond)
 
     @action(methods=['PUT'])
     def unstack(self, request, pk=None):
@@ -143,6 +165,72 @@ class CardViewSet(ModelViewSet):
         return Response(data)
 
 
+class MoveCardsAPIView(APIView):
+    """
+    Moves or reorders many cards at once, from one or more boards, to
+    a board. Cards keep the given order and are placed right before
+    the `before` card, or after the board's last card.
+    """
+    permission_classes = (permissions.IsAuthenticated, )
+
+    response_fields = ('id', 'board', 'position', 'slug', 'date_modified', )
+
+    def post(self, request):
+        serializer = MoveCardsSerializer(data=request.DATA)
+
+        if not serializer.is_valid():
+            return ErrorResponse(serializer.errors)
+
+        card_ids = serializer.object['cards']
+        before_id = serializer.object.get('before')
+
+        memberships = get_membership_cache(request)
+        board = memberships.get_board(serializer.object['board'])
+
+        if not board:
+            raise Http404
+
+        ids = card_ids + ([before_id] if before_id else [])
+
+        cards = dict((card.id, card) for card in Card.objects.filter(
+            pk__in=ids).select_related('board'))
+
+        before = cards.pop(before_id, None) if before_id else None
+
+        if before_id and (not before or before.board_id != board.id):
+            msg = 'The `before` card should be on the board.'
+            return ErrorResponse({'before': [msg]})
+
+        if len(cards) != len(card_ids):
+            raise Http404
+
+        boards = [board] + [card.board for card in cards.values()]
+
+        if not all(self.has_board_permission(obj) for obj in boards):
+            raise PermissionDenied
+
+        cards = [cards[pk] for pk in card_ids]
+
+        Card.objects.move(cards, board, before=before, user=request.user)
+
+        serializer = CardSerializer(
+            cards, many=True, fields=self.response_fields)
+
+        return Response(serializer.data)
+
+    def has_board_permission(self, board):
+        """
+        Returns `True` if the user can write on the board's cards.
+        """
+        memberships = get_membership_cache(self.request)
+
+        is_collaborator = memberships.is_board_collaborator(
+            board.id, permission=BoardCollaborator.WRITE_PERMISSION)
+
+        return is_collaborator or memberships.is_account_collaborator(
+            board.account_id, is_owner=True)
+
+
 class CardDownloadHTMLView(BoardHTMLView):
     authentication_classes = ()
     permission_classes = ()
@@ -30,6 +30,10 @@ class Comment(BaseModel):
     def announce_room(self):
         return self.content_object.announce_room
 
+    @property
+    def announce_rooms(self):
+        return self.content_object.announce_rooms
+
     @property
     def serializer(self):
         from .serializers import CommentSerializer
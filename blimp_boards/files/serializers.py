@@ -0,0 +1,92 @@
+from rest_framework import serializers
+
+from ..utils.fields import ListField
+
+
+class SignedURLsSerializer(serializers.Serializer):
+    """
+    Validates the cards, boards and URL variants to sign again.
+    """
+    MAX_IDS = 500
+
+    CARD_VARIANTS = {
+        'thumbnail_xs_path': 'signed_thumbnail_xs_path',
+        'thumbnail_sm_path': 'signed_thumbnail_sm_path',
+        'thumbnail_md_path': 'signed_thumbnail_md_path',
+        'thumbnail_lg_path': 'signed_thumbnail_lg_path',
+        'original_thumbnail_url': 'original_thumbnail_url',
+        'file_download_url': 'file_download_url',
+    }
+
+    BOARD_VARIANTS = {
+        'thumbnail_xs_path': 'signed_thumbnail_xs_path',
+        'thumbnail_sm_path': 'signed_thumbnail_sm_path',
+        'thumbnail_md_path': 'signed_thumbnail_md_path',
+        'thumbnail_lg_path': 'signed_thumbnail_lg_path',
+    }
+
+    DEFAULT_VARIANTS = ('thumbnail_xs_path', 'thumbnail_sm_path',
+                        'thumbnail_md_path', 'thumbnail_lg_path', )
+
+    cards = ListField(required=False)
+    boards = ListField(required=False)
+    variants = ListField(required=False)
+
+    def validate_ids(self, attrs, source):
+        ids = attrs.get(source) or []
+
+        if len(ids) > self.MAX_IDS:
+            msg = 'Ensure this list has at most {} items.'
+            raise serializers.ValidationError(msg.format(self.MAX_IDS))
+
+        try:
+            attrs[source] = [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            raise serializers.ValidationError('Enter a list of ids.')
+
+        return attrs
+
+    validate_cards = validate_ids
+    validate_boards = validate_ids
+
+    def validate_variants(self, attrs, source):
+        variants = attrs.get(source) or self.DEFAULT_VARIANTS
+
+        for variant in variants:
+            if variant not in self.CARD_VARIANTS:
+                msg = '`{}` is not a valid variant.'
+                raise serializers.ValidationError(msg.format(variant))
+
+        attrs[source] = variants
+
+        return attrs
+
+    def sign(self, objects, variants):
+        """
+        Returns each object's id with the signed URL, or `None`, of
+        each of the given {variant: attribute} variants.
+        """
+        signed_urls = []
+
+        for obj in objects:
+            urls = {'id': obj.id}
+
+            for variant, attr in variants.items():
+                urls[variant] = getattr(obj, attr)
+
+            signed_urls.append(urls)
+
+        return signed_urls
+
+    def sign_cards(self, cards):
+        variants = dict((variant, self.CARD_VARIANTS[variant])
+                        for variant in self.object['variants'])
+
+        return self.sign(cards, variants)
+
+    def sign_boards(self, boards):
+        variants = dict((variant, self.BOARD_VARIANTS[variant])
+                        for variant in self.object['variants']
+                        if variant in self.BOARD_VARIANTS)
+
+        return self.sign(boards, variants)
@@ -5,12 +5,15 @@ import hmac
 import hashlib
 import uuid
 
+from django.test.utils import override_settings
 from django.utils.encoding import smart_text, smart_bytes
+from django.utils.six.moves import urllib
 
 from mock import Mock, patch
 
 from ...utils.tests import BaseTestCase
-from ..utils import generate_policy, generate_signature, generate_file_key
+from ..utils import (generate_policy, generate_signature, generate_file_key,
+                     sign_s3_url, signed_urls, S3UrlSigner)
 
 
 def mocked_now():
@@ -21,6 +24,10 @@ def mocked_uuid4():
     return uuid.UUID('16fd2706-8baf-433b-82eb-8c7fada847da')
 
 
+def mocked_time():
+    return 1393286400.0
+
+
 class UtilsTestCase(BaseTestCase):
     @patch('blimp_boards.files.utils.now', mocked_now)
     def test_generate_policy_should_returns_base64_policy(self):
@@ -77,3 +84,70 @@ class UtilsTestCase(BaseTestCase):
         expected_key = ('cards/16fd2706-8baf-433b-82eb-8c7fada847da/photo.jpg')
 
         self.assertEqual(key, expected_key)
+
+
+@override_settings(AWS_ACCESS_KEY_ID='myaccesskey',
+                   AWS_SECRET_ACCESS_KEY='mysecret',
+                   AWS_SIGNATURE_EXPIRES_IN=60 * 60 * 3,
+                   AWS_SIGNATURE_WINDOW=60 * 60)
+class SignS3UrlTestCase(BaseTestCase):
+    def setUp(self):
+        self.url = 'https://s3.amazonaws.com/mybucket/cards/photo.jpg'
+        signed_urls.clear()
+
+    def get_params(self, url):
+        query = urllib.parse.urlparse(url).query
+        return dict(urllib.parse.parse_qsl(query))
+
+    def test_sign_s3_url_should_round_expires_to_window(self):
+        """
+        Tests that sign_s3_url rounds expiry up to the end of the
+        signature window.
+        """
+        with patch('blimp_boards.files.utils.time.time', mocked_time):
+            params = self.get_params(sign_s3_url(self.url))
+
+        self.assertEqual(int(params['Expires']), 1393286400 + 60 * 60 * 3)
+
+        with patch('blimp_boards.files.utils.time.time',
+                   lambda: mocked_time() + 1):
+            params = self.get_params(sign_s3_url(self.url))
+
+        self.assertEqual(int(params['Expires']), 1393286400 + 60 * 60 * 4)
+
+    def test_sign_s3_url_should_sign_with_secret_key(self):
+        """
+        Tests that sign_s3_url signs the expected string with the
+        AWS secret key.
+        """
+        with patch('blimp_boards.files.utils.time.time', mocked_time):
+            params = self.get_params(sign_s3_url(
+                self.url, response_headers={
+                    'response-content-disposition': 'attachment'}))
+
+        string_to_sign = ('GET\n\n\n{}\n/mybucket/cards/photo.jpg'
+                          '?response-content-disposition=attachment').format(
+                              params['Expires'])
+
+        self.assertEqual(params['AWSAccessKeyId'], 'myaccesskey')
+        self.assertEqual(params['Signature'], smart_text(
+            generate_signature(string_to_sign, 'mysecret')))
+
+    def test_sign_s3_url_should_memoize_urls_within_window(self):
+        """
+        Tests that an object is only signed once per window and
+        response headers.
+        """
+        with patch.object(S3UrlSigner, 'generate_signature',
+                          return_value='signature') as generate_signature:
+            with patch('blimp_boards.files.utils.time.time', mocked_time):
+                url = sign_s3_url(self.url)
+
+            with patch('blimp_boards.files.utils.time.time',
+                       lambda: mocked_time() - 60):
+                self.assertEqual(sign_s3_url(self.url), url)
+
+            sign_s3_url(self.url, response_headers={
+                'response-content-disposition': 'attachment'})
+
+        self.assertEqual(generate_signature.call_count, 2)
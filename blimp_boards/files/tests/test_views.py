@@ -0,0 +1,117 @@
+from django.test.utils import override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ...boards.models import Board
+from ...cards.models import Card
+from ...utils.tests import AuthenticatedAPITestCase
+from ..utils import sign_s3_url, signed_urls
+
+
+@override_settings(AWS_ACCESS_KEY_ID='myaccesskey',
+                   AWS_SECRET_ACCESS_KEY='mysecret')
+class SignedURLsAPIViewTestCase(AuthenticatedAPITestCase):
+    def setUp(self):
+        super(SignedURLsAPIViewTestCase, self).setUp()
+
+        self.create_account()
+        self.create_board()
+
+        self.thumbnail_url = 'https://s3.amazonaws.com/bucket/cards/sm.png'
+        self.card = Card.objects.create(
+            name='File', type='file', content='uploads/file.png',
+            board=self.board, created_by=self.user,
+            thumbnail_sm_path=self.thumbnail_url)
+
+        self.url = '/api/v1/files/urls/sign/'
+
+        signed_urls.clear()
+
+    def test_post_should_return_signed_urls(self):
+        """
+        Tests that the endpoint signs the requested variants of the
+        given cards and boards again.
+        """
+        data = {
+            'cards': [self.card.id],
+            'boards': [self.board.id],
+            'variants': ['thumbnail_sm_path', 'original_thumbnail_url'],
+        }
+
+        response = self.client.post(self.url, data, format='json')
+
+        expected_response = {
+            'cards': [{
+                'id': self.card.id,
+                'thumbnail_sm_path': sign_s3_url(self.thumbnail_url),
+                'original_thumbnail_url': None,
+            }],
+            'boards': [{
+                'id': self.board.id,
+                'thumbnail_sm_path': sign_s3_url(self.thumbnail_url),
+            }],
+        }
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, expected_response)
+
+    def test_post_should_query_each_type_once(self):
+        """
+        Tests that cards and boards are each loaded in one query.
+        """
+        card = Card.objects.create(
+            name='Another File', type='file', content='uploads/file.png',
+            board=self.board, created_by=self.user)
+
+        data = {
+            'cards': [self.card.id, card.id],
+            'boards': [self.board.id],
+        }
+
+        with self.assertNumQueries(3):
+            response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(len(response.data['cards']), 2)
+
+    def test_post_should_leave_out_objects_user_cant_access(self):
+        """
+        Tests that cards and boards of boards that aren't shared
+        are left out for users that aren't collaborators.
+        """
+        board = Board.objects.create(
+            name='Shared Board', account=self.account, created_by=self.user,
+            is_shared=True)
+
+        data = {
+            'cards': [self.card.id],
+            'boards': [self.board.id, board.id],
+        }
+
+        self.client = APIClient()
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['cards'], [])
+        self.assertEqual([b['id'] for b in response.data['boards']],
+                         [board.id])
+
+    def test_post_should_validate_variants(self):
+        """
+        Tests that unknown variants are rejected.
+        """
+        data = {
+            'cards': [self.card.id],
+            'variants': ['content'],
+        }
+
+        response = self.client.post(self.url, data, format='json')
+
+        expected_response = {
+            'error': {
+                'variants': ['`content` is not a valid variant.']
+            }
+        }
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, expected_response)
@@ -1,11 +1,13 @@
 from django.conf.urls import patterns
 
-from .views import SignS3FileUploadAPIView, FilePreviewsWebhook
+from .views import (SignS3FileUploadAPIView, SignedURLsAPIView,
+                    FilePreviewsWebhook)
 
 api_urlpatterns = patterns(
     # Prefix
     '',
 
     (r'files/uploads/sign/$', SignS3FileUploadAPIView.as_view()),
+    (r'files/urls/sign/$', SignedURLsAPIView.as_view()),
     (r'files/previews/webhook/$', FilePreviewsWebhook.as_view()),
 )
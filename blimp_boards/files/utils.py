@@ -3,9 +3,12 @@ import base64
 import datetime
 import hmac
 import hashlib
+import threading
 import uuid
 import time
 
+from collections import OrderedDict
+
 from django.conf import settings
 from django.utils.timezone import now
 from django.utils.six.moves import urllib
@@ -17,13 +20,52 @@ logger = getLogger(__name__)
 
 
 def sign_s3_url(url, expires_in=None, response_headers=None):
+    """
+    Returns a signed GET URL for an S3 object URL. Expiry is rounded
+    up to the end of a AWS_SIGNATURE_WINDOW, so an object is signed
+    the same way, and its URL can be cached, for the whole window.
+    """
     if not expires_in:
         expires_in = settings.AWS_SIGNATURE_EXPIRES_IN
 
-    signer = S3UrlSigner(settings.AWS_ACCESS_KEY_ID,
-                         settings.AWS_SECRET_ACCESS_KEY)
+    signer = get_s3_url_signer()
+    expires = signer.get_expires(expires_in)
+
+    headers = None
+
+    if response_headers:
+        headers = tuple(sorted(response_headers.items()))
+
+    cache_key = (signer.access_key, url, expires, headers)
+    signed_url = signed_urls.get(cache_key)
+
+    if signed_url is None:
+        signed_url = signer.sign_url(
+            'GET', url, expires_in, response_headers, expires=expires)
+
+        signed_urls.set(cache_key, signed_url)
+
+    return signed_url
+
+
+def get_s3_url_signer():
+    """
+    Returns an S3UrlSigner for the configured AWS credentials,
+    reused between calls so its HMAC key state is only set up once.
+    """
+    global _s3_url_signer
+
+    signer = _s3_url_signer
+    access_key = settings.AWS_ACCESS_KEY_ID
+    secret_key = settings.AWS_SECRET_ACCESS_KEY
+    window = settings.AWS_SIGNATURE_WINDOW
 
-    return signer.sign_url('GET', url, expires_in, response_headers)
+    if signer is None or (signer.access_key, signer.secret_key,
+                          signer.window) != (access_key, secret_key, window):
+        signer = S3UrlSigner(access_key, secret_key, window)
+        _s3_url_signer = signer
+
+    return signer
 
 
 def generate_policy(bucket, mime_type, file_size):
@@ -82,21 +124,87 @@ def generate_file_key(name=None):
     return key
 
 
+class LRUCache(object):
+    """
+    A thread-safe mapping that keeps up to `max_size` of its most
+    recently used items.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value = self.items.pop(key)
+            except KeyError:
+                return default
+
+            self.items[key] = value
+
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.items.pop(key, None)
+            self.items[key] = value
+
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
 class S3UrlSigner(object):
-    def __init__(self, access_key, secret_key):
+    def __init__(self, access_key, secret_key, window=None):
         self.access_key = access_key
         self.secret_key = secret_key
+        self.window = window
         self.endpoint = 'https://s3.amazonaws.com'
+        self.hmac = hmac.new(smart_bytes(secret_key), digestmod=hashlib.sha1)
+
+    def get_expires(self, expires_in_seconds):
+        """
+        Returns the expiry timestamp for a URL, rounded up to the
+        end of the signer's window if it has one.
+        """
+        expires = int(time.time() + expires_in_seconds)
+
+        if self.window:
+            expires += -expires % self.window
+
+        return expires
+
+    def generate_signature(self, string_to_sign):
+        """
+        Returns the Base64-encoded HMAC-SHA1 of a string, from a copy
+        of the signer's keyed HMAC.
+        """
+        hmac_signature = self.hmac.copy()
+        hmac_signature.update(smart_bytes(string_to_sign))
+
+        return smart_text(base64.b64encode(hmac_signature.digest()))
 
     def generate_url(self, verb, key, bucket, expires_in_seconds,
-                     response_headers=None):
+                     response_headers=None, expires=None):
         """
         Returns a full signed URL from a given verb, key,
         bucket, and expires_in_seconds.
         """
         key = urllib.parse.quote(key)
 
-        expires = int(time.time() + expires_in_seconds)
+        if expires is None:
+            expires = self.get_expires(expires_in_seconds)
+
+        if response_headers:
+            response_headers = sorted(response_headers.items())
 
         str = '{}\n\n\n{}\n/{}'.format(verb, expires, bucket)
 
@@ -112,20 +220,21 @@ class S3UrlSigner(object):
         if response_headers:
             str = '{}?{}'.format(str, urllib.parse.urlencode(response_headers))
 
-        signature = smart_text(generate_signature(str, self.secret_key))
+        signature = self.generate_signature(str)
 
-        params = {
-            'Expires': expires,
-            'AWSAccessKeyId': self.access_key,
-            'Signature': signature
-        }
+        params = [
+            ('AWSAccessKeyId', self.access_key),
+            ('Expires', expires),
+            ('Signature', signature),
+        ]
 
         if response_headers:
-            params.update(response_headers)
+            params.extend(response_headers)
 
         return '{}?{}'.format(url, urllib.parse.urlencode(params))
 
-    def sign_url(self, verb, url, expires_in, response_headers=None):
+    def sign_url(self, verb, url, expires_in, response_headers=None,
+                 expires=None):
         """
         Returns a full signed URL from a given verb,
         url, and expires_in_seconds.
@@ -144,4 +253,9 @@ class S3UrlSigner(object):
         key = urllib.parse.unquote('/'.join(parts))
 
         return self.generate_url(verb, key, bucket, expires_in,
-                                 response_headers)
+                                 response_headers, expires)
+
+
+_s3_url_signer = None
+
+signed_urls = LRUCache(settings.AWS_SIGNED_URLS_CACHE_SIZE)
@@ -7,10 +7,13 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
+from ..boards.models import Board
 from ..cards.models import Card
 from ..utils.parsers import PlainTextParser
+from ..utils.response import ErrorResponse
 from .utils import generate_policy, generate_signature, generate_file_key
 from .previews import decode_previews_payload
+from .serializers import SignedURLsSerializer
 
 
 logger = getLogger(__name__)
@@ -46,6 +49,66 @@ class SignS3FileUploadAPIView(APIView):
         return Response(params)
 
 
+class SignedURLsAPIView(APIView):
+    """
+    Signs again the thumbnail and download URLs of the given cards
+    and boards, so clients can refresh expired URLs without loading
+    whole card or board lists. Objects the user can't access are left
+    out of the response.
+    """
+    permission_classes = ()
+
+    card_fields = ('id', 'type', 'content', 'data', 'thumbnail_xs_path',
+                   'thumbnail_sm_path', 'thumbnail_md_path',
+                   'thumbnail_lg_path', )
+
+    board_fields = ('id', 'thumbnail_xs_path', 'thumbnail_sm_path',
+                    'thumbnail_md_path', 'thumbnail_lg_path', )
+
+    def post(self, request):
+        serializer = SignedURLsSerializer(data=request.DATA)
+
+        if not serializer.is_valid():
+            return ErrorResponse(serializer.errors)
+
+        card_ids = serializer.object['cards']
+        board_ids = serializer.object['boards']
+
+        cards = Card.objects.none()
+        boards = Board.objects.none()
+
+        if card_ids:
+            cards = self.get_cards().filter(
+                pk__in=card_ids).only(*self.card_fields)
+
+        if board_ids:
+            boards = self.get_boards().filter(
+                pk__in=board_ids).only(*self.board_fields)
+
+        return Response({
+            'cards': serializer.sign_cards(cards),
+            'boards': serializer.sign_boards(boards),
+        })
+
+    def get_cards(self):
+        user = self.request.user
+        cards = Card.objects.filter(board__is_shared=True)
+
+        if user.is_authenticated():
+            cards = user.cards | cards
+
+        return cards
+
+    def get_boards(self):
+        user = self.request.user
+        boards = Board.objects.filter(is_shared=True)
+
+        if user.is_authenticated():
+            boards = user.boards | boards
+
+        return boards
+
+
 class FilePreviewsWebhook(APIView):
     authentication_classes = ()
     permission_classes = ()
@@ -93,12 +156,12 @@ class FilePreviewsWebhook(APIView):
                     card.thumbnail_lg_path = url
 
         if results:
-            if card.data:
-                card.data.update(results)
-            else:
-                card.data = results
+            # Replace rather than update the dict so the change is tracked
+            data = dict(card.data or {})
+            data.update(results)
+            card.data = data
 
-            card.save()
+            card.save(only_dirty=True)
             card.update_notification_data()
 
         return Response(status=status.HTTP_200_OK)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Notification, NotificationSetting
+from .models import Notification, NotificationJob, NotificationSetting
 
 
 class NotificationSettingAdmin(admin.ModelAdmin):
@@ -10,5 +10,12 @@ class NotificationSettingAdmin(admin.ModelAdmin):
 class NotificationAdmin(admin.ModelAdmin):
     search_fields = ('recipient__username', 'verb')
 
+
+class NotificationJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'attempts', 'available_at',
+                    'date_created']
+    list_filter = ['status']
+
 admin.site.register(Notification, NotificationAdmin)
+admin.site.register(NotificationJob, NotificationJobAdmin)
 admin.site.register(NotificationSetting, NotificationSettingAdmin)
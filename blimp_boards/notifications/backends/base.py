@@ -10,18 +10,22 @@ class BaseBackend(object):
     def __init__(self, medium):
         self.medium = medium
 
-    def can_send(self, user, notice_type):
+    def can_send(self, user, notice_type, user_settings=None):
         """
         Determines whether this backend is allowed to send a notification to
-        the given user and notice_type.
+        the given user and notice_type. `user_settings` is the user's
+        {medium: send} dictionary if already loaded.
         """
         from ..models import NotificationSetting
 
         if not user.pk:
             return True
 
-        return NotificationSetting.for_user(
-            user, notice_type['label'], self.medium).send
+        if user_settings is None:
+            user_settings = NotificationSetting.for_users(
+                [user], notice_type['label'])[user.pk]
+
+        return user_settings[self.medium]
 
     def deliver(self, recipient, sender, notice_type, extra_context):
         """
@@ -29,6 +33,13 @@ class BaseBackend(object):
         """
         raise NotImplementedError()
 
+    def deliver_many(self, recipients, sender, notice_type, extra_context):
+        """
+        Deliver a notification to each of the given recipients.
+        """
+        for recipient in recipients:
+            self.deliver(recipient, sender, notice_type, extra_context)
+
     def get_formatted_messages(self, formats, label, context):
         """
         Returns a dictionary with the format identifier as the key.
@@ -1,16 +1,70 @@
+import time
+
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils.log import getLogger
 
 from .base import BaseBackend
 
 
+logger = getLogger(__name__)
+
+
 class EmailBackend(BaseBackend):
-    def can_send(self, user, notification_type):
-        can_send = super(EmailBackend, self).can_send(user, notification_type)
+    def can_send(self, user, notification_type, user_settings=None):
+        can_send = super(EmailBackend, self).can_send(
+            user, notification_type, user_settings)
 
         return can_send and user.email and user.is_active
 
     def deliver(self, recipient, sender, notification_type, extra_context):
+        self.deliver_many([recipient], sender, notification_type,
+                          extra_context)
+
+    def deliver_many(self, recipients, sender, notification_type,
+                     extra_context):
+        """
+        Sends the recipients' emails through a single connection.
+        A message failing to send doesn't stop the others, the last
+        error is only raised if none of them could be sent.
+        """
+        label = notification_type['label']
+        started = time.time()
+
+        messages = [self.get_message(
+            recipient, sender, notification_type, extra_context)
+            for recipient in recipients]
+
+        rendered = time.time()
+        connection = get_connection()
+        sent = 0
+        error = None
+
+        try:
+            connection.open()
+
+            for message in messages:
+                try:
+                    sent += connection.send_messages([message]) or 0
+                except Exception as e:
+                    error = e
+                    logger.exception('Failed sending {} email to {}'.format(
+                        label, ', '.join(message.to)))
+        finally:
+            connection.close()
+
+        msg = 'Sent {} of {} {} emails, rendered in {:.0f}ms, sent in {:.0f}ms'
+        logger.info(msg.format(
+            sent, len(messages), label, (rendered - started) * 1000,
+            (time.time() - rendered) * 1000))
+
+        if error is not None and not sent:
+            raise error
+
+        return sent
+
+    def get_message(self, recipient, sender, notification_type,
+                    extra_context):
         context = self.default_context()
         context.update({
             'recipient': recipient,
@@ -40,4 +94,4 @@ class EmailBackend(BaseBackend):
 
         msg.attach_alternative(html_content, "text/html")
 
-        msg.send()
+        return msg
@@ -7,19 +7,25 @@ from .base import BaseBackend
 
 class NotificationBackend(BaseBackend):
     def deliver(self, recipient, sender, notice_type, extra_context):
+        self.deliver_many([recipient], sender, notice_type, extra_context)
+
+    def deliver_many(self, recipients, sender, notice_type, extra_context):
+        """
+        Creates the recipients' notifications in a single query,
+        serializing the context they share only once.
+        """
         Notification = get_model('notifications', 'Notification')
 
         context = {}
         context.update(extra_context)
 
-        notification = Notification(
-            recipient=recipient,
-            actor_content_type=ContentType.objects.get_for_model(sender),
-            actor_object_id=sender.pk,
-            verb=notice_type['description'],
-            public=context.get('public', True),
-            description=context.get('description', None)
-        )
+        fields = {
+            'actor_content_type': ContentType.objects.get_for_model(sender),
+            'actor_object_id': sender.pk,
+            'verb': notice_type['description'],
+            'public': context.get('public', True),
+            'description': context.get('description', None)
+        }
 
         for opt in ('target', 'action_object'):
             obj = context.get(opt, None)
@@ -27,16 +33,21 @@ class NotificationBackend(BaseBackend):
             if obj is not None:
                 context[opt] = obj.serializer.data
 
-                setattr(notification, '{}_object_id'.format(opt), obj.pk)
-                setattr(notification, '{}_content_type'.format(opt),
-                        ContentType.objects.get_for_model(obj))
+                fields['{}_object_id'.format(opt)] = obj.pk
+                fields['{}_content_type'.format(opt)] = \
+                    ContentType.objects.get_for_model(obj)
 
         context.update({
-            "recipient": recipient.serializer.data,
             "sender": sender.serializer.data,
             "notice": ugettext(notice_type['display']),
         })
 
-        notification.data = context
+        notifications = []
+
+        for recipient in recipients:
+            data = dict(context, recipient=recipient.serializer.data)
+
+            notifications.append(
+                Notification(recipient=recipient, data=data, **fields))
 
-        notification.save()
+        Notification.objects.bulk_create(notifications)
@@ -0,0 +1,84 @@
+import datetime
+import time
+from multiprocessing.pool import ThreadPool
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from ...models import NotificationJob
+from ...queue import process_job
+
+
+class Command(BaseCommand):
+    help = 'Dispatches queued notifications.'
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--concurrency', action='store', dest='concurrency', type='int',
+            default=None,
+            help='Jobs dispatched at the same time. Defaults to '
+                 'NOTIFICATION_QUEUE_CONCURRENCY.'),
+        make_option(
+            '--max-attempts', action='store', dest='max_attempts',
+            type='int', default=None,
+            help='Attempts before a job is kept as failed. Defaults to '
+                 'NOTIFICATION_QUEUE_MAX_ATTEMPTS.'),
+        make_option(
+            '--interval', action='store', dest='interval', type='float',
+            default=5,
+            help='Seconds to wait for new jobs when the queue is empty.'),
+        make_option(
+            '--once', action='store_true', dest='once', default=False,
+            help='Exit once the queue is drained.'),
+    )
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency'] or \
+            settings.NOTIFICATION_QUEUE_CONCURRENCY
+        max_attempts = options['max_attempts'] or \
+            settings.NOTIFICATION_QUEUE_MAX_ATTEMPTS
+
+        lock_timeout = datetime.timedelta(
+            seconds=settings.NOTIFICATION_QUEUE_LOCK_TIMEOUT)
+
+        def process(job):
+            try:
+                return process_job(job, max_attempts)
+            finally:
+                # Each worker thread has its own connection
+                if concurrency > 1:
+                    connection.close()
+
+        pool = ThreadPool(concurrency)
+        dispatched = failed = 0
+
+        try:
+            while True:
+                NotificationJob.objects.requeue_stale(
+                    timezone.now() - lock_timeout)
+
+                jobs = NotificationJob.objects.claim(concurrency * 10)
+
+                if not jobs:
+                    if options['once']:
+                        break
+
+                    time.sleep(options['interval'])
+                    continue
+
+                if concurrency > 1:
+                    results = pool.map(process, jobs)
+                else:
+                    results = [process(job) for job in jobs]
+
+                dispatched += results.count(True)
+                failed += results.count(False)
+        finally:
+            pool.close()
+            pool.join()
+
+        self.stdout.write('Dispatched {} notifications, {} failed.'.format(
+            dispatched, failed))
@@ -0,0 +1,36 @@
+from django.db import models
+from django.utils import timezone
+
+
+class NotificationJobManager(models.Manager):
+    def enqueue(self, payload):
+        """
+        Adds a job to the queue.
+        """
+        return self.create(payload=payload)
+
+    def claim(self, limit):
+        """
+        Marks up to `limit` available jobs as processing and returns
+        them. A job is only claimed by one worker, others skip it.
+        """
+        now = timezone.now()
+
+        pks = self.filter(
+            status=self.model.STATUS.queued, available_at__lte=now
+        ).order_by('id').values_list('id', flat=True)[:limit]
+
+        claimed = [pk for pk in pks if self.filter(
+            pk=pk, status=self.model.STATUS.queued
+        ).update(status=self.model.STATUS.processing, locked_at=now)]
+
+        return list(self.filter(pk__in=claimed).order_by('id'))
+
+    def requeue_stale(self, before):
+        """
+        Puts back in the queue jobs claimed before the given datetime,
+        whose worker likely died while processing them.
+        """
+        return self.filter(
+            status=self.model.STATUS.processing, locked_at__lt=before
+        ).update(status=self.model.STATUS.queued, locked_at=None)
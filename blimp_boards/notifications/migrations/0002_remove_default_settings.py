@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import DataMigration
+from django.db import models
+
+
+# {notification_type: {medium: send}} defaults of NOTIFICATION_TYPES
+# when this migration was written
+DEFAULTS = {
+    'card_comment_created': {'email': True, 'notification': True},
+    'signup_request_created': {'email': True, 'notification': False},
+    'user_invited': {'email': True, 'notification': False},
+    'board_collaborator_requested': {'email': True, 'notification': False},
+    'password_reset_requested': {'email': True, 'notification': False},
+    'card_created': {'email': False, 'notification': True},
+    'card_featured': {'email': False, 'notification': True},
+    'card_stack_created': {'email': False, 'notification': True},
+    'board_collaborator_created': {'email': True, 'notification': True},
+    'user_password_updated': {'email': True, 'notification': False},
+}
+
+
+class Migration(DataMigration):
+
+    def forwards(self, orm):
+        "Removes the settings that match their notification type's default."
+        for notification_type, media in DEFAULTS.items():
+            for medium, send in media.items():
+                orm.NotificationSetting.objects.filter(
+                    notification_type=notification_type, medium=medium,
+                    send=send).delete()
+
+    def backwards(self, orm):
+        "Stores every user's missing settings with their default."
+        user_ids = orm['users.User'].objects.values_list('id', flat=True)
+
+        for user_id in user_ids.iterator():
+            stored = set(orm.NotificationSetting.objects.filter(
+                user_id=user_id).values_list('notification_type', 'medium'))
+
+            orm.NotificationSetting.objects.bulk_create([
+                orm.NotificationSetting(
+                    user_id=user_id, notification_type=notification_type,
+                    medium=medium, send=send)
+                for notification_type, media in DEFAULTS.items()
+                for medium, send in media.items()
+                if (notification_type, medium) not in stored])
+
+    models = {
+        'contenttypes.contenttype': {
+            'Meta': {'ordering': "('name',)", 'object_name': 'ContentType', 'unique_together': "(('app_label', 'model'),)", 'db_table': "'django_content_type'"},
+            'app_label': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'model': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'notifications.notification': {
+            'Meta': {'ordering': "('-date_created',)", 'object_name': 'Notification'},
+            'action_object_content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']", 'blank': 'True', 'related_name': "'notify_action_object'", 'null': 'True'}),
+            'action_object_object_id': ('django.db.models.fields.PositiveIntegerField', [], {'blank': 'True', 'null': 'True'}),
+            'actor_content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']", 'related_name': "'notify_actor'"}),
+            'actor_object_id': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'data': ('jsonfield.fields.JSONField', [], {'blank': 'True', 'null': 'True'}),
+            'date_created': ('django.db.models.fields.DateTimeField', [], {'blank': 'True', 'default': 'datetime.datetime.now'}),
+            'date_modified': ('django.db.models.fields.DateTimeField', [], {'blank': 'True', 'default': 'datetime.datetime.now'}),
+            'description': ('django.db.models.fields.TextField', [], {'blank': 'True', 'null': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'level': ('django.db.models.fields.CharField', [], {'default': "'info'", 'max_length': '20'}),
+            'public': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'recipient': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['users.User']", 'related_name': "'notifications'"}),
+            'target_content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']", 'blank': 'True', 'related_name': "'notify_target'", 'null': 'True'}),
+            'target_object_id': ('django.db.models.fields.PositiveIntegerField', [], {'blank': 'True', 'null': 'True'}),
+            'unread': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'verb': ('django.db.models.fields.CharField', [], {'max_length': '255'})
+        },
+        'notifications.notificationsetting': {
+            'Meta': {'object_name': 'NotificationSetting', 'unique_together': "(('user', 'notification_type', 'medium'),)"},
+            'date_created': ('django.db.models.fields.DateTimeField', [], {'blank': 'True', 'default': 'datetime.datetime.now'}),
+            'date_modified': ('django.db.models.fields.DateTimeField', [], {'blank': 'True', 'default': 'datetime.datetime.now'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'medium': ('django.db.models.fields.CharField', [], {'max_length': '50'}),
+            'notification_type': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'send': ('django.db.models.fields.BooleanField', [], {}),
+            'user': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['users.User']"})
+        },
+        'users.user': {
+            'Meta': {'object_name': 'User'},
+            'avatar_path': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'date_created': ('django.db.models.fields.DateTimeField', [], {'blank': 'True', 'default': 'datetime.datetime.now'}),
+            'date_modified': ('django.db.models.fields.DateTimeField', [], {'blank': 'True', 'default': 'datetime.datetime.now'}),
+            'email': ('django.db.models.fields.EmailField', [], {'max_length': '254', 'unique': 'True'}),
+            'email_notifications': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'first_name': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '30'}),
+            'gravatar_url': ('django.db.models.fields.URLField', [], {'blank': 'True', 'max_length': '200'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'is_active': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'is_staff': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'is_superuser': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'job_title': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '255'}),
+            'last_ip': ('django.db.models.fields.IPAddressField', [], {'blank': 'True', 'default': "'127.0.0.1'", 'max_length': '15', 'null': 'True'}),
+            'last_login': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'last_name': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '30'}),
+            'password': ('django.db.models.fields.CharField', [], {'max_length': '128'}),
+            'timezone': ('django.db.models.fields.CharField', [], {'default': "'UTC'", 'max_length': '255'}),
+            'token_version': ('django.db.models.fields.CharField', [], {'db_index': 'True', 'default': "'de5d72e7-106a-4b74-a912-17fdb1092793'", 'max_length': '36', 'unique': 'True'}),
+            'username': ('django.db.models.fields.CharField', [], {'max_length': '30', 'unique': 'True'})
+        }
+    }
+
+    complete_apps = ['notifications']
+    symmetrical = True
@@ -1,9 +1,15 @@
+import datetime
+import time
+
+from collections import OrderedDict
+
 from django.conf import settings
 from django.contrib.contenttypes import generic
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured
 from django.db import models
 from django.dispatch import receiver
+from django.utils import timezone
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.log import getLogger
 from django.utils.translation import get_language, activate
@@ -14,8 +20,11 @@ from model_utils import Choices
 from model_utils.managers import PassThroughManager
 from rest_framework.utils.encoders import JSONEncoder
 
+from ..files.utils import LRUCache
 from ..utils.date import timesince as timesince_
+from ..utils.fields import DateTimeCreatedField
 from ..utils.models import BaseModel
+from .managers import NotificationJobManager
 from .query import NotificationQuerySet
 from .signals import notify
 from .types import NOTIFICATION_TYPES, get_notification_type
@@ -31,12 +40,33 @@ NOTIFICATION_BACKENDS = backends.load_backends()
 NOTIFICATION_MEDIA, NOTIFICATION_MEDIA_DEFAULTS = \
     backends.load_media_defaults(backends=NOTIFICATION_BACKENDS)
 
+_settings_cache = None
+
+
+def get_settings_cache():
+    """
+    Returns the per-process cache of users' notification settings, or
+    `None` if NOTIFICATION_SETTINGS_CACHE_SIZE disables it.
+    """
+    global _settings_cache
+
+    max_size = settings.NOTIFICATION_SETTINGS_CACHE_SIZE
+
+    if not max_size:
+        return None
+
+    if _settings_cache is None or _settings_cache.max_size != max_size:
+        _settings_cache = LRUCache(max_size)
+
+    return _settings_cache
+
 
 @python_2_unicode_compatible
 class NotificationSetting(BaseModel):
     """
     Indicates, for a given user, whether to send notifications
-    of a given type to a given medium.
+    of a given type to a given medium. Only stored when it differs
+    from the notification type's default.
     """
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name=_("user"))
@@ -66,23 +96,90 @@ class NotificationSetting(BaseModel):
             'medium': medium
         }
 
-        obj, created = NotificationSetting.objects.get_or_create(
-            defaults={'send': True}, **data)
+        try:
+            return NotificationSetting.objects.get(**data)
+        except NotificationSetting.DoesNotExist:
+            send = cls.get_default(notification_type, medium)
+            return NotificationSetting(send=send, **data)
+
+    @classmethod
+    def get_default(cls, notification_type, medium):
+        """
+        Returns whether to send a notification type to a medium
+        when a user has no setting stored for it.
+        """
+        notification_type = get_notification_type(notification_type)
+
+        if notification_type is None:
+            return True
 
-        return obj
+        return notification_type.get(medium, True)
 
     @classmethod
-    def create_default_settings(cls, user):
-        settings = []
-        for notification_type in NOTIFICATION_TYPES:
-            for (key, value) in NOTIFICATION_MEDIA:
-                setting = NotificationSetting(
-                    user=user, notification_type=notification_type['label'],
-                    medium=key, send=notification_type[key])
+    def get_stored_settings(cls, user_ids):
+        """
+        Returns a {user_id: {(notification_type, medium): send}}
+        dictionary of the users' stored settings, in a single query
+        for the users that aren't in the settings cache.
+        """
+        cache = get_settings_cache()
+        stored_settings = {}
+        missing = set()
+
+        for user_id in set(user_ids):
+            entry = cache.get(user_id) if cache else None
+
+            if entry and time.time() - entry[0] < \
+                    settings.NOTIFICATION_SETTINGS_CACHE_TIMEOUT:
+                stored_settings[user_id] = entry[1]
+            else:
+                stored_settings[user_id] = {}
+                missing.add(user_id)
+
+        if missing:
+            rows = NotificationSetting.objects.filter(
+                user_id__in=missing).values_list(
+                'user_id', 'notification_type', 'medium', 'send')
+
+            for user_id, notification_type, medium, send in rows:
+                stored_settings[user_id][(notification_type, medium)] = send
+
+            if cache:
+                now = time.time()
+
+                for user_id in missing:
+                    cache.set(user_id, (now, stored_settings[user_id]))
+
+        return stored_settings
+
+    @classmethod
+    def for_users(cls, users, notification_type):
+        """
+        Returns a {user_id: {medium: send}} dictionary of whether
+        to send a notification type to each of the users, falling
+        back to the type's defaults for missing settings.
+        """
+        user_ids = [user.pk for user in users if user.pk]
+        stored_settings = cls.get_stored_settings(user_ids)
+        user_settings = {}
+
+        for user_id in user_ids:
+            stored = stored_settings[user_id]
+            user_settings[user_id] = dict(
+                (key, stored.get(
+                    (notification_type, key),
+                    cls.get_default(notification_type, key)))
+                for (key, value) in NOTIFICATION_MEDIA)
+
+        return user_settings
 
-                settings.append(setting)
+    @classmethod
+    def clear_cached_settings(cls, *user_ids):
+        cache = get_settings_cache()
 
-        return NotificationSetting.objects.bulk_create(settings)
+        if cache:
+            for user_id in user_ids:
+                cache.delete(user_id)
 
     @classmethod
     def toggle_user_settings(cls, user, send):
@@ -92,9 +189,38 @@ class NotificationSetting(BaseModel):
             if notification_type['toggable'] and notification_type['email']:
                 toggable.append(notification_type['label'])
 
+        defaults = [label for label in toggable
+                    if cls.get_default(label, 'email') == send]
+        overrides = [label for label in toggable if label not in defaults]
+
+        # Settings matching their type's default aren't stored
         NotificationSetting.objects.filter(
-            medium='email', user=user, notification_type__in=toggable
-        ).update(send=send)
+            medium='email', user=user, notification_type__in=defaults
+        ).delete()
+
+        stored = NotificationSetting.objects.filter(
+            medium='email', user=user, notification_type__in=overrides)
+
+        stored_types = set(stored.values_list('notification_type', flat=True))
+
+        stored.update(send=send)
+
+        NotificationSetting.objects.bulk_create([
+            NotificationSetting(
+                user=user, notification_type=label, medium='email', send=send)
+            for label in overrides if label not in stored_types])
+
+        cls.clear_cached_settings(user.pk)
+
+    def post_save(self, *args, **kwargs):
+        self.clear_cached_settings(self.user_id)
+
+        return super(NotificationSetting, self).post_save(*args, **kwargs)
+
+    def post_delete(self, *args, **kwargs):
+        self.clear_cached_settings(self.user_id)
+
+        return super(NotificationSetting, self).post_delete(*args, **kwargs)
 
 
 @python_2_unicode_compatible
@@ -149,6 +275,7 @@ class Notification(BaseModel):
     class Meta:
         get_latest_by = 'date_created'
         ordering = ('-date_created', )
+        revisions = False
 
     def __str__(self):
         context = {
@@ -174,6 +301,61 @@ class Notification(BaseModel):
         return timesince_(self.date_created)
 
 
+@python_2_unicode_compatible
+class NotificationJob(models.Model):
+    """
+    A queued notify call, referencing its sender, recipients and
+    context by id so it can be dispatched by a worker outside of
+    the request. Jobs are deleted once dispatched and kept as
+    failed once they run out of attempts.
+    """
+    STATUS = Choices('queued', 'processing', 'failed')
+
+    status = models.CharField(
+        choices=STATUS, default=STATUS.queued, max_length=20)
+    payload = JSONField(dump_kwargs={
+                        'cls': JSONEncoder, 'separators': (',', ':')})
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    date_created = DateTimeCreatedField()
+
+    objects = NotificationJobManager()
+
+    class Meta:
+        ordering = ('id', )
+        index_together = (
+            ('status', 'available_at'),
+        )
+
+    def __str__(self):
+        return '{} {}'.format(self.payload.get('label'), self.status)
+
+    def fail(self, error, max_attempts, retry_delay=0):
+        """
+        Records a failed attempt. The job is retried after an
+        exponentially growing delay, or kept as failed once it has
+        run out of attempts. The payload is saved too, so a retry
+        skips the deliveries this attempt already made.
+        """
+        self.attempts += 1
+        self.last_error = error
+        self.locked_at = None
+
+        if self.attempts >= max_attempts:
+            self.status = self.STATUS.failed
+        else:
+            delay = retry_delay * 2 ** (self.attempts - 1)
+
+            self.status = self.STATUS.queued
+            self.available_at = timezone.now() + \
+                datetime.timedelta(seconds=delay)
+
+        self.save(update_fields=['attempts', 'last_error', 'locked_at',
+                                 'status', 'available_at', 'payload'])
+
+
 class LanguageStoreNotAvailable(Exception):
     pass
 
@@ -200,7 +382,6 @@ def get_notification_language(user):
 
 @receiver(notify)
 def notify_handler(sender, **kwargs):
-    from ..utils.validators import is_valid_email
     """
     Example signal usage:
 
@@ -215,13 +396,35 @@ def notify_handler(sender, **kwargs):
 
     notify.send(actor, recipients=recipients, label=label,
                 extra_context=extra_context)
+
+    The call is handed to the NOTIFICATION_QUEUE, which dispatches it
+    right away or queues it for the `process_notifications` worker.
     """
+    from .queue import get_queue
+
     kwargs.pop('signal', None)
 
-    recipients = kwargs.pop('recipients')
-    label = kwargs.pop('label')
-    extra_context = kwargs.pop('extra_context', {})
-    override_backends = kwargs.pop('override_backends', None)
+    return get_queue().enqueue(
+        sender, recipients=kwargs.pop('recipients'),
+        label=kwargs.pop('label'),
+        extra_context=kwargs.pop('extra_context', None) or {},
+        override_backends=kwargs.pop('override_backends', None))
+
+
+def dispatch(sender, recipients, label, extra_context=None,
+             override_backends=None, delivered=None):
+    """
+    Delivers a notification to its recipients through every backend
+    they can be sent to. Returns `True` if anything was delivered.
+
+    `delivered` maps backend media to the recipients, by user id or
+    email, a previous attempt already delivered to. They're skipped,
+    and recipients delivered to are added to it.
+    """
+    from ..utils.validators import is_valid_email
+
+    extra_context = extra_context or {}
+    delivered = {} if delivered is None else delivered
     notice_type = get_notification_type(label)
     current_language = get_language()
     sent = False
@@ -235,6 +438,13 @@ def notify_handler(sender, **kwargs):
     else:
         backends = NOTIFICATION_BACKENDS.values()
 
+    recipients = list(recipients)
+    user_settings = NotificationSetting.for_users(
+        [user for user in recipients if not is_valid_email(user)],
+        notice_type['label'])
+
+    languages = OrderedDict()
+
     for user in recipients:
         if is_valid_email(user):
             class User(object):
@@ -250,19 +460,35 @@ def notify_handler(sender, **kwargs):
         except LanguageStoreNotAvailable:
             language = None
 
-        if language is not None:
-            # Activate the user's language
-            activate(language)
+        languages.setdefault(language, []).append(user)
+
+    # Deliver to the recipients sharing a language in a single batch
+    for language, users in languages.items():
+        # Activate the users' language
+        activate(language or current_language)
 
         for backend in backends:
-            if backend.can_send(user, notice_type):
+            done = set(delivered.get(backend.medium, ()))
+
+            batch = [user for user in users
+                     if (user.pk or user.email) not in done and
+                     backend.can_send(
+                         user, notice_type, user_settings.get(user.pk))]
+
+            if not batch:
+                continue
+
+            for user in batch:
                 msg = 'Delivering notification {} from {} to {} via {}'
                 log = msg.format(notice_type, sender, user.email, backend)
                 logger.info(log)
 
-                backend.deliver(user, sender, notice_type, extra_context)
+            backend.deliver_many(batch, sender, notice_type, extra_context)
+
+            delivered.setdefault(backend.medium, []).extend(
+                user.pk or user.email for user in batch)
 
-                sent = True
+            sent = True
 
     # Reset environment to original language
     activate(current_language)
@@ -0,0 +1,164 @@
+import traceback
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models
+from django.utils.log import getLogger
+from django.utils.module_loading import import_by_path
+
+from ..utils.validators import is_valid_email
+from .models import NotificationJob, dispatch
+
+
+logger = getLogger(__name__)
+
+
+def serialize_object(obj):
+    """
+    Returns a reference to a model instance, by content type and id.
+    """
+    if obj is None:
+        return None
+
+    return {
+        'content_type': ContentType.objects.get_for_model(obj).pk,
+        'object_id': obj.pk
+    }
+
+
+def deserialize_object(reference):
+    """
+    Returns the model instance a reference points to. Raises
+    ObjectDoesNotExist if it was deleted.
+    """
+    if reference is None:
+        return None
+
+    content_type = ContentType.objects.get_for_id(reference['content_type'])
+
+    return content_type.get_object_for_this_type(pk=reference['object_id'])
+
+
+def serialize_job(sender, recipients, label, extra_context=None,
+                  override_backends=None):
+    """
+    Returns a notify call as a JSON-serializable payload, with model
+    instances replaced by references.
+    """
+    users, emails, objects, values = [], [], {}, {}
+
+    for recipient in recipients:
+        if is_valid_email(recipient):
+            emails.append(recipient)
+        else:
+            users.append(recipient.pk)
+
+    for key, value in (extra_context or {}).items():
+        if isinstance(value, models.Model):
+            objects[key] = serialize_object(value)
+        else:
+            values[key] = value
+
+    return {
+        'sender': serialize_object(sender),
+        'recipients': {'users': users, 'emails': emails},
+        'label': label,
+        'extra_context': {'objects': objects, 'values': values},
+        'override_backends': list(override_backends or []) or None
+    }
+
+
+def deserialize_job(payload):
+    """
+    Returns the keyword arguments to `dispatch` a job's payload with.
+    """
+    User = get_user_model()
+
+    recipients = list(User.objects.filter(
+        pk__in=payload['recipients']['users']))
+    recipients += payload['recipients']['emails']
+
+    extra_context = dict(payload['extra_context']['values'])
+
+    for key, reference in payload['extra_context']['objects'].items():
+        extra_context[key] = deserialize_object(reference)
+
+    return {
+        'sender': deserialize_object(payload['sender']),
+        'recipients': recipients,
+        'label': payload['label'],
+        'extra_context': extra_context,
+        'override_backends': payload['override_backends'],
+        'delivered': payload.setdefault('delivered', {})
+    }
+
+
+def process_job(job, max_attempts=None, retry_delay=None):
+    """
+    Dispatches a claimed job and deletes it. Failed jobs are retried
+    until they run out of attempts, skipping the backends and
+    recipients already delivered to, and jobs referencing deleted
+    objects are failed right away. Returns `True` if the job was
+    dispatched.
+    """
+    if max_attempts is None:
+        max_attempts = settings.NOTIFICATION_QUEUE_MAX_ATTEMPTS
+
+    if retry_delay is None:
+        retry_delay = settings.NOTIFICATION_QUEUE_RETRY_DELAY
+
+    try:
+        dispatch(**deserialize_job(job.payload))
+    except ObjectDoesNotExist:
+        logger.warning('Notification job {} references a deleted '
+                       'object'.format(job.pk))
+        job.fail(traceback.format_exc(), max_attempts=0)
+        return False
+    except Exception:
+        logger.exception('Notification job {} failed'.format(job.pk))
+        job.fail(traceback.format_exc(), max_attempts, retry_delay)
+        return False
+
+    job.delete()
+
+    return True
+
+
+class SynchronousQueue(object):
+    """
+    Dispatches notify calls right away, in the same process.
+    """
+    def enqueue(self, sender, recipients, label, extra_context=None,
+                override_backends=None):
+        return dispatch(sender, recipients, label, extra_context,
+                        override_backends)
+
+
+class DatabaseQueue(object):
+    """
+    Stores notify calls as NotificationJobs for the
+    `process_notifications` worker to dispatch.
+    """
+    def enqueue(self, sender, recipients, label, extra_context=None,
+                override_backends=None):
+        payload = serialize_job(sender, recipients, label, extra_context,
+                                override_backends)
+
+        return NotificationJob.objects.enqueue(payload)
+
+
+_queues = {}
+
+
+def get_queue():
+    """
+    Returns an instance of the configured NOTIFICATION_QUEUE.
+    """
+    path = settings.NOTIFICATION_QUEUE
+
+    if path not in _queues:
+        _queues[path] = import_by_path(path)()
+
+    return _queues[path]
@@ -0,0 +1,60 @@
+from django.core import mail
+
+from mock import patch
+
+from ...utils.tests import BaseTestCase
+from ..backends import email
+from ..types import get_notification_type
+
+
+class EmailBackendTestCase(BaseTestCase):
+    def setUp(self):
+        self.create_user()
+        self.another_user = self.create_another_user()
+
+        self.backend = email.EmailBackend('email')
+        self.notification_type = get_notification_type(
+            'user_password_updated')
+
+    def deliver_many(self):
+        return self.backend.deliver_many(
+            [self.user, self.another_user], self.user,
+            self.notification_type, {})
+
+    def test_deliver_many_should_send_through_one_connection(self):
+        """
+        Tests that `.deliver_many` sends every recipient's email
+        through a single connection.
+        """
+        with patch.object(email, 'get_connection',
+                          wraps=email.get_connection) as get_connection:
+            self.assertEqual(self.deliver_many(), 2)
+
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual([message.to for message in mail.outbox],
+                         [[self.user.email], [self.another_user.email]])
+
+    def test_deliver_many_should_isolate_failed_messages(self):
+        """
+        Tests that `.deliver_many` keeps sending after a message
+        fails to send.
+        """
+        with patch.object(email, 'get_connection') as get_connection:
+            connection = get_connection.return_value
+            connection.send_messages.side_effect = [Exception('Boom'), 1]
+
+            self.assertEqual(self.deliver_many(), 1)
+
+        self.assertEqual(connection.send_messages.call_count, 2)
+        connection.close.assert_called_once_with()
+
+    def test_deliver_many_should_raise_if_nothing_was_sent(self):
+        """
+        Tests that `.deliver_many` raises the error if none of the
+        messages could be sent, so the notification can be retried.
+        """
+        with patch.object(email, 'get_connection') as get_connection:
+            connection = get_connection.return_value
+            connection.send_messages.side_effect = Exception('Boom')
+
+            self.assertRaises(Exception, self.deliver_many)
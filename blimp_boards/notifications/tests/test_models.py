@@ -0,0 +1,129 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test.utils import override_settings
+
+from ...utils.tests import BaseTestCase
+from ..models import Notification, NotificationSetting, notify_handler
+
+
+class NotificationSettingTestCase(BaseTestCase):
+    def setUp(self):
+        self.create_user()
+        self.another_user = self.create_another_user()
+
+    def test_new_users_should_have_no_stored_settings(self):
+        """
+        Tests that signing up doesn't store any settings, defaults
+        being resolved from the notification types.
+        """
+        self.assertFalse(
+            NotificationSetting.objects.filter(user=self.user).exists())
+
+    def test_toggle_user_settings_should_only_store_overrides(self):
+        """
+        Tests that `.toggle_user_settings` stores settings differing
+        from their default and removes them when toggled back.
+        """
+        NotificationSetting.toggle_user_settings(self.user, False)
+
+        stored = NotificationSetting.objects.filter(user=self.user)
+
+        self.assertEqual(
+            set(stored.values_list('notification_type', 'medium', 'send')),
+            set([('card_comment_created', 'email', False),
+                 ('board_collaborator_created', 'email', False)]))
+
+        NotificationSetting.toggle_user_settings(self.user, True)
+
+        self.assertFalse(stored.exists())
+
+    def test_for_user_should_return_unsaved_default(self):
+        """
+        Tests that `.for_user` returns the type's default for a
+        missing setting without storing it.
+        """
+        setting = NotificationSetting.for_user(
+            self.user, 'card_created', 'email')
+
+        self.assertIsNone(setting.pk)
+        self.assertFalse(setting.send)
+
+    def test_for_users_should_load_settings_in_one_query(self):
+        """
+        Tests that `.for_users` loads all of the users' settings
+        in a single query.
+        """
+        with self.assertNumQueries(1):
+            user_settings = NotificationSetting.for_users(
+                [self.user, self.another_user], 'card_comment_created')
+
+        expected_settings = {'email': True, 'notification': True}
+
+        self.assertEqual(user_settings[self.user.id], expected_settings)
+        self.assertEqual(user_settings[self.another_user.id],
+                         expected_settings)
+
+    def test_for_users_should_fall_back_to_type_defaults(self):
+        """
+        Tests that `.for_users` falls back to the notification type's
+        defaults for missing settings, without storing them.
+        """
+        user_settings = NotificationSetting.for_users(
+            [self.user], 'card_created')
+
+        expected_settings = {'email': False, 'notification': True}
+
+        self.assertEqual(user_settings[self.user.id], expected_settings)
+        self.assertFalse(
+            NotificationSetting.objects.filter(user=self.user).exists())
+
+    @override_settings(NOTIFICATION_SETTINGS_CACHE_SIZE=10)
+    def test_for_users_should_use_settings_cache(self):
+        """
+        Tests that `.for_users` keeps settings in the per-process
+        cache until they're toggled.
+        """
+        NotificationSetting.clear_cached_settings(self.user.id)
+        NotificationSetting.for_users([self.user], 'card_comment_created')
+
+        with self.assertNumQueries(0):
+            NotificationSetting.for_users([self.user], 'card_comment_created')
+
+        NotificationSetting.toggle_user_settings(self.user, False)
+
+        user_settings = NotificationSetting.for_users(
+            [self.user], 'card_comment_created')
+
+        self.assertFalse(user_settings[self.user.id]['email'])
+
+    def test_notify_handler_should_load_settings_once(self):
+        """
+        Tests that notify_handler loads the recipients' settings in a
+        single query instead of once per recipient and backend.
+        """
+        recipients = [self.user, self.another_user]
+
+        with self.assertNumQueries(1):
+            notify_handler(self.user, recipients=recipients,
+                           label='user_password_updated',
+                           override_backends=('notification', ))
+
+    def test_notify_handler_should_create_notifications_in_one_query(self):
+        """
+        Tests that notify_handler creates all of the recipients'
+        notifications with a single insert.
+        """
+        recipients = [self.user, self.another_user]
+
+        ContentType.objects.get_for_model(self.user)
+
+        with self.assertNumQueries(2):
+            notify_handler(self.user, recipients=recipients,
+                           label='card_created',
+                           override_backends=('notification', ))
+
+        notifications = Notification.objects.order_by('recipient')
+
+        self.assertEqual(
+            [n.data['recipient']['id'] for n in notifications],
+            [self.user.id, self.another_user.id])
+        self.assertEqual(notifications[0].verb, 'created a card on board')
@@ -0,0 +1,179 @@
+from django.core.management import call_command
+from django.utils.six import StringIO
+
+from mock import patch
+
+from ...utils.tests import BaseTestCase
+from ..models import Notification, NotificationJob, dispatch
+from ..queue import (DatabaseQueue, serialize_job, deserialize_job,
+                     process_job)
+
+
+class NotificationQueueTestCase(BaseTestCase):
+    def setUp(self):
+        self.create_user()
+        self.create_account()
+        self.create_board()
+        self.create_card()
+
+        self.another_user = self.create_another_user()
+        self.queue = DatabaseQueue()
+
+    def enqueue(self, **kwargs):
+        defaults = {
+            'sender': self.user,
+            'recipients': [self.another_user],
+            'label': 'card_created',
+            'extra_context': {
+                'action_object': self.card,
+                'target': self.board,
+                'description': 'A card'
+            },
+            'override_backends': ('notification', )
+        }
+
+        defaults.update(kwargs)
+
+        return self.queue.enqueue(**defaults)
+
+    def test_serialize_job_should_reference_objects_by_id(self):
+        """
+        Tests that `serialize_job` replaces model instances with
+        references and `deserialize_job` loads them back.
+        """
+        payload = serialize_job(
+            self.user, [self.another_user, 'jdoe@example.com'],
+            'card_created', {'target': self.board, 'description': 'A card'})
+
+        self.assertEqual(payload['recipients'], {
+            'users': [self.another_user.id],
+            'emails': ['jdoe@example.com']
+        })
+        self.assertEqual(payload['extra_context']['values'],
+                         {'description': 'A card'})
+
+        kwargs = deserialize_job(payload)
+
+        self.assertEqual(kwargs['sender'], self.user)
+        self.assertEqual(kwargs['recipients'],
+                         [self.another_user, 'jdoe@example.com'])
+        self.assertEqual(kwargs['extra_context'],
+                         {'target': self.board, 'description': 'A card'})
+
+    def test_process_job_should_dispatch_and_delete_job(self):
+        """
+        Tests that `process_job` dispatches a job's notification and
+        deletes the job.
+        """
+        job = self.enqueue()
+
+        self.assertTrue(process_job(job))
+
+        notification = Notification.objects.get(recipient=self.another_user)
+
+        self.assertEqual(notification.action_object, self.card)
+        self.assertEqual(notification.description, 'A card')
+        self.assertFalse(NotificationJob.objects.exists())
+
+    def test_process_job_should_retry_failed_job(self):
+        """
+        Tests that `process_job` puts a failed job back in the queue
+        until it runs out of attempts.
+        """
+        job = self.enqueue(label='not_a_notification_type')
+
+        self.assertFalse(process_job(job, max_attempts=2, retry_delay=60))
+
+        job = NotificationJob.objects.get(pk=job.pk)
+
+        self.assertEqual(job.status, NotificationJob.STATUS.queued)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(list(NotificationJob.objects.claim(10)), [])
+
+        process_job(job, max_attempts=2, retry_delay=60)
+
+        job = NotificationJob.objects.get(pk=job.pk)
+
+        self.assertEqual(job.status, NotificationJob.STATUS.failed)
+        self.assertTrue(job.last_error)
+
+    def test_process_job_should_keep_deliveries_of_failed_job(self):
+        """
+        Tests that `process_job` saves the deliveries made before a
+        job failed, for the retry to skip them.
+        """
+        job = self.enqueue()
+
+        def failing_dispatch(**kwargs):
+            kwargs['delivered'].setdefault('notification', []).append(
+                self.another_user.id)
+            raise Exception
+
+        with patch('blimp_boards.notifications.queue.dispatch',
+                   failing_dispatch):
+            process_job(job, max_attempts=2)
+
+        job = NotificationJob.objects.get(pk=job.pk)
+
+        self.assertEqual(job.payload['delivered'],
+                         {'notification': [self.another_user.id]})
+
+    def test_dispatch_should_skip_recipients_already_delivered_to(self):
+        """
+        Tests that `dispatch` only delivers to recipients a previous
+        attempt didn't deliver to, and records the new deliveries.
+        """
+        delivered = {'notification': [self.another_user.id]}
+
+        dispatch(self.user, [self.another_user, self.user], 'card_created',
+                 {'action_object': self.card, 'target': self.board},
+                 override_backends=('notification', ), delivered=delivered)
+
+        notifications = Notification.objects.all()
+
+        self.assertFalse(notifications.filter(
+            recipient=self.another_user).exists())
+        self.assertTrue(notifications.filter(recipient=self.user).exists())
+        self.assertEqual(delivered, {
+            'notification': [self.another_user.id, self.user.id]})
+
+    def test_process_job_should_fail_job_with_deleted_objects(self):
+        """
+        Tests that `process_job` doesn't retry a job whose objects
+        were deleted.
+        """
+        job = self.enqueue()
+
+        self.card.delete()
+        process_job(job)
+
+        job = NotificationJob.objects.get(pk=job.pk)
+
+        self.assertEqual(job.status, NotificationJob.STATUS.failed)
+        self.assertEqual(job.attempts, 1)
+
+    def test_claim_should_only_claim_a_job_once(self):
+        """
+        Tests that `.claim` doesn't return jobs already claimed.
+        """
+        job = self.enqueue()
+
+        self.assertEqual(NotificationJob.objects.claim(10), [job])
+        self.assertEqual(NotificationJob.objects.claim(10), [])
+
+    def test_process_notifications_should_drain_queue(self):
+        """
+        Tests that the `process_notifications` command dispatches
+        every queued job.
+        """
+        self.enqueue()
+        self.enqueue(recipients=[self.user])
+
+        count = Notification.objects.count()
+        stdout = StringIO()
+        call_command('process_notifications', once=True, concurrency=1,
+                     stdout=stdout)
+
+        self.assertEqual(Notification.objects.count(), count + 2)
+        self.assertFalse(NotificationJob.objects.exists())
+        self.assertIn('Dispatched 2 notifications', stdout.getvalue())
@@ -50,6 +50,8 @@ class Common(Configuration):
 
     # Middlewares
     MIDDLEWARE_CLASSES = (
+        'blimp_boards.utils.middleware.AnnounceMiddleware',
+        'blimp_boards.utils.middleware.PermissionsCacheMiddleware',
         'djangosecure.middleware.SecurityMiddleware',
         'django.contrib.sessions.middleware.SessionMiddleware',
         'django.middleware.common.CommonMiddleware',
@@ -136,6 +138,25 @@ class Common(Configuration):
 
     # Cache
     SITEMAP_CACHE_TIMEOUT = 60 * 60 * 24
+    ACL_CACHE_TIMEOUT = values.IntegerValue(
+        environ_prefix=None, default=60 * 5)
+    NOTIFICATION_SETTINGS_CACHE_SIZE = values.IntegerValue(
+        environ_prefix=None, default=0)
+    NOTIFICATION_SETTINGS_CACHE_TIMEOUT = values.IntegerValue(
+        environ_prefix=None, default=60)
+
+    # Notifications queue
+    NOTIFICATION_QUEUE = values.Value(
+        environ_prefix=None,
+        default='blimp_boards.notifications.queue.DatabaseQueue')
+    NOTIFICATION_QUEUE_CONCURRENCY = values.IntegerValue(
+        environ_prefix=None, default=4)
+    NOTIFICATION_QUEUE_MAX_ATTEMPTS = values.IntegerValue(
+        environ_prefix=None, default=5)
+    NOTIFICATION_QUEUE_RETRY_DELAY = values.IntegerValue(
+        environ_prefix=None, default=60)
+    NOTIFICATION_QUEUE_LOCK_TIMEOUT = values.IntegerValue(
+        environ_prefix=None, default=60 * 10)
 
     # Django REST framework
     REST_FRAMEWORK = {
@@ -162,12 +183,24 @@ class Common(Configuration):
 
     # Announce
     ANNOUNCE_TEST_MODE = values.BooleanValue(environ_prefix=None, default=True)
+    ANNOUNCE_PARTIAL_UPDATES = values.BooleanValue(
+        environ_prefix=None, default=False)
+    ANNOUNCE_REDIS_MAX_CONNECTIONS = values.IntegerValue(
+        environ_prefix=None, default=10)
+    ANNOUNCE_REDIS_SOCKET_TIMEOUT = values.FloatValue(
+        environ_prefix=None, default=5.0)
+
+    # Board changes
+    BOARD_CHANGES_RETENTION_DAYS = values.IntegerValue(
+        environ_prefix=None, default=7)
 
     # AWS
     AWS_ACCESS_KEY_ID = values.Value(environ_prefix=None)
     AWS_SECRET_ACCESS_KEY = values.Value(environ_prefix=None)
     AWS_STORAGE_BUCKET_NAME = values.Value(environ_prefix=None)
     AWS_SIGNATURE_EXPIRES_IN = 60 * 60 * 3
+    AWS_SIGNATURE_WINDOW = 60 * 60
+    AWS_SIGNED_URLS_CACHE_SIZE = 50000
 
     # boards-web
     BOARDS_WEB_STATIC_URL = values.Value(environ_prefix=None)
@@ -240,6 +273,11 @@ class Development(Common):
     # Email Settings
     EMAIL_BACKEND = 'blimp_boards.utils.backends.BrowsableEmailBackend'
 
+    # Dispatch notifications without a worker
+    NOTIFICATION_QUEUE = values.Value(
+        environ_prefix=None,
+        default='blimp_boards.notifications.queue.SynchronousQueue')
+
     # Django Debug Toolbar
     DEBUG_TOOLBAR_PATCH_SETTINGS = values.BooleanValue(
         environ_prefix=None, default=True)
@@ -304,6 +342,22 @@ class Staging(Common):
     # Allow all host headers
     ALLOWED_HOSTS = ['*']
 
+    # Cache, shared by all workers so cleared memberships reach them.
+    # Without Redis, memberships aren't cached at all.
+    if os.getenv('BOARDS_SOCKETS_REDIS_URL'):
+        CACHES = {
+            'default': {
+                'BACKEND': 'django_redis.cache.RedisCache',
+                'LOCATION': os.getenv('BOARDS_SOCKETS_REDIS_URL'),
+            }
+        }
+    else:
+        CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+            }
+        }
+
     # Django REST framework
     Common.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = (
         'rest_framework.renderers.JSONRenderer',
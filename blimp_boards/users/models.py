@@ -17,6 +17,7 @@ from ..notifications.signals import notify
 from ..utils.decorators import autoconnect
 from ..utils.jwt_handlers import jwt_payload_handler, jwt_encode_handler
 from ..utils.models import BaseModel
+from ..utils.permissions import get_account_owners, get_board_permissions
 from ..utils.request import get_ip_address
 from ..utils.validators import username_validator
 from .managers import UserManager, ActiveUserManager
@@ -29,7 +30,7 @@ def update_last_ip(sender, user, request, **kwargs):
     the user logging in.
     """
     user.last_ip = get_ip_address(request)
-    user.save()
+    user.save(only_dirty=True)
 user_logged_in.connect(update_last_ip)
 
 
@@ -124,9 +125,6 @@ class User(BaseModel, AbstractBaseUser):
         return super(User, self).save(*args, **kwargs)
 
     def post_save(self, created, *args, **kwargs):
-        if created:
-            NotificationSetting.create_default_settings(self)
-
         # Update personal account slug if username changes
         if self.has_field_changed('username'):
             account = self.account
@@ -213,12 +211,8 @@ class User(BaseModel, AbstractBaseUser):
         Returns a list of all boards where user is a collaborator.
         """
         Board = get_model('boards', 'Board')
-        BoardCollaborator = get_model('boards', 'BoardCollaborator')
 
-        board_ids = BoardCollaborator.objects.filter(
-            user=self).values_list('board_id', flat=True)
-
-        return Board.objects.filter(pk__in=board_ids)
+        return Board.objects.filter(id__in=self.board_ids)
 
     @property
     def cards(self):
@@ -227,12 +221,39 @@ class User(BaseModel, AbstractBaseUser):
         """
         Card = get_model('cards', 'Card')
 
-        return Card.objects.filter(board__in=self.boards)
+        return Card.objects.filter(board_id__in=self.board_ids)
+
+    @property
+    def board_ids(self):
+        """
+        Returns a subquery of the ids of boards where user is a
+        collaborator. Filtering on it keeps a single semi-join, which
+        unlike a join doesn't duplicate rows when OR-combined.
+        """
+        BoardCollaborator = get_model('boards', 'BoardCollaborator')
+
+        return BoardCollaborator.objects.filter(user=self).values('board_id')
+
+    @property
+    def subscription_rooms(self):
+        """
+        Returns the announce rooms for the user, the user's accounts
+        and boards where the user is a collaborator.
+        """
+        account_ids = sorted(get_account_owners(self))
+        board_ids = sorted(get_board_permissions(self))
+
+        rooms = [self.announce_room]
+        rooms += ['a{}'.format(account_id) for account_id in account_ids]
+        rooms += ['b{}'.format(board_id) for board_id in board_ids]
+
+        return rooms
 
     @property
     def notification_settings(self):
         """
-        Returns a list of all of the user's email notification settings.
+        Returns a list of the user's email notification settings that
+        override their notification type's default.
         """
         return NotificationSetting.objects.filter(user=self, medium='email')
 
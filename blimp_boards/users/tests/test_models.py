@@ -1,3 +1,5 @@
+from ...boards.models import Board, BoardCollaborator
+from ...cards.models import Card
 from ...utils.tests import BaseTestCase
 from ..models import User
 
@@ -104,3 +106,53 @@ class UserModelTestCase(BaseTestCase):
         self.user.save()
 
         self.assertEqual(User.active.count(), 0)
+
+
+class UserBoardsTestCase(BaseTestCase):
+    def setUp(self):
+        self.create_user()
+        self.create_account()
+        self.create_board()
+        self.create_card()
+
+    def test_boards_should_return_boards_user_collaborates_on(self):
+        """
+        Tests that `.boards` returns only boards where the user
+        is a collaborator.
+        """
+        user = self.create_another_user()
+
+        self.assertEqual(list(self.user.boards), [self.board])
+        self.assertEqual(list(user.boards), [])
+
+    def test_boards_shouldnt_duplicate_combined_shared_boards(self):
+        """
+        Tests that combining `.boards` with shared boards returns
+        each board once, whatever its number of collaborators.
+        """
+        user = self.create_another_user()
+
+        BoardCollaborator.objects.create(
+            board=self.board, user=user, created_by=self.user,
+            permission='read')
+
+        self.board.is_shared = True
+        self.board.save()
+
+        boards = self.user.boards | Board.objects.filter(is_shared=True)
+        cards = self.user.cards | Card.objects.filter(board__is_shared=True)
+
+        self.assertEqual(list(boards), [self.board])
+        self.assertEqual(list(cards), [self.card])
+
+    def test_cards_should_return_cards_of_user_boards(self):
+        """
+        Tests that `.cards` returns only cards of boards where the
+        user is a collaborator, in a single query.
+        """
+        user = self.create_another_user()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(list(self.user.cards), [self.card])
+
+        self.assertEqual(list(user.cards), [])
@@ -849,3 +849,39 @@ class CancelAccountAPIViewTestCase(AuthenticatedAPITestCase):
 
         self.assertFalse(user.is_active)
         self.assertEqual(response.status_code, 200)
+
+
+class UserRoomsAPIViewTestCase(AuthenticatedAPITestCase):
+    def setUp(self):
+        super(UserRoomsAPIViewTestCase, self).setUp()
+
+        self.create_account()
+        self.create_board()
+
+        self.url = '/api/v1/users/me/rooms/'
+
+    def test_get_should_return_rooms_for_logged_in_user(self):
+        """
+        Tests that endpoint returns the user, account and board rooms.
+        """
+        response = self.client.get(self.url)
+
+        expected_response = {
+            'rooms': [
+                'u{}'.format(self.user.id),
+                'a{}'.format(self.account.id),
+                'b{}'.format(self.board.id),
+            ]
+        }
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, expected_response)
+
+    def test_get_for_loggedout_user(self):
+        """
+        Tests that endpoint only works for logged in users.
+        """
+        self.client = APIClient()
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -16,6 +16,7 @@ api_urlpatterns = patterns(
     (r'autocomplete/users/$', views.UserAutoCompleteAPIView.as_view()),
 
     (r'users/me/$', views.UserSettingsAPIView.as_view()),
+    (r'users/me/rooms/$', views.UserRoomsAPIView.as_view()),
     (r'users/me/change_password/$', views.ChangePasswordAPIView.as_view()),
     (r'users/me/cancel/$', views.CancelAccountAPIView.as_view()),
 )
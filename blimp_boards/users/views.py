@@ -5,6 +5,7 @@ from rest_framework.renderers import TemplateHTMLRenderer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
+from ..utils.announcer import get_subscription_room
 from ..utils.response import ErrorResponse
 from ..utils.generics import RetrieveUpdateAPIView
 from ..invitations.models import SignupRequest, InvitedUser
@@ -87,6 +88,20 @@ class UserSettingsAPIView(RetrieveUpdateAPIView):
         return self.request.user
 
 
+class UserRoomsAPIView(APIView):
+    """
+    Returns the announce rooms the authenticated user can subscribe to.
+    With `partial=true`, the rooms announcing only changed fields.
+    """
+    def get(self, request):
+        data = {
+            'rooms': [get_subscription_room(room, request)
+                      for room in request.user.subscription_rooms]
+        }
+
+        return Response(data)
+
+
 class ChangePasswordAPIView(generics.CreateAPIView):
     model = User
     serializer_class = serializers.ChangePasswordSerializer
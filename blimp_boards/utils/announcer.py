@@ -0,0 +1,424 @@
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import redis
+
+from django.conf import settings
+from django.utils.encoding import smart_text
+from django.utils.log import getLogger
+
+from announce import Announce
+from rest_framework.renderers import JSONRenderer
+
+from .signals import announced
+
+try:
+    import urlparse
+except ImportError:
+    import urllib.parse as urlparse
+
+
+logger = getLogger(__name__)
+
+urlparse.uses_netloc.append('redis')
+
+
+def json_renderer(data):
+    return smart_text(JSONRenderer().render(data))
+
+
+def get_partial_room(room):
+    """
+    Returns the room that gets the partial updates announced to a
+    room, for clients that opt into them.
+    """
+    return '{}:partial'.format(room)
+
+
+def get_subscription_room(room, request):
+    """
+    Returns the room a client should subscribe to instead of `room`.
+    Clients opt into partial updates with a `partial` query parameter
+    while ANNOUNCE_PARTIAL_UPDATES is on.
+    """
+    partial = request.QUERY_PARAMS.get('partial', '').lower()
+
+    if settings.ANNOUNCE_PARTIAL_UPDATES and partial in ('1', 'true'):
+        return get_partial_room(room)
+
+    return room
+
+
+class AnnounceQueue(object):
+    """
+    Buffers model announcements and coalesces them into one final
+    event per room for each (model, pk).
+    """
+
+    def __init__(self):
+        self.events = OrderedDict()
+
+    def __len__(self):
+        return len(self.events)
+
+    def add(self, instance, method, room, fields=None):
+        key = (room, instance.__class__, instance.pk)
+        previous = self.events.pop(key, None)
+
+        if previous:
+            method = self.merge(previous['method'], method)
+
+            if method is None:
+                return None
+
+            fields = self.merge_fields(previous['fields'], fields)
+
+        if method == 'create':
+            fields = None
+
+        event = {
+            'instance': instance,
+            'method': method,
+            'room': room,
+            'fields': fields,
+            'data': None,
+        }
+
+        # Deleted instances can't be serialized once the
+        # transaction commits, so serialize them right away.
+        if method == 'delete':
+            event['data'] = instance.get_announce_data(method, fields)
+
+        self.events[key] = event
+
+    def merge(self, previous, method):
+        """
+        Returns the method of the event that replaces two events for
+        the same instance, or `None` if they cancel each other out.
+        """
+        if previous == 'create' and method == 'delete':
+            return None
+
+        if previous == 'create':
+            return 'create'
+
+        if previous == 'delete' and method == 'create':
+            return 'update'
+
+        return method
+
+    def merge_fields(self, previous, fields):
+        """
+        Returns the changed fields of two merged events, `None`
+        meaning the whole instance.
+        """
+        if previous is None or fields is None:
+            return None
+
+        return set(previous) | set(fields)
+
+    def messages(self):
+        """
+        Returns a list of (data, room) tuples ready to be published.
+        """
+        messages = []
+
+        # Events are serialized with a shared context, letting
+        # serializers reuse lookups across the whole flush, and
+        # once for all rooms getting the same message.
+        context = {'announce_queue': self}
+        serialized = {}
+
+        for event in self.events.values():
+            data = event['data']
+
+            if data is None:
+                instance, fields = event['instance'], event['fields']
+
+                key = (instance.__class__, instance.pk, event['method'],
+                       None if fields is None else frozenset(fields))
+
+                if key not in serialized:
+                    serialized[key] = instance.get_announce_data(
+                        event['method'], fields, context=context)
+
+                data = serialized[key]
+
+            messages.append((data, event['room']))
+
+        return messages
+
+
+class Announcer(object):
+    """
+    A process-wide publisher for SocketIO announcements.
+
+    Keeps one Redis connection pool per process (redis-py resets the
+    pool after a fork, so each worker gets its own), reconnects when a
+    publish fails and records how many messages went out and how long
+    publishing took.
+
+    Announcements made between `begin()` and `end()` (or inside
+    `deferred()`) are queued, coalesced and published in a single
+    pipelined batch at the end.
+
+    The `announced` signal is sent with every batch of messages once
+    it has been published, so only messages clients could have
+    received are recorded.
+    """
+    channel = 'dispatch'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._client = None
+        self.reset_stats()
+
+    @property
+    def test_mode(self):
+        return settings.ANNOUNCE_TEST_MODE
+
+    @property
+    def stats(self):
+        """
+        Returns a copy of the publish counters for this process.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                'publishes': 0,
+                'failures': 0,
+                'duration': 0.0,
+            }
+
+    def get_connection_pool(self):
+        """
+        Returns a new Redis connection pool for BOARDS_SOCKETS_REDIS_URL.
+        """
+        redis_url = urlparse.urlparse(settings.BOARDS_SOCKETS_REDIS_URL)
+
+        return redis.ConnectionPool(
+            host=redis_url.hostname,
+            password=redis_url.password,
+            port=int(redis_url.port) if redis_url.port else 6379,
+            db=int(redis_url.path[1:]) if redis_url.path[1:] else 0,
+            socket_timeout=settings.ANNOUNCE_REDIS_SOCKET_TIMEOUT,
+            max_connections=settings.ANNOUNCE_REDIS_MAX_CONNECTIONS)
+
+    def get_client(self):
+        """
+        Returns the long-lived Redis client, creating it on first use.
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = redis.StrictRedis(
+                        connection_pool=self.get_connection_pool())
+
+        return self._client
+
+    def disconnect(self):
+        """
+        Drops the current client so the next publish reconnects.
+        """
+        with self._lock:
+            client, self._client = self._client, None
+
+        if client is not None:
+            client.connection_pool.disconnect()
+
+    @property
+    def queue(self):
+        return getattr(self._local, 'queue', None)
+
+    def begin(self):
+        """
+        Starts deferring announcements on the current thread. Calls
+        can be nested, only the outermost `end()` publishes.
+        """
+        if self.queue is None:
+            self._local.queue = AnnounceQueue()
+            self._local.depth = 0
+
+        self._local.depth += 1
+
+    def end(self, publish=True):
+        """
+        Leaves a deferred block, publishing or discarding the queued
+        announcements if it was the outermost one.
+        """
+        queue = self.queue
+
+        if queue is None:
+            return None
+
+        self._local.depth -= 1
+
+        if self._local.depth > 0:
+            return None
+
+        self.reset()
+
+        if not publish or not queue:
+            return None
+
+        try:
+            messages = queue.messages()
+        except Exception as e:
+            logger.exception(e)
+            return None
+
+        return self.emit_many(messages)
+
+    def reset(self):
+        """
+        Discards any deferred announcements on the current thread.
+        """
+        self._local.queue = None
+        self._local.depth = 0
+
+    @contextmanager
+    def deferred(self):
+        """
+        Context manager that defers announcements made inside it and
+        publishes them once it exits without an exception.
+        """
+        self.begin()
+
+        try:
+            yield
+        except Exception:
+            self.end(publish=False)
+            raise
+
+        self.end()
+
+    def announce(self, instance, method, room, fields=None):
+        """
+        Announces a model change, queueing it if announcements
+        are being deferred. `fields` are the changed fields, if known.
+        """
+        queue = self.queue
+
+        if queue is not None:
+            return queue.add(instance, method, room, fields=fields)
+
+        data = instance.get_announce_data(method, fields)
+
+        return self.emit(data, room=room)
+
+    def encode(self, data, room=None):
+        """
+        Returns the packet the SocketIO Redis store expects for a message.
+        Encoders keep per-emit state, so each thread gets its own.
+        """
+        encoder = getattr(self._local, 'encoder', None)
+
+        if encoder is None:
+            encoder = Announce(json_dumps=json_renderer, _test_mode=True)
+            self._local.encoder = encoder
+
+        encoder.room = ''
+
+        return encoder.emit('message', data, room=room)
+
+    def emit(self, data, room=None):
+        """
+        Publishes a message to a room. Errors are logged, never raised.
+        """
+        start = time.time()
+
+        try:
+            packet = self.encode(data, room=room)
+
+            if not self.test_mode:
+                self.publish(packet)
+        except Exception as e:
+            logger.exception(e)
+            self.record(failures=1, duration=time.time() - start)
+            return None
+
+        self.record(publishes=1, duration=time.time() - start)
+        self.send_announced([(data, room)])
+
+        return packet
+
+    def emit_many(self, messages):
+        """
+        Publishes a list of (data, room) messages in one pipelined
+        batch. Errors are logged, never raised.
+        """
+        start = time.time()
+
+        try:
+            packets = [self.encode(data, room=room)
+                       for data, room in messages]
+
+            if not self.test_mode:
+                self.publish_many(packets)
+        except Exception as e:
+            logger.exception(e)
+            self.record(failures=len(messages),
+                        duration=time.time() - start)
+            return None
+
+        self.record(publishes=len(packets), duration=time.time() - start)
+        self.send_announced(messages)
+
+        return packets
+
+    def send_announced(self, messages):
+        """
+        Sends the `announced` signal for a list of (data, room)
+        messages. Receiver errors are logged, never raised.
+        """
+        responses = announced.send_robust(
+            sender=self.__class__, messages=messages)
+
+        for receiver, response in responses:
+            if isinstance(response, Exception):
+                logger.error(response)
+
+    def publish_many(self, packets):
+        """
+        Publishes packets through a non-transactional pipeline, retrying
+        once on a fresh connection if the pooled one went away.
+        """
+        def execute():
+            pipeline = self.get_client().pipeline(transaction=False)
+
+            for packet in packets:
+                pipeline.publish(self.channel, packet)
+
+            return pipeline.execute()
+
+        try:
+            return execute()
+        except redis.ConnectionError:
+            self.disconnect()
+            return execute()
+
+    def publish(self, packet):
+        """
+        Publishes a packet, retrying once on a fresh connection if
+        the pooled one went away.
+        """
+        try:
+            return self.get_client().publish(self.channel, packet)
+        except redis.ConnectionError:
+            self.disconnect()
+            return self.get_client().publish(self.channel, packet)
+
+    def record(self, publishes=0, failures=0, duration=0.0):
+        with self._lock:
+            self._stats['publishes'] += publishes
+            self._stats['failures'] += failures
+            self._stats['duration'] += duration
+
+
+announcer = Announcer()
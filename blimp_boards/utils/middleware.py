@@ -1,5 +1,8 @@
 from django.db import connection
 
+from .announcer import announcer
+from .permissions import clear_pending_cache_keys
+
 
 class QueryCountDebugMiddleware(object):
     """
@@ -24,3 +27,32 @@ class QueryCountDebugMiddleware(object):
             response['X-Debug-Query-Duration'] = total_time
 
         return response
+
+
+class AnnounceMiddleware(object):
+    """
+    Defers model announcements made while handling a request until
+    the response is ready, so they are published after the request's
+    transactions have committed, coalesced and in a single batch.
+    Announcements are discarded if the view raised an exception.
+    """
+    def process_request(self, request):
+        announcer.reset()
+        announcer.begin()
+
+    def process_exception(self, request, exception):
+        announcer.reset()
+
+    def process_response(self, request, response):
+        announcer.end()
+        return response
+
+
+class PermissionsCacheMiddleware(object):
+    """
+    Deletes cached memberships cleared inside transactions that only
+    committed once the view returned.
+    """
+    def process_response(self, request, response):
+        clear_pending_cache_keys()
+        return response
@@ -1,10 +1,24 @@
-from django.forms.models import model_to_dict
+import base64
+import binascii
+import calendar
+import hashlib
+import operator
 
-from rest_framework import status
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.db.models.query_utils import DeferredAttribute
+from django.utils.encoding import smart_bytes, smart_text
+from django.utils.http import (http_date, parse_etags, parse_http_date_safe,
+                               quote_etag)
+
+from rest_framework import permissions, status
 from rest_framework.mixins import CreateModelMixin, UpdateModelMixin
 from rest_framework.response import Response
+from rest_framework.templatetags.rest_framework import replace_query_param
 
+from ..files.utils import get_s3_url_signer
 from .response import ErrorResponse
+from .serializers import DynamicFieldsModelSerializer
 
 
 class CreateModelMixin(CreateModelMixin):
@@ -70,51 +84,522 @@ class BulkCreateModelMixin(CreateModelMixin):
         return ErrorResponse(serializer.errors)
 
 
+class CursorPaginationMixin(object):
+    """
+    Opt-in keyset pagination for `list()`. Without a `limit` query
+    parameter the full list is returned as before. With one, results
+    are ordered by `cursor_ordering`, integer fields ending with a
+    unique one, and returned after the position given by the opaque
+    `cursor` parameter, along with the cursor and URL of the next page.
+    No count of the whole list is made.
+    """
+    cursor_ordering = ('id', )
+    cursor_param = 'cursor'
+    limit_param = 'limit'
+    max_limit = 500
+
+    def list(self, request, *args, **kwargs):
+        limit = request.QUERY_PARAMS.get(self.limit_param)
+
+        if limit is None:
+            return super(CursorPaginationMixin, self).list(
+                request, *args, **kwargs)
+
+        try:
+            limit = min(int(limit), self.max_limit)
+
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return ErrorResponse({
+                self.limit_param: ['Enter a positive whole number.']})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.order_by(*self.cursor_ordering)
+
+        cursor = request.QUERY_PARAMS.get(self.cursor_param)
+
+        if cursor:
+            try:
+                values = self.decode_cursor(cursor)
+            except ValueError:
+                return ErrorResponse({
+                    self.cursor_param: ['Invalid cursor.']})
+
+            queryset = queryset.filter(self.get_cursor_filter(values))
+
+        self.object_list = list(queryset[:limit + 1])
+
+        has_more = len(self.object_list) > limit
+        self.object_list = self.object_list[:limit]
+
+        next_cursor = None
+        next_url = None
+
+        if has_more:
+            next_cursor = self.encode_cursor(self.object_list[-1])
+            next_url = replace_query_param(
+                request.build_absolute_uri(), self.cursor_param, next_cursor)
+
+        serializer = self.get_serializer(self.object_list, many=True)
+
+        return Response({
+            'next': next_url,
+            'cursor': next_cursor,
+            'results': serializer.data
+        })
+
+    def get_cursor_filter(self, values):
+        """
+        Returns a filter for rows that come after the given values of
+        `cursor_ordering`, e.g. `a > x OR (a = x AND b > y)`.
+        """
+        cursor_filter = Q()
+
+        for index, field in enumerate(self.cursor_ordering):
+            lookups = dict(zip(self.cursor_ordering[:index], values))
+            lookups['{}__gt'.format(field)] = values[index]
+            cursor_filter |= Q(**lookups)
+
+        return cursor_filter
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, field) for field in self.cursor_ordering]
+        cursor = ':'.join(str(int(value)) for value in values)
+
+        cursor = base64.urlsafe_b64encode(smart_bytes(cursor))
+
+        return smart_text(cursor).rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """
+        Returns the ordering values in a cursor. Raises `ValueError`
+        if it can't be decoded.
+        """
+        cursor = smart_bytes(cursor + '=' * (-len(cursor) % 4))
+
+        try:
+            cursor = base64.urlsafe_b64decode(cursor)
+        except (TypeError, binascii.Error):
+            raise ValueError('Invalid cursor.')
+
+        values = [int(value) for value in smart_text(cursor).split(':')]
+
+        if len(values) != len(self.cursor_ordering):
+            raise ValueError('Invalid cursor.')
+
+        return values
+
+
+class SparseFieldsMixin(object):
+    """
+    Lets clients pick the fields of GET responses with comma separated
+    `fields` or `exclude` query parameters, for serializers that
+    support dynamic fields.
+
+    `sparse_select_related` and `sparse_prefetch_related` map
+    serializer fields to the related lookups they need, so
+    `select_sparse_related()` only joins or prefetches those of the
+    fields that are returned.
+    """
+    fields_param = 'fields'
+    exclude_param = 'exclude'
+
+    sparse_select_related = {}
+    sparse_prefetch_related = {}
+
+    def get_sparse_fields(self):
+        """
+        Returns the `fields` and `exclude` arguments for the
+        serializer. Empty unless the request method is safe.
+        """
+        sparse_fields = {}
+
+        if self.request.method not in permissions.SAFE_METHODS:
+            return sparse_fields
+
+        params = (('fields', self.fields_param),
+                  ('exclude', self.exclude_param))
+
+        for argument, param in params:
+            value = self.request.QUERY_PARAMS.get(param)
+
+            if value:
+                sparse_fields[argument] = [
+                    name.strip() for name in value.split(',') if name.strip()]
+
+        return sparse_fields
+
+    def is_field_requested(self, name):
+        """
+        Returns `True` if a serializer field is part of the response.
+        """
+        sparse_fields = self.get_sparse_fields()
+        fields = sparse_fields.get('fields')
+
+        if fields and name not in fields:
+            return False
+
+        return name not in sparse_fields.get('exclude', ())
+
+    def select_sparse_related(self, queryset, select_related=None,
+                              prefetch_related=None):
+        """
+        Adds the `select_related()` and `prefetch_related()` lookups
+        of the requested fields to a queryset. Other field to lookups
+        mappings than the view's can be given.
+        """
+        select_map = self.sparse_select_related
+        prefetch_map = self.sparse_prefetch_related
+
+        if select_related is not None:
+            select_map = select_related
+
+        if prefetch_related is not None:
+            prefetch_map = prefetch_related
+
+        select_related = set()
+        prefetch_related = set()
+
+        for name, lookups in select_map.items():
+            if self.is_field_requested(name):
+                select_related.update(lookups)
+
+        for name, lookups in prefetch_map.items():
+            if self.is_field_requested(name):
+                prefetch_related.update(lookups)
+
+        if select_related:
+            queryset = queryset.select_related(*sorted(select_related))
+
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*sorted(prefetch_related))
+
+        return queryset
+
+    def get_serializer(self, instance=None, data=None, files=None,
+                       many=False, partial=False):
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        kwargs = {}
+
+        if issubclass(serializer_class, DynamicFieldsModelSerializer):
+            kwargs = self.get_sparse_fields()
+
+        return serializer_class(instance, data=data, files=files, many=many,
+                                partial=partial, context=context, **kwargs)
+
+
+class ConditionalGetMixin(object):
+    """
+    Answers `list()` and `retrieve()` GET requests with 304 Not Modified,
+    without serializing anything, when the client already has the
+    current response.
+
+    ETags are derived from the number of objects and their latest
+    `date_modified`, along with the request's URL, user and S3 signature
+    window, as responses include signed URLs. A Last-Modified header is
+    also sent, never earlier than the start of the signature window,
+    but `If-Modified-Since` is only honoured for single objects, since
+    deletions don't change a collection's latest date.
+
+    Pages of `CursorPaginationMixin` derive their validators from the
+    fetched page instead, so that no count of the whole list is made.
+    """
+    def list(self, request, *args, **kwargs):
+        if self.is_cursor_paginated():
+            response = super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs)
+
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+            return self.get_conditional_response(
+                self.get_object_list_validators(self.object_list),
+                lambda: response)
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        return self.get_conditional_response(
+            self.get_queryset_validators(queryset),
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        self.object = self.get_object()
+
+        def respond():
+            serializer = self.get_serializer(self.object)
+            return Response(serializer.data)
+
+        return self.get_conditional_response(
+            (1, self.object.date_modified), respond, use_last_modified=True)
+
+    def get_queryset_validators(self, queryset):
+        """
+        Returns the number of objects in a queryset and their latest
+        `date_modified`, in a single query.
+        """
+        validators = queryset.order_by().aggregate(
+            count=Count('id'), last_modified=Max('date_modified'))
+
+        return validators['count'], validators['last_modified']
+
+    def get_object_list_validators(self, object_list):
+        """
+        Returns the number of fetched objects and their latest
+        `date_modified`.
+        """
+        last_modified = max([obj.date_modified for obj in object_list] or
+                            [None])
+
+        return len(object_list), last_modified
+
+    def is_cursor_paginated(self):
+        """
+        Returns `True` if the request asks `CursorPaginationMixin`
+        for a page.
+        """
+        limit_param = getattr(self, 'limit_param', None)
+
+        return bool(limit_param) and (
+            limit_param in self.request.QUERY_PARAMS)
+
+    def get_signature_expires(self):
+        """
+        Returns the expiry of the S3 URLs signed in responses.
+        """
+        signer = get_s3_url_signer()
+
+        return signer.get_expires(settings.AWS_SIGNATURE_EXPIRES_IN)
+
+    def get_etag(self, count, last_modified, expires):
+        user = self.request.user
+
+        parts = [
+            self.request.get_full_path(),
+            user.id if user.is_authenticated() else '',
+            count,
+            last_modified.isoformat() if last_modified else '',
+            expires,
+        ]
+
+        etag = ':'.join(smart_text(part) for part in parts)
+
+        return hashlib.md5(smart_bytes(etag)).hexdigest()
+
+    def get_last_modified(self, last_modified, expires):
+        """
+        Returns the timestamp a response last changed at: the latest
+        `date_modified`, or the first second of the current signature
+        window if later, since signed URLs change along with it.
+        Without a window, they change every second.
+        """
+        if not last_modified:
+            return None
+
+        window = get_s3_url_signer().window
+        window_start = expires - settings.AWS_SIGNATURE_EXPIRES_IN
+
+        if window:
+            window_start -= window - 1
+
+        return max(self.get_timestamp(last_modified), window_start)
+
+    def is_not_modified(self, etag, last_modified, use_last_modified=False):
+        """
+        Returns `True` if the request's validators match the current
+        ETag or, when `use_last_modified` is set, Last-Modified
+        timestamp.
+        """
+        if_none_match = self.request.META.get('HTTP_IF_NONE_MATCH')
+        if_modified_since = self.request.META.get('HTTP_IF_MODIFIED_SINCE')
+
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return etag in etags or '*' in etags
+
+        if if_modified_since and use_last_modified and last_modified:
+            if_modified_since = parse_http_date_safe(if_modified_since)
+            return bool(if_modified_since) and (
+                last_modified <= if_modified_since)
+
+        return False
+
+    def get_timestamp(self, value):
+        return calendar.timegm(value.utctimetuple())
+
+    def get_conditional_response(self, validators, respond,
+                                 use_last_modified=False):
+        """
+        Returns a 304 response if the client's copy is current, the
+        response built by `respond()` otherwise. Successful responses
+        get ETag and Last-Modified headers.
+        """
+        count, last_modified = validators
+        expires = self.get_signature_expires()
+
+        etag = self.get_etag(count, last_modified, expires)
+        last_modified = self.get_last_modified(last_modified, expires)
+
+        if self.is_not_modified(etag, last_modified, use_last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = respond()
+
+        if response.status_code in (status.HTTP_200_OK,
+                                    status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = quote_etag(etag)
+
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+
+        return response
+
+
+def tuple_getter(getter_class, fields):
+    """
+    Returns an `itemgetter` or `attrgetter` for the attnames of a list of
+    (name, attname) pairs that always returns a tuple.
+    """
+    attnames = [attname for name, attname in fields]
+
+    # Both only return tuples when given two or more names
+    if len(attnames) > 1:
+        return getter_class(*attnames)
+
+    getters = [getter_class(attname) for attname in attnames]
+
+    return lambda obj: tuple(get(obj) for get in getters)
+
+
 class ModelDiffMixin(object):
     """
     A model mixin that tracks model fields' values and provide some useful api
     to know what fields have been changed.
+
+    The initial state is a tuple of the raw attribute values (`board_id`
+    rather than `board`) of editable, non-deferred fields. It's cheap to
+    take and is only compared against when a diff is asked for.
     """
+    _diff_fields_cache = {}
 
     def __init__(self, *args, **kwargs):
         super(ModelDiffMixin, self).__init__(*args, **kwargs)
-        self.__initial = self._dict
+        self.__initial = self._snapshot()
+
+    @classmethod
+    def _get_diff_fields(cls):
+        """
+        Returns a tuple of (name, attname) pairs for the fields tracked
+        on this class and a getter for their values. Cached per class,
+        as deferred querysets create subclasses with fewer fields.
+        """
+        try:
+            return cls._diff_fields_cache[cls]
+        except KeyError:
+            pass
+
+        plain_fields = []
+        descriptor_fields = []
+
+        for field in cls._meta.fields:
+            # Descriptors may raise when accessed through the class
+            attribute = next((klass.__dict__[field.attname]
+                              for klass in cls.__mro__
+                              if field.attname in klass.__dict__), None)
+
+            if not field.editable or isinstance(attribute, DeferredAttribute):
+                continue
+
+            # Fields like JSONField keep their value behind a descriptor
+            if hasattr(attribute, '__set__'):
+                descriptor_fields.append((field.name, field.attname))
+            else:
+                plain_fields.append((field.name, field.attname))
+
+        get_plain = tuple_getter(operator.itemgetter, plain_fields)
+        get_descriptors = tuple_getter(operator.attrgetter, descriptor_fields)
+
+        def getter(instance):
+            values = get_plain(instance.__dict__)
+
+            if descriptor_fields:
+                values += get_descriptors(instance)
+
+            return values
+
+        fields = tuple(plain_fields + descriptor_fields)
+        cls._diff_fields_cache[cls] = (fields, getter)
+
+        return cls._diff_fields_cache[cls]
+
+    def _snapshot(self):
+        fields, getter = self._get_diff_fields()
+        return getter(self)
 
     @property
     def diff(self):
-        d1 = self.__initial
-        d2 = self._dict
-        diffs = [(k, (v, d2[k])) for k, v in d1.items() if v != d2[k]]
-        return dict(diffs)
+        diffs = {}
+        fields, getter = self._get_diff_fields()
+        current = getter(self)
+
+        for index, (name, attname) in enumerate(fields):
+            if self.__initial[index] != current[index]:
+                diffs[name] = (self.__initial[index], current[index])
+
+        return diffs
 
     @property
     def has_changed(self):
-        return bool(self.diff)
+        return self.__initial != self._snapshot()
 
     @property
     def changed_fields(self):
-        return self.diff.keys()
+        return list(self.diff.keys())
 
     def get_field_diff(self, field_name):
         """
         Returns a diff for field if it's changed and None otherwise.
         """
-        return self.diff.get(field_name, None)
+        fields, getter = self._get_diff_fields()
+
+        for index, (name, attname) in enumerate(fields):
+            if name == field_name:
+                initial = self.__initial[index]
+                current = getattr(self, attname)
+
+                if initial != current:
+                    return (initial, current)
+
+                break
+
+        return None
 
     def has_field_changed(self, field_name):
         """
         Returns `True` if field has changed.
         """
-        return field_name in self.changed_fields
+        return self.get_field_diff(field_name) is not None
+
+    def set_fields_saved(self, *field_names):
+        """
+        Takes the current values of the given fields as their initial
+        state, e.g. after they were written with an UPDATE.
+        """
+        fields, getter = self._get_diff_fields()
+        current = getter(self)
+        initial = list(self.__initial)
+
+        for index, (name, attname) in enumerate(fields):
+            if name in field_names:
+                initial[index] = current[index]
+
+        self.__initial = tuple(initial)
 
     def save(self, *args, **kwargs):
         """
         Saves model and set initial state.
         """
         super(ModelDiffMixin, self).save(*args, **kwargs)
-        self.__initial = self._dict
-
-    @property
-    def _dict(self):
-        fields = [field.name for field in self._meta.fields]
-        return model_to_dict(self, fields=fields)
+        self.__initial = self._snapshot()
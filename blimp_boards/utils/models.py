@@ -1,32 +1,20 @@
 import reversion
 
-from django.db import models, transaction
 from django.conf import settings
-from django.utils.encoding import smart_text
+from django.db import models, transaction
 from django.utils.log import getLogger
 
-from announce import Announce
-from rest_framework.renderers import JSONRenderer
 from rest_framework import serializers
 
+from .announcer import announcer, get_partial_room
 from .fields import DateTimeCreatedField, DateTimeModifiedField
 from .mixins import ModelDiffMixin
-
-try:
-    import urlparse
-except ImportError:
-    import urllib.parse as urlparse
+from .serializers import DynamicFieldsModelSerializer
 
 
 logger = getLogger(__name__)
 
-urlparse.uses_netloc.append('redis')
-
-models.options.DEFAULT_NAMES += ('announce', )
-
-
-def json_renderer(data):
-    return smart_text(JSONRenderer().render(data))
+models.options.DEFAULT_NAMES += ('announce', 'revisions', )
 
 
 class BaseModel(ModelDiffMixin, models.Model):
@@ -38,6 +26,17 @@ class BaseModel(ModelDiffMixin, models.Model):
     date_created = DateTimeCreatedField()
     date_modified = DateTimeModifiedField()
 
+    # Fields always included in partial announcements, `date_modified`
+    # acts as the version clients compare against their own copy.
+    announce_required_fields = ('id', 'date_modified', )
+
+    # Model fields whose changes show up under other serializer fields.
+    announce_field_map = {}
+
+    # Fields updated on every save of changed fields, because their
+    # `pre_save` sets or relies on them.
+    always_update_fields = ('date_modified', )
+
     class Meta:
         get_latest_by = 'date_modified'
         ordering = ('-date_modified', '-date_created',)
@@ -54,7 +53,21 @@ class BaseModel(ModelDiffMixin, models.Model):
     def save(self, *args, **kwargs):
         """
         Group any changes to models into a revision.
+
+        With `only_dirty=True`, saving an existing instance only updates
+        the fields that changed (plus `date_modified`) and skips the
+        write entirely if nothing changed.
         """
+        only_dirty = kwargs.pop('only_dirty', False)
+
+        if only_dirty and self.pk and not self._state.adding:
+            update_fields = self.get_dirty_fields()
+
+            if not update_fields:
+                return None
+
+            kwargs['update_fields'] = update_fields
+
         revisions = getattr(self._meta, 'revisions', True)
 
         try:
@@ -66,11 +79,28 @@ class BaseModel(ModelDiffMixin, models.Model):
 
         return super(BaseModel, self).save(*args, **kwargs)
 
-    def to_dict(self):
+    def get_dirty_fields(self):
+        """
+        Returns the names of the fields to update when saving only
+        changed fields. Empty if nothing changed.
+        """
+        update_fields = list(self.changed_fields)
+
+        if update_fields:
+            update_fields.extend(
+                name for name in self.always_update_fields
+                if name not in update_fields)
+
+        return update_fields
+
+    def to_dict(self, context=None):
         """
         Returns a dictionary representation of the model using
         REST framework's model serializers. Uses a specified serializer
         on the model or defaults to a generic ModelSerializer.
+
+        Models can pass the given serializer `context`, shared by
+        announcements serialized together, to their serializer.
         """
         return self.serializer.data
 
@@ -86,45 +116,83 @@ class BaseModel(ModelDiffMixin, models.Model):
         """
         self._meta.announce = bool(boolean)
 
-    def announce(self, method):
+    def to_partial_dict(self, fields, context=None):
         """
-        Announces to SocketIO Redis store that a model has changed.
-        Includes the model name as a data_type, method, and a serialized
-        representation of the model instance.
+        Returns a dictionary representation of the model that only
+        includes the given model fields and `announce_required_fields`.
+        Models with a `serializer_class` that supports dynamic fields
+        only serialize those fields.
         """
-        try:
-            room = self.announce_room
-        except AttributeError as e:
-            logger.exception(e)
-            return None
+        names = set(self.announce_required_fields)
+
+        for name in fields:
+            names.update(self.announce_field_map.get(name, (name, )))
+
+        serializer_class = getattr(self, 'serializer_class', None)
+
+        if serializer_class and issubclass(
+                serializer_class, DynamicFieldsModelSerializer):
+            return serializer_class(
+                self, fields=names, context=context).data
 
+        data = self.to_dict(context=context)
+
+        return dict((key, data[key]) for key in data if key in names)
+
+    def get_announce_data(self, method, fields=None, context=None):
+        """
+        Returns the message announced for a given method. Includes
+        the model name as a data_type, method, and a serialized
+        representation of the model instance.
+
+        When the changed `fields` are given, only those are serialized
+        and the message is marked as `partial`. Clients missing the
+        full object fetch it from the API. Announcements serialized
+        together can share a serializer `context`.
+        """
         data = {
             'data_type': self.__class__.__name__.lower(),
             'method': method,
-            'data': self.to_dict()
         }
 
-        redis_configuration = {}
+        if fields is not None:
+            data['partial'] = True
+            data['data'] = self.to_partial_dict(fields, context=context)
+        else:
+            data['data'] = self.to_dict(context=context)
 
-        if not settings.ANNOUNCE_TEST_MODE:
-            redis_url = urlparse.urlparse(settings.BOARDS_SOCKETS_REDIS_URL)
+        return data
 
-            redis_configuration.update({
-                'host': redis_url.hostname,
-                'password': redis_url.password,
-                'port': int(redis_url.port) if redis_url.port else 6379,
-                'db': int(redis_url.path[1:]) if redis_url.path[1:] else 0,
-            })
+    @property
+    def announce_rooms(self):
+        """
+        Returns the rooms a model change is announced to.
+        Defaults to the model's `announce_room`.
+        """
+        return [self.announce_room]
 
-        announce = Announce(
-            json_dumps=json_renderer,
-            _test_mode=settings.ANNOUNCE_TEST_MODE,
-            **redis_configuration)
+    def announce(self, method, fields=None):
+        """
+        Announces to SocketIO Redis store that a model has changed.
+        Announcements are deferred and coalesced while the announcer
+        is buffering, e.g. for the duration of a request.
 
+        Rooms get the whole instance. With ANNOUNCE_PARTIAL_UPDATES on,
+        their partial rooms, which clients opt into, also get only the
+        changed `fields`.
+        """
         try:
-            announce.emit('message', data, room=room)
-        except Exception as e:
+            rooms = self.announce_rooms
+        except AttributeError as e:
             logger.exception(e)
+            return None
+
+        for room in rooms:
+            announcer.announce(self, method, room)
+
+            if settings.ANNOUNCE_PARTIAL_UPDATES and room:
+                announcer.announce(
+                    self, method, get_partial_room(room), fields=fields)
 
     def post_save(self, created, **kwargs):
         """
@@ -132,9 +200,10 @@ class BaseModel(ModelDiffMixin, models.Model):
         when a model instance is created or updated.
         """
         try:
-            if self._meta.announce:
-                method = 'create' if created else 'update'
-                self.announce(method)
+            if self._meta.announce and created:
+                self.announce('create')
+            elif self._meta.announce:
+                self.announce('update', fields=self.changed_fields)
         except AttributeError:
             pass
 
@@ -145,6 +214,6 @@ class BaseModel(ModelDiffMixin, models.Model):
         """
         try:
             if self._meta.announce:
-                self.announce('delete')
+                self.announce('delete', fields=())
         except AttributeError:
             pass
@@ -0,0 +1,214 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.loading import get_model
+
+
+BOARD_PERMISSIONS_CACHE_KEY = 'acl:boards:{}'
+ACCOUNT_OWNERS_CACHE_KEY = 'acl:accounts:{}'
+
+_pending = threading.local()
+
+
+def get_user_id(user):
+    if user and user.is_authenticated():
+        return user.id
+
+
+def get_board_permissions(user):
+    """
+    Returns a {board_id: permission} dictionary of the boards where a
+    user is a collaborator. Kept in the cache until the user's
+    BoardCollaborators change.
+    """
+    BoardCollaborator = get_model('boards', 'BoardCollaborator')
+
+    user_id = get_user_id(user)
+
+    if not user_id:
+        return {}
+
+    key = BOARD_PERMISSIONS_CACHE_KEY.format(user_id)
+    board_permissions = cache.get(key)
+
+    if board_permissions is None:
+        board_permissions = dict(BoardCollaborator.objects.filter(
+            user_id=user_id).values_list('board_id', 'permission'))
+
+        cache.set(key, board_permissions, settings.ACL_CACHE_TIMEOUT)
+
+    return board_permissions
+
+
+def get_account_owners(user):
+    """
+    Returns a {account_id: is_owner} dictionary of the accounts where a
+    user is a collaborator. Kept in the cache until the user's
+    AccountCollaborators change.
+    """
+    AccountCollaborator = get_model('accounts', 'AccountCollaborator')
+
+    user_id = get_user_id(user)
+
+    if not user_id:
+        return {}
+
+    key = ACCOUNT_OWNERS_CACHE_KEY.format(user_id)
+    account_owners = cache.get(key)
+
+    if account_owners is None:
+        account_owners = dict(AccountCollaborator.objects.filter(
+            user_id=user_id).values_list('account_id', 'is_owner'))
+
+        cache.set(key, account_owners, settings.ACL_CACHE_TIMEOUT)
+
+    return account_owners
+
+
+def clear_cache_keys(keys):
+    """
+    Deletes cached memberships. Inside a transaction, the keys are
+    deleted again by `clear_pending_cache_keys` once it commits, as
+    a concurrent request may have cached the old rows meanwhile.
+    """
+    cache.delete_many(keys)
+
+    if connection.in_atomic_block:
+        pending = getattr(_pending, 'keys', None)
+
+        if pending is None:
+            pending = _pending.keys = set()
+
+        pending.update(keys)
+
+
+def clear_pending_cache_keys():
+    """
+    Deletes the memberships cleared inside transactions again, if
+    they have committed.
+    """
+    keys = getattr(_pending, 'keys', None)
+
+    if keys and not connection.in_atomic_block:
+        _pending.keys = None
+        cache.delete_many(list(keys))
+
+
+def clear_board_permissions(*user_ids):
+    clear_cache_keys([BOARD_PERMISSIONS_CACHE_KEY.format(user_id)
+                      for user_id in user_ids if user_id])
+
+
+def clear_account_owners(*user_ids):
+    clear_cache_keys([ACCOUNT_OWNERS_CACHE_KEY.format(user_id)
+                      for user_id in user_ids if user_id])
+
+
+def has_board_permission(board_permission, permission=None):
+    """
+    Returns `True` if a collaborator's `board_permission` grants
+    `permission`, write permission including read. A `None`
+    board_permission means the user isn't a collaborator.
+    """
+    BoardCollaborator = get_model('boards', 'BoardCollaborator')
+
+    if board_permission is None:
+        return False
+
+    if permission == BoardCollaborator.WRITE_PERMISSION:
+        return board_permission == BoardCollaborator.WRITE_PERMISSION
+
+    return True
+
+
+def has_account_permission(account_owner, is_owner=None):
+    """
+    Returns `True` if a collaborator whose ownership is `account_owner`
+    matches `is_owner`. A `None` account_owner means the user isn't a
+    collaborator.
+    """
+    if account_owner is None:
+        return False
+
+    if is_owner is not None:
+        return account_owner == is_owner
+
+    return True
+
+
+class MembershipCache(object):
+    """
+    Keeps a user's board and account memberships for the duration
+    of a request, so permission classes checking the same board or
+    account more than once only look them up once.
+    """
+    def __init__(self, user):
+        self.user = user
+        self.boards = {}
+        self._board_permissions = None
+        self._account_owners = None
+
+    def get_board(self, board_id):
+        """
+        Returns a board by id, or `None` if it doesn't exist.
+        """
+        Board = get_model('boards', 'Board')
+
+        try:
+            board_id = int(board_id)
+        except (TypeError, ValueError):
+            return None
+
+        if board_id not in self.boards:
+            try:
+                self.boards[board_id] = Board.objects.get(pk=board_id)
+            except Board.DoesNotExist:
+                self.boards[board_id] = None
+
+        return self.boards[board_id]
+
+    @property
+    def board_permissions(self):
+        if self._board_permissions is None:
+            self._board_permissions = get_board_permissions(self.user)
+
+        return self._board_permissions
+
+    @property
+    def account_owners(self):
+        if self._account_owners is None:
+            self._account_owners = get_account_owners(self.user)
+
+        return self._account_owners
+
+    def is_board_collaborator(self, board_id, permission=None):
+        """
+        Returns `True` if the user is a collaborator on a board.
+        Optionally checks if the user has a specific permission.
+        """
+        return has_board_permission(
+            self.board_permissions.get(board_id), permission)
+
+    def is_account_collaborator(self, account_id, is_owner=None):
+        """
+        Returns `True` if the user is a collaborator on an account.
+        Optionally checks if the user is, or isn't, the owner.
+        """
+        return has_account_permission(
+            self.account_owners.get(account_id), is_owner)
+
+
+def get_membership_cache(request):
+    """
+    Returns the MembershipCache for a request's user, creating it
+    on first use.
+    """
+    cache = getattr(request, '_membership_cache', None)
+
+    if cache is None or cache.user != request.user:
+        cache = MembershipCache(request.user)
+        request._membership_cache = cache
+
+    return cache
@@ -0,0 +1,3 @@
+from django.dispatch import Signal
+
+announced = Signal(providing_args=['messages'])
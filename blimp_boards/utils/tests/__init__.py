@@ -1,5 +1,6 @@
 from django.test import TestCase
 from django.conf import settings
+from django.core.cache import cache
 
 from rest_framework.test import APIClient
 
@@ -13,6 +14,12 @@ from ...comments.models import Comment
 class BaseTestCase(TestCase):
     users = {}
 
+    def _pre_setup(self):
+        super(BaseTestCase, self)._pre_setup()
+
+        # Ids are reused after each test's rollback, drop cached ACLs
+        cache.clear()
+
     def create_user(self):
         self.username = 'jpueblo'
         self.password = 'abc123'
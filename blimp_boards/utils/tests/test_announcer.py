@@ -0,0 +1,243 @@
+import json
+
+import redis
+
+from django.test.utils import override_settings
+
+from mock import patch
+
+from ...utils.tests import BaseTestCase
+from ..announcer import Announcer
+
+
+@override_settings(
+    ANNOUNCE_TEST_MODE=False,
+    BOARDS_SOCKETS_REDIS_URL='redis://:secret@example.com:6380/2')
+class AnnouncerTestCase(BaseTestCase):
+    def setUp(self):
+        self.announcer = Announcer()
+
+    def test_get_client_should_reuse_connection_pool(self):
+        """
+        Tests that the Redis client and its pool are created once.
+        """
+        client = self.announcer.get_client()
+        pool_kwargs = client.connection_pool.connection_kwargs
+
+        self.assertIs(self.announcer.get_client(), client)
+        self.assertEqual(pool_kwargs['host'], 'example.com')
+        self.assertEqual(pool_kwargs['port'], 6380)
+        self.assertEqual(pool_kwargs['db'], 2)
+        self.assertEqual(pool_kwargs['password'], 'secret')
+
+    def test_emit_should_publish_packet_to_room(self):
+        """
+        Tests that emit publishes an encoded packet for the room.
+        """
+        with patch.object(redis.StrictRedis, 'publish') as publish:
+            packet = self.announcer.emit({'id': 1}, room='a1')
+
+        publish.assert_called_once_with('dispatch', packet)
+
+        payload = json.loads(packet)
+        self.assertEqual(payload['args'][0], '/a1')
+        self.assertEqual(self.announcer.stats['publishes'], 1)
+
+    def test_emit_should_retry_once_on_connection_error(self):
+        """
+        Tests that emit reconnects and retries after a connection error.
+        """
+        side_effect = [redis.ConnectionError(), 1]
+
+        with patch.object(redis.StrictRedis, 'publish',
+                          side_effect=side_effect) as publish:
+            client = self.announcer.get_client()
+            self.announcer.emit({'id': 1}, room='a1')
+
+        self.assertEqual(publish.call_count, 2)
+        self.assertIsNot(self.announcer.get_client(), client)
+        self.assertEqual(self.announcer.stats['publishes'], 1)
+        self.assertEqual(self.announcer.stats['failures'], 0)
+
+    def test_emit_should_record_failures(self):
+        """
+        Tests that emit logs failures instead of raising them.
+        """
+        with patch.object(redis.StrictRedis, 'publish',
+                          side_effect=redis.ConnectionError()):
+            packet = self.announcer.emit({'id': 1}, room='a1')
+
+        self.assertIsNone(packet)
+        self.assertEqual(self.announcer.stats['publishes'], 0)
+        self.assertEqual(self.announcer.stats['failures'], 1)
+
+    @override_settings(ANNOUNCE_TEST_MODE=True)
+    def test_emit_shouldnt_publish_in_test_mode(self):
+        """
+        Tests that emit only encodes packets when in test mode.
+        """
+        with patch.object(redis.StrictRedis, 'publish') as publish:
+            packet = self.announcer.emit({'id': 1}, room='a1')
+
+        self.assertFalse(publish.called)
+        self.assertTrue(packet)
+
+
+class AnnouncedObject(object):
+    def __init__(self, pk, name=''):
+        self.pk = pk
+        self.name = name
+
+    def get_announce_data(self, method, fields=None, context=None):
+        return {
+            'data_type': 'announcedobject',
+            'method': method,
+            'fields': fields,
+            'data': {'id': self.pk, 'name': self.name}
+        }
+
+
+class AnnounceQueueTestCase(BaseTestCase):
+    def setUp(self):
+        self.announcer = Announcer()
+        self.obj = AnnouncedObject(1, 'First')
+
+    def announce(self, method, obj=None, room='a1', fields=None):
+        self.announcer.announce(obj or self.obj, method, room, fields=fields)
+
+    def test_deferred_should_coalesce_events_for_same_object(self):
+        """
+        Tests that multiple events for an object become one final event.
+        """
+        with patch.object(Announcer, 'emit_many') as emit_many:
+            with self.announcer.deferred():
+                self.announce('create')
+                self.obj.name = 'Renamed'
+                self.announce('update')
+
+        messages = emit_many.call_args[0][0]
+
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0][0]['method'], 'create')
+        self.assertEqual(messages[0][0]['data']['name'], 'Renamed')
+        self.assertEqual(messages[0][1], 'a1')
+
+    def test_deferred_should_merge_changed_fields(self):
+        """
+        Tests that merged update events keep all changed fields.
+        """
+        with patch.object(Announcer, 'emit_many') as emit_many:
+            with self.announcer.deferred():
+                self.announce('update', fields=['name'])
+                self.announce('update', fields=['position'])
+
+        data = emit_many.call_args[0][0][0][0]
+
+        self.assertEqual(data['fields'], set(['name', 'position']))
+
+    def test_deferred_should_serialize_object_once_for_all_rooms(self):
+        """
+        Tests that an event announced to several rooms is serialized
+        once, with a context shared by the whole flush.
+        """
+        with patch.object(Announcer, 'emit_many') as emit_many, \
+                patch.object(AnnouncedObject, 'get_announce_data',
+                             return_value={}) as get_announce_data:
+            with self.announcer.deferred():
+                self.announce('update', room='a1')
+                self.announce('update', room='b1')
+                self.announce('update', obj=AnnouncedObject(2), room='b1')
+
+        contexts = [call[1]['context']
+                    for call in get_announce_data.call_args_list]
+
+        self.assertEqual(len(emit_many.call_args[0][0]), 3)
+        self.assertEqual(get_announce_data.call_count, 2)
+        self.assertIs(contexts[0], contexts[1])
+
+    def test_deferred_should_announce_whole_object_if_created(self):
+        """
+        Tests that an update merged into a create announces all fields.
+        """
+        with patch.object(Announcer, 'emit_many') as emit_many:
+            with self.announcer.deferred():
+                self.announce('create')
+                self.announce('update', fields=['name'])
+
+        data = emit_many.call_args[0][0][0][0]
+
+        self.assertEqual(data['method'], 'create')
+        self.assertEqual(data['fields'], None)
+
+    def test_deferred_should_drop_objects_created_and_deleted(self):
+        """
+        Tests that create and delete events cancel each other out.
+        """
+        with patch.object(Announcer, 'emit_many') as emit_many:
+            with self.announcer.deferred():
+                self.announce('create')
+                self.announce('delete')
+
+        self.assertFalse(emit_many.called)
+
+    def test_deferred_should_keep_one_event_per_room(self):
+        """
+        Tests that events for other objects or rooms are kept apart.
+        """
+        other = AnnouncedObject(2)
+
+        with patch.object(Announcer, 'emit_many') as emit_many:
+            with self.announcer.deferred():
+                self.announce('update')
+                self.announce('delete')
+                self.announce('update', room='u1')
+                self.announce('update', obj=other)
+
+        methods = [(data['method'], data['data']['id'], room)
+                   for data, room in emit_many.call_args[0][0]]
+
+        self.assertEqual(methods, [
+            ('delete', 1, 'a1'), ('update', 1, 'u1'), ('update', 2, 'a1')])
+
+    def test_deferred_should_discard_events_on_exception(self):
+        """
+        Tests that nothing is published if the deferred block fails.
+        """
+        with patch.object(Announcer, 'emit_many') as emit_many:
+            with self.assertRaises(ValueError):
+                with self.announcer.deferred():
+                    self.announce('update')
+                    raise ValueError()
+
+        self.assertFalse(emit_many.called)
+        self.assertIsNone(self.announcer.queue)
+
+    def test_nested_deferred_blocks_should_publish_once(self):
+        """
+        Tests that only the outermost deferred block publishes.
+        """
+        with patch.object(Announcer, 'emit_many') as emit_many:
+            with self.announcer.deferred():
+                with self.announcer.deferred():
+                    self.announce('update')
+
+                self.assertFalse(emit_many.called)
+
+        self.assertEqual(emit_many.call_count, 1)
+
+    @override_settings(ANNOUNCE_TEST_MODE=False,
+                       BOARDS_SOCKETS_REDIS_URL='redis://localhost:6379/0')
+    def test_deferred_should_publish_in_one_pipeline(self):
+        """
+        Tests that deferred events are published in a single pipeline.
+        """
+        other = AnnouncedObject(2)
+
+        with patch.object(redis.client.BasePipeline,
+                          'execute') as execute:
+            with self.announcer.deferred():
+                self.announce('update')
+                self.announce('update', obj=other)
+
+        self.assertEqual(execute.call_count, 1)
+        self.assertEqual(self.announcer.stats['publishes'], 2)
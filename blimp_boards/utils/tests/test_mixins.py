@@ -0,0 +1,63 @@
+from ...boards.models import Board
+from ...cards.models import Card
+from ...utils.tests import BaseTestCase
+
+
+class ModelDiffMixinTestCase(BaseTestCase):
+    def setUp(self):
+        self.create_user()
+        self.create_account()
+        self.create_board()
+        self.create_card()
+
+    def test_diff_should_return_changed_fields(self):
+        """
+        Tests that diff returns initial and current values of changed
+        fields, using ids for foreign keys.
+        """
+        board = Board.objects.create(
+            name='Another Board', account=self.account, created_by=self.user)
+
+        self.card.name = 'New Name'
+        self.card.board = board
+
+        expected_diff = {
+            'name': ('The Card', 'New Name'),
+            'board': (self.board.id, board.id),
+        }
+
+        self.assertEqual(self.card.diff, expected_diff)
+        self.assertTrue(self.card.has_field_changed('board'))
+        self.assertFalse(self.card.has_field_changed('content'))
+
+    def test_diff_should_track_descriptor_fields(self):
+        """
+        Tests that fields stored behind descriptors are tracked.
+        """
+        self.card.data = {'pattern': {'shape': 'circle'}}
+
+        self.assertEqual(self.card.get_field_diff('data'),
+                         (None, {'pattern': {'shape': 'circle'}}))
+
+    def test_diff_should_skip_deferred_fields(self):
+        """
+        Tests that deferred fields aren't loaded or tracked.
+        """
+        card = Card.objects.defer('content').get(pk=self.card.pk)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(card.has_changed)
+
+        card.name = 'New Name'
+
+        self.assertEqual(card.changed_fields, ['name'])
+
+    def test_save_should_reset_initial_state(self):
+        """
+        Tests that saving a model resets its initial state.
+        """
+        self.card.name = 'New Name'
+        self.card.save()
+
+        self.assertFalse(self.card.has_changed)
+        self.assertEqual(self.card.diff, {})
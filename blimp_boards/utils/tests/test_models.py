@@ -0,0 +1,59 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ...cards.models import Card
+from ...utils.tests import BaseTestCase
+
+
+class BaseModelTestCase(BaseTestCase):
+    def setUp(self):
+        self.create_user()
+        self.create_account()
+        self.create_board()
+        self.create_card()
+
+        self.card = Card.objects.get(pk=self.card.pk)
+
+    def test_save_only_dirty_should_skip_unchanged_instance(self):
+        """
+        Tests that saving only dirty fields doesn't write anything
+        if nothing changed.
+        """
+        self.card.modified_by = self.user
+
+        with self.assertNumQueries(0):
+            self.card.save(only_dirty=True)
+
+    def test_save_only_dirty_should_update_changed_fields(self):
+        """
+        Tests that saving only dirty fields updates the changed fields
+        and date_modified.
+        """
+        date_modified = self.card.date_modified
+        self.card.name = 'New Name'
+
+        with CaptureQueriesContext(connection) as context:
+            self.card.save(only_dirty=True)
+
+        update_sql = 'UPDATE "cards_card" SET "date_modified"'
+        updates = [query['sql'] for query in context.captured_queries
+                   if update_sql in query['sql']]
+
+        card = Card.objects.get(pk=self.card.pk)
+
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"content"', updates[0])
+        self.assertEqual(card.name, 'New Name')
+        self.assertGreater(card.date_modified, date_modified)
+        self.assertFalse(self.card.has_changed)
+
+    def test_save_only_dirty_should_insert_new_instance(self):
+        """
+        Tests that new instances are saved with all their fields.
+        """
+        card = Card(name='Another Card', type='note', content='abc123',
+                    board=self.board, created_by=self.user)
+
+        card.save(only_dirty=True)
+
+        self.assertEqual(Card.objects.filter(pk=card.pk).count(), 1)